@@ -0,0 +1,94 @@
+"""Maintenance commands, run from the repo root:
+
+    ENV=dev uv run python -m app.cli rebuild-cost-rollups
+    ENV=dev uv run python -m app.cli archive-conversations
+    ENV=dev uv run python -m app.cli reload-candidates
+    ENV=dev uv run python -m app.cli import-candidates SOURCE
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from app.database import close_db, init_db
+from app.services.archive import archive_idle_conversations
+from app.services.candidate_import import import_candidates, iter_directory, iter_jsonl, iter_zip, read_chunks
+from app.services.candidate_loader import get_loader_stats, load_candidates
+from app.services.candidate_validation import shutdown_validation_pool
+from app.services.cost_tracker import rebuild_cost_rollups
+
+
+async def _rebuild_cost_rollups(_args: argparse.Namespace) -> None:
+    rows = await rebuild_cost_rollups()
+    print(f"Rebuilt cost rollups: {rows} daily rows")
+
+
+async def _archive_conversations(_args: argparse.Namespace) -> None:
+    total = 0
+    while archived := await archive_idle_conversations():
+        total += archived
+    print(f"Archived {total} idle conversations")
+
+
+async def _reload_candidates(_args: argparse.Namespace) -> None:
+    await load_candidates()
+    last = get_loader_stats()["last"]
+    print(f"Loaded {last['files']} candidate files: {last['files_changed']} changed in {last['total_ms']} ms")
+
+
+async def _import_candidates(args: argparse.Namespace) -> None:
+    source = args.source
+    if source == "-":
+        report = await import_candidates(iter_jsonl(read_chunks(sys.stdin.buffer)))
+    elif Path(source).is_dir():
+        report = await import_candidates(iter_directory(Path(source)))
+    elif source.endswith(".zip"):
+        report = await import_candidates(iter_zip(source))
+    else:
+        with open(source, "rb") as fileobj:
+            report = await import_candidates(iter_jsonl(read_chunks(fileobj)))
+    for error in report["errors"]:
+        print(f"{error['record']}: {error['error']}", file=sys.stderr)
+    print(json.dumps({key: value for key, value in report.items() if key != "errors"}))
+
+
+async def _run(args: argparse.Namespace) -> None:
+    await init_db()
+    try:
+        await args.handler(args)
+    finally:
+        await close_db()
+        shutdown_validation_pool()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="CVbot maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "rebuild-cost-rollups",
+        help="recompute the daily and monthly cost rollups from llm_requests",
+    ).set_defaults(handler=_rebuild_cost_rollups)
+    commands.add_parser(
+        "archive-conversations",
+        help="move every conversation idle for archive.idle_days into compressed cold storage now",
+    ).set_defaults(handler=_archive_conversations)
+    commands.add_parser(
+        "reload-candidates",
+        help="sync the candidates table with every file in data_dir",
+    ).set_defaults(handler=_reload_candidates)
+    import_parser = commands.add_parser(
+        "import-candidates",
+        help="validate and store candidates from a directory, a .zip or a .jsonl file",
+    )
+    import_parser.add_argument(
+        "source", help="directory of <id>.json files, a .zip of them, a .jsonl file or - for JSONL on stdin"
+    )
+    import_parser.set_defaults(handler=_import_candidates)
+    args = parser.parse_args(argv)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 import yaml
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
@@ -12,6 +13,19 @@ with Path(f"config/config-{env}.yaml").open("r", encoding="utf-8") as f:
 config["openrouter_api_key"] = os.getenv("OPENROUTER_API_KEY")
 smtp_config = config.pop("smtp", {}) or {}
 contact_config = config.pop("contact", {}) or {}
+http_config = config.pop("http", {}) or {}
+response_cache_config = config.pop("response_cache", {}) or {}
+pricing_config = config.pop("pricing", {}) or {}
+context_config = config.pop("context", {}) or {}
+prompt_config = config.pop("prompt", {}) or {}
+database_config = config.pop("database", {}) or {}
+budget_config = config.pop("budget", {}) or {}
+cost_reconciler_config = config.pop("cost_reconciler", {}) or {}
+pagination_config = config.pop("pagination", {}) or {}
+search_config = config.pop("search", {}) or {}
+archive_config = config.pop("archive", {}) or {}
+candidates_config = config.pop("candidates", {}) or {}
+import_config = config.pop("import", {}) or {}
 config["smtp_host"] = smtp_config.get("host") or ""
 config["smtp_port"] = int(smtp_config.get("port", 587))
 config["smtp_username"] = ""
@@ -35,6 +49,76 @@ if isinstance(turnstile_enabled, str):
 else:
     config["contact_turnstile_enabled"] = bool(turnstile_enabled)
 config["contact_turnstile_site_key"] = contact_config.get("turnstile_site_key", "")
+config["contact_turnstile_challenge_url"] = contact_config.get("turnstile_challenge_url", "")
+config["http_max_connections"] = int(http_config.get("max_connections", 20))
+config["http_max_keepalive_connections"] = int(http_config.get("max_keepalive_connections", 10))
+config["http_keepalive_expiry_seconds"] = float(http_config.get("keepalive_expiry_seconds", 30))
+config["http_timeout_seconds"] = float(http_config.get("timeout_seconds", 120))
+config["http_connect_timeout_seconds"] = float(http_config.get("connect_timeout_seconds", 10))
+http2 = http_config.get("http2", False)
+if isinstance(http2, str):
+    config["http_http2"] = http2.lower() in {"1", "true", "yes", "on"}
+else:
+    config["http_http2"] = bool(http2)
+response_cache_enabled = response_cache_config.get("enabled", True)
+if isinstance(response_cache_enabled, str):
+    config["response_cache_enabled"] = response_cache_enabled.lower() in {"1", "true", "yes", "on"}
+else:
+    config["response_cache_enabled"] = bool(response_cache_enabled)
+config["response_cache_ttl_seconds"] = int(response_cache_config.get("ttl_seconds", 7 * 24 * 3600))
+config["response_cache_max_entries"] = int(response_cache_config.get("max_entries", 5000))
+config["pricing_refresh_interval_seconds"] = int(pricing_config.get("refresh_interval_seconds", 6 * 3600))
+config["pricing_snapshot_path"] = pricing_config.get("snapshot_path", "data/model_pricing.json")
+config["context_default_budget_tokens"] = int(context_config.get("default_budget_tokens", 16000))
+config["context_budgets"] = {
+    model_id: int(budget) for model_id, budget in (context_config.get("budgets", {}) or {}).items()
+}
+config["context_summary_model"] = context_config.get("summary_model", "") or ""
+config["profile_prompt_mode"] = prompt_config.get("profile_mode", "full")
+config["profile_retrieval_top_k"] = int(prompt_config.get("retrieval_top_k", 8))
+config["database_read_pool_size"] = int(database_config.get("read_pool_size", 4))
+config["database_write_batch_window_ms"] = float(database_config.get("write_batch_window_ms", 5))
+config["database_write_batch_max_size"] = int(database_config.get("write_batch_max_size", 100))
+config["database_synchronous"] = str(database_config.get("synchronous", "FULL")).upper()
+config["database_cache_size_kib"] = int(database_config.get("cache_size_kib", 16384))
+config["database_mmap_size_mb"] = int(database_config.get("mmap_size_mb", 128))
+config["database_temp_store"] = str(database_config.get("temp_store", "MEMORY")).upper()
+config["database_busy_timeout_ms"] = int(database_config.get("busy_timeout_ms", 5000))
+config["database_maintenance_interval_seconds"] = float(database_config.get("maintenance_interval_seconds", 3600))
+config["database_incremental_vacuum_pages"] = int(database_config.get("incremental_vacuum_pages", 1000))
+config["budget_max_output_tokens"] = int(budget_config.get("max_output_tokens", 1500))
+config["cost_reconciler_interval_seconds"] = float(cost_reconciler_config.get("interval_seconds", 60))
+config["cost_reconciler_max_backoff_seconds"] = float(cost_reconciler_config.get("max_backoff_seconds", 3600))
+config["cost_reconciler_batch_size"] = int(cost_reconciler_config.get("batch_size", 500))
+config["pagination_conversations_page_size"] = int(pagination_config.get("conversations_page_size", 50))
+config["pagination_messages_page_size"] = int(pagination_config.get("messages_page_size", 50))
+config["search_backfill_batch_size"] = int(search_config.get("backfill_batch_size", 1000))
+config["search_backfill_pause_seconds"] = float(search_config.get("backfill_pause_seconds", 0.05))
+archive_enabled = archive_config.get("enabled", True)
+if isinstance(archive_enabled, str):
+    config["archive_enabled"] = archive_enabled.lower() in {"1", "true", "yes", "on"}
+else:
+    config["archive_enabled"] = bool(archive_enabled)
+config["archive_idle_days"] = int(archive_config.get("idle_days", 90))
+config["archive_batch_size"] = int(archive_config.get("batch_size", 20))
+config["archive_interval_seconds"] = float(archive_config.get("interval_seconds", 3600))
+config["archive_compression_level"] = int(archive_config.get("compression_level", 6))
+config["candidates_negative_cache_ttl_seconds"] = float(candidates_config.get("negative_cache_ttl_seconds", 30))
+config["candidates_negative_cache_max_entries"] = int(candidates_config.get("negative_cache_max_entries", 10000))
+config["candidates_cache_max_entries"] = int(candidates_config.get("cache_max_entries", 500))
+config["candidates_cache_max_mb"] = int(candidates_config.get("cache_max_mb", 64))
+candidates_watch_enabled = candidates_config.get("watch_enabled", True)
+if isinstance(candidates_watch_enabled, str):
+    config["candidates_watch_enabled"] = candidates_watch_enabled.lower() in {"1", "true", "yes", "on"}
+else:
+    config["candidates_watch_enabled"] = bool(candidates_watch_enabled)
+config["candidates_watch_interval_seconds"] = float(candidates_config.get("watch_interval_seconds", 1.0))
+config["candidates_watch_debounce_seconds"] = float(candidates_config.get("watch_debounce_seconds", 0.5))
+config["import_workers"] = int(import_config.get("workers", 0))
+config["import_chunk_size"] = int(import_config.get("chunk_size", 32))
+config["import_batch_size"] = int(import_config.get("batch_size", 500))
+config["import_parallel_min_documents"] = int(import_config.get("parallel_min_documents", 64))
+config["import_max_document_mb"] = float(import_config.get("max_document_mb", 5))
 
 if smtp_host := os.getenv("SMTP_HOST"):
     config["smtp_host"] = smtp_host
@@ -54,6 +138,8 @@ if contact_turnstile_site_key := os.getenv("CONTACT_TURNSTILE_SITE_KEY"):
     config["contact_turnstile_site_key"] = contact_turnstile_site_key
 if contact_turnstile_secret_key := os.getenv("CONTACT_TURNSTILE_SECRET_KEY"):
     config["contact_turnstile_secret_key"] = contact_turnstile_secret_key
+if admin_token := os.getenv("ADMIN_TOKEN"):
+    config["admin_token"] = admin_token
 
 class Settings(BaseSettings):
     openrouter_api_key: str = ""
@@ -78,6 +164,59 @@ class Settings(BaseSettings):
     contact_turnstile_site_key: str = ""
     contact_turnstile_secret_key: str = ""
     contact_turnstile_challenge_url: str = ""
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 120.0
+    http_connect_timeout_seconds: float = 10.0
+    http_http2: bool = False
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 7 * 24 * 3600
+    response_cache_max_entries: int = 5000
+    pricing_refresh_interval_seconds: int = 6 * 3600
+    pricing_snapshot_path: str = "data/model_pricing.json"
+    context_default_budget_tokens: int = 16000
+    context_budgets: dict[str, int] = {}
+    context_summary_model: str = ""
+    profile_prompt_mode: Literal["full", "retrieval"] = "full"
+    profile_retrieval_top_k: int = 8
+    database_read_pool_size: int = 4
+    database_write_batch_window_ms: float = 5.0
+    database_write_batch_max_size: int = 100
+    database_synchronous: str = "FULL"
+    database_cache_size_kib: int = 16384
+    database_mmap_size_mb: int = 128
+    database_temp_store: str = "MEMORY"
+    database_busy_timeout_ms: int = 5000
+    database_maintenance_interval_seconds: float = 3600.0
+    database_incremental_vacuum_pages: int = 1000
+    budget_max_output_tokens: int = 1500
+    cost_reconciler_interval_seconds: float = 60.0
+    cost_reconciler_max_backoff_seconds: float = 3600.0
+    cost_reconciler_batch_size: int = 500
+    pagination_conversations_page_size: int = 50
+    pagination_messages_page_size: int = 50
+    search_backfill_batch_size: int = 1000
+    search_backfill_pause_seconds: float = 0.05
+    archive_enabled: bool = True
+    archive_idle_days: int = 90
+    archive_batch_size: int = 20
+    archive_interval_seconds: float = 3600.0
+    archive_compression_level: int = 6
+    candidates_negative_cache_ttl_seconds: float = 30.0
+    candidates_negative_cache_max_entries: int = 10000
+    candidates_cache_max_entries: int = 500
+    candidates_cache_max_mb: int = 64
+    candidates_watch_enabled: bool = True
+    candidates_watch_interval_seconds: float = 1.0
+    candidates_watch_debounce_seconds: float = 0.5
+    import_workers: int = 0
+    import_chunk_size: int = 32
+    import_batch_size: int = 500
+    import_parallel_min_documents: int = 64
+    import_max_document_mb: float = 5.0
+    # Bearer token for admin operations; they are disabled while it is empty
+    admin_token: str = ""
 
     class Config:
         env_file = "secrets/.env"
@@ -1,7 +1,50 @@
+import asyncio
+import json
+import logging
+import time
+import zlib
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+from pathlib import Path
+
 import aiosqlite
 from app.config import settings
 
-_db: aiosqlite.Connection | None = None
+logger = logging.getLogger(__name__)
+
+# One writer connection; writes are admitted one at a time, in arrival order
+_writer: aiosqlite.Connection | None = None
+_write_lock: asyncio.Lock | None = None
+# Read-only connections for SELECTs; in WAL mode they never wait on the writer
+_readers: list[aiosqlite.Connection] = []
+_idle_readers: asyncio.Queue | None = None
+
+# Write-behind queue of (operation, args, future), applied by one flusher in group commits
+_write_queue: asyncio.Queue | None = None
+_flusher: asyncio.Task | None = None
+
+_stats = {
+    "reads": 0,
+    "writes": 0,
+    "write_queue_depth": 0,
+    "max_write_queue_depth": 0,
+    "queued_writes": 0,
+    "failed_queued_writes": 0,
+    "group_commits": 0,
+    "max_group_size": 0,
+}
+_maintenance_stats: dict[str, Any] = {
+    "runs": 0,
+    "last_run_at": None,
+    "last_duration_ms": None,
+    "last_vacuumed_pages": None,
+    "last_checkpoint": None,
+}
+# Recent time spent waiting for a connection, in seconds
+_read_waits: deque[float] = deque(maxlen=500)
+_write_waits: deque[float] = deque(maxlen=500)
 
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS candidates (
@@ -38,11 +81,39 @@ CREATE TABLE IF NOT EXISTS llm_requests (
     cost_usd REAL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key TEXT PRIMARY KEY,
+    candidate_id TEXT,
+    model_id TEXT NOT NULL,
+    response TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS conversation_summaries (
+    conversation_id INTEGER PRIMARY KEY REFERENCES conversations(id) ON DELETE CASCADE,
+    summary TEXT NOT NULL,
+    summarized_through_id INTEGER NOT NULL,
+    summarized_tokens INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS model_pricing (
+    model_id TEXT PRIMARY KEY,
+    input_per_token REAL NOT NULL,
+    output_per_token REAL NOT NULL,
+    source TEXT NOT NULL DEFAULT 'openrouter',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 """
 
 
-async def _ensure_candidates_schema():
-    db = await get_db()
+async def _add_candidate_name_columns(db: aiosqlite.Connection) -> None:
+    """Databases created before candidates carried names and JSON in the same row."""
     rows = await db.execute_fetchall("PRAGMA table_info(candidates)")
     columns = {row["name"] for row in rows}
     if "first_name" not in columns:
@@ -53,21 +124,601 @@ async def _ensure_candidates_schema():
         await db.execute("ALTER TABLE candidates ADD COLUMN middle_name TEXT")
     if "work_experience" not in columns:
         await db.execute("ALTER TABLE candidates ADD COLUMN work_experience JSONB")
-    await db.commit()
+
+
+async def _add_hot_path_indexes(db: aiosqlite.Connection) -> None:
+    # Conversation history, always read in id order
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id, id)")
+    # Sidebar, newest conversation first
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_conversations_updated ON conversations(updated_at DESC, id DESC)"
+    )
+    # Covers the daily budget and usage sums without touching the table
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_llm_requests_created "
+        "ON llm_requests(created_at, cost_usd, input_tokens, output_tokens)"
+    )
+
+
+# Rollup table -> (bucket column, bucket expression over llm_requests.created_at)
+COST_ROLLUPS = {
+    "cost_daily": ("day", "DATE(created_at)"),
+    "cost_monthly": ("month", "strftime('%Y-%m', created_at)"),
+}
+
+
+def cost_rollup_upsert(table: str, where: str) -> str:
+    """SQL adding (``:sign`` = 1) or removing (-1) the llm_requests rows matching ``where`` to a rollup."""
+    bucket, expression = COST_ROLLUPS[table]
+    return f"""
+        INSERT INTO {table} (
+            {bucket}, model_id, calls, input_tokens, output_tokens, cost_usd,
+            unpriced_calls, unpriced_input_tokens, unpriced_output_tokens
+        )
+        SELECT
+            {expression},
+            model_id,
+            :sign * COUNT(cost_usd),
+            :sign * COALESCE(SUM(CASE WHEN cost_usd IS NOT NULL THEN input_tokens END), 0),
+            :sign * COALESCE(SUM(CASE WHEN cost_usd IS NOT NULL THEN output_tokens END), 0),
+            :sign * COALESCE(SUM(cost_usd), 0),
+            :sign * (COUNT(*) - COUNT(cost_usd)),
+            :sign * COALESCE(SUM(CASE WHEN cost_usd IS NULL THEN input_tokens END), 0),
+            :sign * COALESCE(SUM(CASE WHEN cost_usd IS NULL THEN output_tokens END), 0)
+        FROM llm_requests
+        WHERE {where}
+        GROUP BY 1, 2
+        ON CONFLICT({bucket}, model_id) DO UPDATE SET
+            calls = calls + excluded.calls,
+            input_tokens = input_tokens + excluded.input_tokens,
+            output_tokens = output_tokens + excluded.output_tokens,
+            cost_usd = cost_usd + excluded.cost_usd,
+            unpriced_calls = unpriced_calls + excluded.unpriced_calls,
+            unpriced_input_tokens = unpriced_input_tokens + excluded.unpriced_input_tokens,
+            unpriced_output_tokens = unpriced_output_tokens + excluded.unpriced_output_tokens
+    """
+
+
+async def fill_cost_rollups(db: aiosqlite.Connection) -> None:
+    """Recompute both rollups from the full llm_requests history."""
+    for table in COST_ROLLUPS:
+        await db.execute(f"DELETE FROM {table}")
+        await db.execute(cost_rollup_upsert(table, "1"), {"sign": 1})
+
+
+async def _add_cost_rollups(db: aiosqlite.Connection) -> None:
+    # Priced columns only count rows with a known cost; unpriced ones wait for the cost reconciler
+    for table, (bucket, _) in COST_ROLLUPS.items():
+        await db.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {bucket} TEXT NOT NULL,
+                model_id TEXT NOT NULL,
+                calls INTEGER NOT NULL DEFAULT 0,
+                input_tokens INTEGER NOT NULL DEFAULT 0,
+                output_tokens INTEGER NOT NULL DEFAULT 0,
+                cost_usd REAL NOT NULL DEFAULT 0,
+                unpriced_calls INTEGER NOT NULL DEFAULT 0,
+                unpriced_input_tokens INTEGER NOT NULL DEFAULT 0,
+                unpriced_output_tokens INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ({bucket}, model_id)
+            ) WITHOUT ROWID
+            """
+        )
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_llm_requests_unpriced ON llm_requests(id) WHERE cost_usd IS NULL")
+    await fill_cost_rollups(db)
+
+
+SEARCH_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages
+    WHEN new.role != 'system' BEGIN
+        INSERT OR REPLACE INTO messages_fts (rowid, content, conversation_id)
+        VALUES (new.id, new.content, new.conversation_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages
+    WHEN new.role != 'system' BEGIN
+        INSERT OR REPLACE INTO messages_fts (rowid, content, conversation_id)
+        VALUES (new.id, new.content, new.conversation_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        DELETE FROM messages_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+        INSERT OR REPLACE INTO conversations_fts (rowid, title) VALUES (new.id, COALESCE(new.title, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF title ON conversations BEGIN
+        INSERT OR REPLACE INTO conversations_fts (rowid, title) VALUES (new.id, COALESCE(new.title, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+        DELETE FROM conversations_fts WHERE rowid = old.id;
+    END
+    """,
+)
+
+
+async def _add_search_index(db: aiosqlite.Connection) -> None:
+    """Full-text indexes over message content and conversation titles, rowid = source id.
+
+    Triggers keep them current from here on; rows that already exist are indexed in
+    the background (see ``app.services.search``), up to the high-water marks recorded here.
+    """
+    await db.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts "
+        "USING fts5(content, conversation_id UNINDEXED, tokenize='porter unicode61')"
+    )
+    await db.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(title, tokenize='porter unicode61')"
+    )
+    # Statement by statement: executescript would commit the migration's transaction
+    for statement in SEARCH_TRIGGERS:
+        await db.execute(statement)
+    await db.execute(
+        "CREATE TABLE IF NOT EXISTS search_backfill "
+        "(source TEXT PRIMARY KEY, next_id INTEGER NOT NULL, end_id INTEGER NOT NULL)"
+    )
+    await db.execute(
+        "INSERT OR IGNORE INTO search_backfill (source, next_id, end_id) "
+        "SELECT 'messages', 0, COALESCE(MAX(id), 0) FROM messages "
+        "UNION ALL SELECT 'conversations', 0, COALESCE(MAX(id), 0) FROM conversations"
+    )
+
+
+async def _add_conversation_archive(db: aiosqlite.Connection) -> None:
+    """Cold storage for idle conversations: the whole thread as one compressed blob."""
+    rows = await db.execute_fetchall("PRAGMA table_info(conversations)")
+    columns = {row["name"] for row in rows}
+    if "archived_at" not in columns:
+        await db.execute("ALTER TABLE conversations ADD COLUMN archived_at TIMESTAMP")
+    if "restored_at" not in columns:
+        await db.execute("ALTER TABLE conversations ADD COLUMN restored_at TIMESTAMP")
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS conversation_archive (
+            conversation_id INTEGER PRIMARY KEY REFERENCES conversations(id) ON DELETE CASCADE,
+            message_count INTEGER NOT NULL,
+            raw_bytes INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+async def _add_candidate_manifest(db: aiosqlite.Connection) -> None:
+    """Stat and hash of each candidate file, and of the DB JSON it was last synced with, to skip unchanged files."""
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS candidate_files (
+            path TEXT PRIMARY KEY,
+            candidate_id TEXT NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            work_experience_sha256 TEXT NOT NULL,
+            loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+async def _add_candidate_version(db: aiosqlite.Connection) -> None:
+    """Bumped on every write of a candidate's JSON, so editors can detect concurrent changes."""
+    rows = await db.execute_fetchall("PRAGMA table_info(candidates)")
+    if "version" not in {row["name"] for row in rows}:
+        await db.execute("ALTER TABLE candidates ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+
+ARCHIVE_SEARCH_TRIGGERS = (
+    """
+    CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages
+    WHEN NOT EXISTS (SELECT 1 FROM conversation_archive WHERE conversation_id = old.conversation_id) BEGIN
+        DELETE FROM messages_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversation_archive_fts_delete AFTER DELETE ON conversation_archive
+    WHEN NOT EXISTS (SELECT 1 FROM conversations WHERE id = old.conversation_id) BEGIN
+        DELETE FROM messages_fts WHERE conversation_id = old.conversation_id;
+    END
+    """,
+)
+
+
+async def _keep_archived_messages_searchable(db: aiosqlite.Connection) -> None:
+    """Archived messages stay in the search index; their rows go when the conversation is deleted.
+
+    The archive row is written before the messages are deleted, so the delete trigger can
+    tell archival from deletion. Threads archived before this lost their index rows, which
+    are rebuilt from the archive payloads.
+    """
+    await db.execute("DROP TRIGGER IF EXISTS messages_fts_delete")
+    for statement in ARCHIVE_SEARCH_TRIGGERS:
+        await db.execute(statement)
+    rows = await db.execute_fetchall("SELECT conversation_id, payload FROM conversation_archive")
+    for row in rows:
+        messages = json.loads(zlib.decompress(row["payload"]))
+        await db.executemany(
+            "INSERT OR REPLACE INTO messages_fts (rowid, content, conversation_id) VALUES (?, ?, ?)",
+            [(m["id"], m["content"], row["conversation_id"]) for m in messages if m["role"] != "system"],
+        )
+
+
+async def _enable_incremental_vacuum(db: aiosqlite.Connection) -> None:
+    """Convert files created before auto_vacuum=INCREMENTAL was set; new files start with it.
+
+    Switching an existing file takes a full VACUUM, which rewrites the database and cannot
+    run inside a transaction, so this migration runs outside one.
+    """
+    rows = await db.execute_fetchall("PRAGMA auto_vacuum")
+    if AUTO_VACUUM_MODES[rows[0][0]] == "INCREMENTAL":
+        return
+    logger.warning("Rebuilding the database to enable incremental vacuum; this may take a while")
+    started = time.perf_counter()
+    await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    await db.execute("VACUUM")
+    logger.info("Database rebuilt in %.1fs", time.perf_counter() - started)
+
+
+async def _add_summary_generation(db: aiosqlite.Connection) -> None:
+    """Bumped whenever a conversation's summary is invalidated, so a refresh already in flight can tell."""
+    rows = await db.execute_fetchall("PRAGMA table_info(conversations)")
+    if "summary_generation" not in {row["name"] for row in rows}:
+        await db.execute("ALTER TABLE conversations ADD COLUMN summary_generation INTEGER NOT NULL DEFAULT 0")
+
+
+# Migrations that manage their own transactions
+_NON_TRANSACTIONAL = {_enable_incremental_vacuum}
+
+# Applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = (
+    _add_candidate_name_columns,
+    _add_hot_path_indexes,
+    _add_cost_rollups,
+    _add_search_index,
+    _add_conversation_archive,
+    _add_candidate_manifest,
+    _add_candidate_version,
+    _keep_archived_messages_searchable,
+    _enable_incremental_vacuum,
+    _add_summary_generation,
+)
+
+
+async def _migrate(db: aiosqlite.Connection) -> None:
+    rows = await db.execute_fetchall("PRAGMA user_version")
+    version = rows[0][0]
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        if migration in _NON_TRANSACTIONAL:
+            await migration(db)
+            await db.execute(f"PRAGMA user_version = {target}")
+            await db.commit()
+            logger.info("Applied database migration %s (%s)", target, migration.__name__)
+            continue
+        await db.execute("BEGIN")
+        try:
+            await migration(db)
+            await db.execute(f"PRAGMA user_version = {target}")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        logger.info("Applied database migration %s (%s)", target, migration.__name__)
+
+
+# PRAGMA values in SQLite's numeric order
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+AUTO_VACUUM_MODES = ("NONE", "FULL", "INCREMENTAL")
+
+
+async def _apply_pragmas(db: aiosqlite.Connection) -> None:
+    """Apply the configured performance profile; these settings are per connection."""
+    if settings.database_synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"database.synchronous must be one of {', '.join(SYNCHRONOUS_MODES)}")
+    if settings.database_temp_store not in TEMP_STORES:
+        raise ValueError(f"database.temp_store must be one of {', '.join(TEMP_STORES)}")
+    await db.execute(f"PRAGMA synchronous={settings.database_synchronous}")
+    # Negative cache_size is in KiB rather than pages
+    await db.execute(f"PRAGMA cache_size={-int(settings.database_cache_size_kib)}")
+    await db.execute(f"PRAGMA mmap_size={int(settings.database_mmap_size_mb) * 1024 * 1024}")
+    await db.execute(f"PRAGMA temp_store={settings.database_temp_store}")
+    await db.execute(f"PRAGMA busy_timeout={int(settings.database_busy_timeout_ms)}")
+
+
+async def _open_reader() -> aiosqlite.Connection:
+    uri = f"{Path(settings.db_path).resolve().as_uri()}?mode=ro"
+    reader = await aiosqlite.connect(uri, uri=True)
+    reader.row_factory = aiosqlite.Row
+    await _apply_pragmas(reader)
+    await reader.execute("PRAGMA query_only=ON")
+    return reader
 
 
 async def init_db():
-    global _db
-    _db = await aiosqlite.connect(settings.db_path)
-    _db.row_factory = aiosqlite.Row
-    await _db.execute("PRAGMA journal_mode=WAL")
-    await _db.execute("PRAGMA foreign_keys=ON")
-    await _db.executescript(SCHEMA)
-    await _ensure_candidates_schema()
-    await _db.commit()
-
-
-async def get_db() -> aiosqlite.Connection:
-    if _db is None:
+    global _writer, _write_lock, _idle_readers, _write_queue, _flusher
+    await close_db()
+    _writer = await aiosqlite.connect(settings.db_path)
+    _writer.row_factory = aiosqlite.Row
+    # Only takes effect on a new file, before the first table exists; older files are converted by a migration
+    await _writer.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    await _writer.execute("PRAGMA journal_mode=WAL")
+    await _apply_pragmas(_writer)
+    await _writer.execute("PRAGMA foreign_keys=ON")
+    await _writer.executescript(SCHEMA)
+    await _writer.commit()
+    await _migrate(_writer)
+    _write_lock = asyncio.Lock()
+    _idle_readers = asyncio.Queue()
+    for _ in range(max(1, settings.database_read_pool_size)):
+        reader = await _open_reader()
+        _readers.append(reader)
+        _idle_readers.put_nowait(reader)
+    _write_queue = asyncio.Queue()
+    _flusher = asyncio.create_task(_run_flusher())
+
+
+async def close_db():
+    global _writer, _write_lock, _idle_readers, _write_queue, _flusher
+    if _flusher is not None:
+        # Commit everything queued before the connections go away
+        await flush_writes()
+        _flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await _flusher
+    _flusher = None
+    _write_queue = None
+    for reader in _readers:
+        await reader.close()
+    _readers.clear()
+    _idle_readers = None
+    if _writer is not None:
+        await _writer.execute("PRAGMA optimize")
+        await _writer.close()
+    _writer = None
+    _write_lock = None
+
+
+@asynccontextmanager
+async def read_db() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a read-only connection from the pool for SELECTs."""
+    if _writer is None:
+        await init_db()
+    started = time.perf_counter()
+    reader = await _idle_readers.get()
+    _read_waits.append(time.perf_counter() - started)
+    _stats["reads"] += 1
+    try:
+        yield reader
+    finally:
+        _idle_readers.put_nowait(reader)
+
+
+@asynccontextmanager
+async def write_db() -> AsyncIterator[aiosqlite.Connection]:
+    """Hold the writer connection for one transaction: commit on success, roll back on error.
+
+    Keep the block short (never await an LLM stream inside it) and do not nest
+    ``write_db`` calls, since every other writer queues behind it.
+    """
+    if _writer is None:
+        await init_db()
+    started = time.perf_counter()
+    _stats["write_queue_depth"] += 1
+    _stats["max_write_queue_depth"] = max(_stats["max_write_queue_depth"], _stats["write_queue_depth"])
+    try:
+        await _write_lock.acquire()
+    finally:
+        _stats["write_queue_depth"] -= 1
+    _write_waits.append(time.perf_counter() - started)
+    _stats["writes"] += 1
+    try:
+        yield _writer
+        await _writer.commit()
+    except BaseException:
+        await _writer.rollback()
+        raise
+    finally:
+        _write_lock.release()
+
+
+WriteOp = Callable[..., Awaitable[Any]]
+
+
+def queue_write(op: WriteOp, *args: Any) -> asyncio.Future:
+    """Queue ``op(db, *args)`` for the next group commit without waiting for it.
+
+    Queued operations run in submission order, each inside its own savepoint, so a
+    failing one is rolled back alone. The returned future resolves to the operation's
+    result once its batch is committed; failures are logged either way.
+    """
+    if _write_queue is None:
+        raise RuntimeError("Database is not initialised")
+    future = asyncio.get_running_loop().create_future()
+    # Fire-and-forget callers never read the outcome; the flusher has logged it already
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _write_queue.put_nowait((op, args, future))
+    _stats["queued_writes"] += 1
+    return future
+
+
+async def commit_write(op: WriteOp, *args: Any) -> Any:
+    """Queue ``op(db, *args)`` and wait until it is durably committed; returns its result."""
+    if _writer is None:
         await init_db()
-    return _db
+    return await queue_write(op, *args)
+
+
+async def _noop(db: aiosqlite.Connection) -> None:
+    return None
+
+
+async def flush_writes() -> None:
+    """Wait until every write queued so far has been committed."""
+    if _write_queue is not None:
+        await queue_write(_noop)
+
+
+async def _next_batch() -> list[tuple]:
+    """Block for one queued write, then gather more until the window closes or the batch is full."""
+    loop = asyncio.get_running_loop()
+    batch = [await _write_queue.get()]
+    deadline = loop.time() + settings.database_write_batch_window_ms / 1000
+    while len(batch) < settings.database_write_batch_max_size:
+        if not _write_queue.empty():
+            batch.append(_write_queue.get_nowait())
+            continue
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_write_queue.get(), timeout))
+        except TimeoutError:
+            break
+    return batch
+
+
+async def _apply_batch(batch: list[tuple]) -> None:
+    outcomes = []
+    try:
+        async with write_db() as db:
+            # One explicit transaction, so releasing a savepoint never commits on its own
+            await db.execute("BEGIN")
+            for op, args, _ in batch:
+                await db.execute("SAVEPOINT queued_write")
+                try:
+                    outcomes.append((True, await op(db, *args)))
+                except Exception as exc:
+                    await db.execute("ROLLBACK TO queued_write")
+                    outcomes.append((False, exc))
+                    _stats["failed_queued_writes"] += 1
+                    logger.exception("Queued write %s failed", getattr(op, "__name__", op))
+                await db.execute("RELEASE queued_write")
+    except Exception as exc:
+        logger.exception("Group commit of %s queued writes failed", len(batch))
+        outcomes = [(False, exc)] * len(batch)
+    _stats["group_commits"] += 1
+    _stats["max_group_size"] = max(_stats["max_group_size"], len(batch))
+    for (_, _, future), (ok, value) in zip(batch, outcomes):
+        if future.done():
+            continue
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+
+async def _run_flusher() -> None:
+    while True:
+        await _apply_batch(await _next_batch())
+
+
+async def incremental_vacuum(db: aiosqlite.Connection, pages: int) -> int:
+    """Return up to ``pages`` free pages to the filesystem; returns how many were released.
+
+    A no-op unless the file uses auto_vacuum=INCREMENTAL.
+    """
+    free_before = (await db.execute_fetchall("PRAGMA freelist_count"))[0][0]
+    # Each step of the statement frees one page, so it has to be read to the end
+    await db.execute_fetchall(f"PRAGMA incremental_vacuum({int(pages)})")
+    free_after = (await db.execute_fetchall("PRAGMA freelist_count"))[0][0]
+    return free_before - free_after
+
+
+async def run_maintenance() -> dict[str, Any]:
+    """Refresh planner statistics, reclaim free pages and checkpoint the WAL without blocking readers."""
+    started = time.perf_counter()
+    async with write_db() as db:
+        await db.execute("PRAGMA optimize")
+        vacuumed = await incremental_vacuum(db, settings.database_incremental_vacuum_pages)
+        busy, wal_frames, checkpointed = (await db.execute_fetchall("PRAGMA wal_checkpoint(PASSIVE)"))[0]
+    _maintenance_stats["runs"] += 1
+    _maintenance_stats["last_run_at"] = time.time()
+    _maintenance_stats["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    _maintenance_stats["last_vacuumed_pages"] = vacuumed
+    _maintenance_stats["last_checkpoint"] = {
+        "busy": bool(busy),
+        "wal_frames": wal_frames,
+        "checkpointed_frames": checkpointed,
+    }
+    return dict(_maintenance_stats)
+
+
+async def run_db_maintenance() -> None:
+    """Background task started from the app lifespan."""
+    while True:
+        await asyncio.sleep(settings.database_maintenance_interval_seconds)
+        try:
+            await run_maintenance()
+        except Exception:
+            logger.exception("Database maintenance failed")
+
+
+def _wait_stats(samples: deque[float]) -> dict[str, float | int | None]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"samples": 0, "avg_ms": None, "p95_ms": None, "max_ms": None}
+    return {
+        "samples": len(ordered),
+        "avg_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def get_db_stats() -> dict:
+    return {
+        "read_pool_size": len(_readers),
+        "idle_readers": _idle_readers.qsize() if _idle_readers is not None else 0,
+        "reads": _stats["reads"],
+        "writes": _stats["writes"],
+        "write_queue_depth": _stats["write_queue_depth"],
+        "max_write_queue_depth": _stats["max_write_queue_depth"],
+        "write_behind": {
+            "pending": _write_queue.qsize() if _write_queue is not None else 0,
+            "queued": _stats["queued_writes"],
+            "failed": _stats["failed_queued_writes"],
+            "group_commits": _stats["group_commits"],
+            "max_group_size": _stats["max_group_size"],
+        },
+        "read_wait": _wait_stats(_read_waits),
+        "write_wait": _wait_stats(_write_waits),
+    }
+
+
+async def get_db_settings() -> dict[str, Any]:
+    """Effective connection settings, file layout and WAL size, as seen by a pooled reader."""
+    pragmas = {}
+    async with read_db() as db:
+        for name in (
+            "journal_mode",
+            "synchronous",
+            "cache_size",
+            "mmap_size",
+            "temp_store",
+            "busy_timeout",
+            "auto_vacuum",
+            "page_size",
+            "page_count",
+            "freelist_count",
+        ):
+            pragmas[name] = (await db.execute_fetchall(f"PRAGMA {name}"))[0][0]
+    pragmas["synchronous"] = SYNCHRONOUS_MODES[pragmas["synchronous"]]
+    pragmas["temp_store"] = TEMP_STORES[pragmas["temp_store"]]
+    pragmas["auto_vacuum"] = AUTO_VACUUM_MODES[pragmas["auto_vacuum"]]
+    wal_path = Path(f"{settings.db_path}-wal")
+    return {
+        "pragmas": pragmas,
+        "wal_size_bytes": wal_path.stat().st_size if wal_path.exists() else 0,
+        "maintenance": {"interval_seconds": settings.database_maintenance_interval_seconds, **_maintenance_stats},
+    }
@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -6,9 +7,26 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from app.config import settings
-from app.database import init_db
+from app.database import close_db, init_db, run_db_maintenance
+from app.services.archive import run_archiver
 from app.services.candidate_loader import load_candidates
-from app.routers import chat, conversations, candidates, contact, costs, job_fit, work_experience
+from app.services.candidate_validation import shutdown_validation_pool
+from app.services.candidate_watcher import run_candidate_watcher
+from app.services.cost_tracker import run_cost_reconciler, seed_budget_ledger
+from app.services.http_client import close_http_client, init_http_client
+from app.services.pricing import load_pricing, run_pricing_refresher
+from app.services.search import run_search_backfill
+from app.routers import (
+    chat,
+    conversations,
+    candidates,
+    contact,
+    costs,
+    diagnostics,
+    job_fit,
+    search,
+    work_experience,
+)
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -17,7 +35,27 @@ BASE_DIR = Path(__file__).resolve().parent
 async def lifespan(app: FastAPI):
     await init_db()
     await load_candidates()
+    await load_pricing()
+    await seed_budget_ledger()
+    await init_http_client()
+    background_tasks = [
+        asyncio.create_task(run_pricing_refresher()),
+        asyncio.create_task(run_cost_reconciler()),
+        asyncio.create_task(run_db_maintenance()),
+        asyncio.create_task(run_search_backfill()),
+        asyncio.create_task(run_archiver()),
+        asyncio.create_task(run_candidate_watcher()),
+    ]
     yield
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    await close_http_client()
+    # Commits any queued chat writes before closing the connections
+    await close_db()
+    shutdown_validation_pool()
 
 
 app = FastAPI(title="CVbot", lifespan=lifespan)
@@ -31,5 +69,7 @@ app.include_router(conversations.router)
 app.include_router(candidates.router)
 app.include_router(contact.router)
 app.include_router(costs.router)
+app.include_router(diagnostics.router)
 app.include_router(job_fit.router)
+app.include_router(search.router)
 app.include_router(work_experience.router)
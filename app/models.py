@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # --- Candidate models (matching JSON schema) ---
@@ -134,6 +134,16 @@ class Candidate(BaseModel):
 
 # --- API / DB models ---
 
+# One RFC 6902 operation; paths are JSON Pointers into the WorkExperience document
+class PatchOperation(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(default=None, alias="from")
+
+
 class ConversationCreate(BaseModel):
     candidate_id: str
 
@@ -1,14 +1,55 @@
-from fastapi import APIRouter
-from app.database import get_db
+import asyncio
+import hmac
+import json
+import tempfile
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from app.config import settings
+from app.database import read_db
+from app.services.candidate_import import import_candidates, iter_jsonl, iter_zip
+from app.services.candidate_loader import get_loader_stats, load_candidates
+from app.services.etag import etag_response, strong_etag
 
 router = APIRouter(prefix="/api/candidates", tags=["candidates"])
 
 
+def require_admin(authorization: str | None = Header(default=None)) -> None:
+    """Admin operations need ``Authorization: Bearer <ADMIN_TOKEN>`` and do not exist without a token."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {settings.admin_token}".encode("utf-8")
+    if not hmac.compare_digest((authorization or "").encode("utf-8"), expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
 @router.get("")
-async def list_candidates():
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        "SELECT id, TRIM(first_name || ' ' || COALESCE(middle_name || ' ', '') || last_name) "
-        "AS display_name FROM candidates ORDER BY display_name"
-    )
-    return [dict(r) for r in rows]
+async def list_candidates(request: Request):
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT id, TRIM(first_name || ' ' || COALESCE(middle_name || ' ', '') || last_name) "
+            "AS display_name FROM candidates ORDER BY display_name"
+        )
+    body = json.dumps([dict(r) for r in rows], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return etag_response(request, strong_etag(body), body, "application/json")
+
+
+@router.post("/reload", dependencies=[Depends(require_admin)])
+async def reload_candidates():
+    """Rescan the DB and every candidate file; ordinary cache misses only look up the one id."""
+    await load_candidates()
+    return get_loader_stats()["last"]
+
+
+@router.post("/import", dependencies=[Depends(require_admin)])
+async def import_candidate_documents(request: Request):
+    """Bulk import from a JSONL body (streamed) or a zip of ``<id>.json`` files; returns the import report."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        return await import_candidates(iter_jsonl(request.stream()))
+    if content_type == "application/zip":
+        # zipfile needs to seek, so the archive is spooled to disk first
+        with tempfile.TemporaryFile() as spool:
+            async for chunk in request.stream():
+                await asyncio.to_thread(spool.write, chunk)
+            return await import_candidates(iter_zip(spool))
+    raise HTTPException(status_code=415, detail="Send application/x-ndjson or application/zip")
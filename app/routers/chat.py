@@ -5,10 +5,15 @@ from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from starlette.templating import Jinja2Templates
 from pathlib import Path
 
-from app.database import get_db
+from app.database import commit_write, queue_write, read_db
 from app.services.llm import stream_chat
-from app.services.candidate_loader import get_profile_json
-from app.services.cost_tracker import is_daily_cost_limit_reached, log_request
+from app.services.archive import ensure_restored
+from app.services.budget import Reservation, get_budget_ledger, reserve_for
+from app.services.candidate_loader import ensure_prompt_context, get_profile_prompt_context
+from app.services.chat_context import ContextWindow, build_context_messages, invalidate_summary, start_summary_refresh
+from app.services.cost_tracker import get_ledger_usage, is_daily_cost_limit_reached, log_request
+from app.services.history import conversation_page, message_page
+from app.services.response_cache import get_cached_response, make_cache_key, store_response
 from app.config import settings
 from app.models import ChatRequest
 
@@ -24,31 +29,29 @@ async def index():
 
 @router.get("/chat")
 async def chat_page(request: Request):
-    db = await get_db()
     last_chat_id = request.cookies.get(LAST_CHAT_COOKIE)
-    if last_chat_id and last_chat_id.isdigit():
-        existing = await db.execute_fetchall(
-            "SELECT id FROM conversations WHERE id = ?",
-            (int(last_chat_id),),
+    async with read_db() as db:
+        if last_chat_id and last_chat_id.isdigit():
+            existing = await db.execute_fetchall(
+                "SELECT id FROM conversations WHERE id = ?",
+                (int(last_chat_id),),
+            )
+            if existing:
+                return RedirectResponse(url=f"/chat/{last_chat_id}")
+        conversations = await conversation_page(db, settings.pagination_conversations_page_size)
+        candidates = await db.execute_fetchall(
+            "SELECT id, first_name, last_name, "
+            "TRIM(first_name || ' ' || last_name) AS display_name "
+            "FROM candidates ORDER BY display_name"
         )
-        if existing:
-            return RedirectResponse(url=f"/chat/{last_chat_id}")
-    conversations = await db.execute_fetchall(
-        "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) "
-        "as candidate_name FROM conversations c "
-        "JOIN candidates ca ON c.candidate_id = ca.id ORDER BY c.updated_at DESC"
-    )
-    candidates = await db.execute_fetchall(
-        "SELECT id, first_name, last_name, "
-        "TRIM(first_name || ' ' || last_name) AS display_name "
-        "FROM candidates ORDER BY display_name"
-    )
     return templates.TemplateResponse("chat.html.j2", {
         "request": request,
-        "conversations": conversations,
+        "conversations": conversations["items"],
+        "conversations_cursor": conversations["next_cursor"],
         "candidates": candidates,
         "active_conversation": None,
         "messages": [],
+        "messages_cursor": None,
         "daily_limit_usd": settings.max_daily_cost_usd,
         "models": settings.models,
     })
@@ -56,34 +59,31 @@ async def chat_page(request: Request):
 
 @router.get("/chat/{conversation_id}")
 async def chat_page_with_conversation(request: Request, conversation_id: int):
-    db = await get_db()
-    conversations = await db.execute_fetchall(
-        "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) "
-        "as candidate_name FROM conversations c "
-        "JOIN candidates ca ON c.candidate_id = ca.id ORDER BY c.updated_at DESC"
-    )
-    candidates = await db.execute_fetchall(
-        "SELECT id, first_name, last_name, "
-        "TRIM(first_name || ' ' || last_name) AS display_name "
-        "FROM candidates ORDER BY display_name"
-    )
-    active = await db.execute_fetchall(
-        "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) "
-        "as candidate_name FROM conversations c "
-        "JOIN candidates ca ON c.candidate_id = ca.id WHERE c.id = ?",
-        (conversation_id,),
-    )
-    active_conversation = active[0] if active else None
-    messages = await db.execute_fetchall(
-        "SELECT * FROM messages WHERE conversation_id = ? AND role != 'system' ORDER BY id",
-        (conversation_id,),
-    )
+    await ensure_restored(conversation_id)
+    async with read_db() as db:
+        conversations = await conversation_page(db, settings.pagination_conversations_page_size)
+        candidates = await db.execute_fetchall(
+            "SELECT id, first_name, last_name, "
+            "TRIM(first_name || ' ' || last_name) AS display_name "
+            "FROM candidates ORDER BY display_name"
+        )
+        active = await db.execute_fetchall(
+            "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) "
+            "as candidate_name FROM conversations c "
+            "JOIN candidates ca ON c.candidate_id = ca.id WHERE c.id = ?",
+            (conversation_id,),
+        )
+        active_conversation = active[0] if active else None
+        # Only the newest messages are rendered; older ones load as the thread is scrolled up
+        messages = await message_page(db, conversation_id, settings.pagination_messages_page_size)
     response = templates.TemplateResponse("chat.html.j2", {
         "request": request,
-        "conversations": conversations,
+        "conversations": conversations["items"],
+        "conversations_cursor": conversations["next_cursor"],
         "candidates": candidates,
         "active_conversation": active_conversation,
-        "messages": messages,
+        "messages": messages["items"],
+        "messages_cursor": messages["next_cursor"],
         "daily_limit_usd": settings.max_daily_cost_usd,\
         "models": settings.models,
     })
@@ -91,54 +91,154 @@ async def chat_page_with_conversation(request: Request, conversation_id: int):
     return response
 
 
-def _build_system_prompt(candidate_id: str, display_name: str) -> str:
-    profile_json = get_profile_json(candidate_id)
+def _daily_limit_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={
+            "error": (
+                f"Daily chat limit reached (${settings.max_daily_cost_usd:.2f}). "
+                "Please try again tomorrow."
+            )
+        },
+    )
+
+
+async def _insert_user_message(db, conversation_id: int, content: str) -> int:
+    cursor = await db.execute(
+        "INSERT INTO messages (conversation_id, role, content) VALUES (?, 'user', ?)",
+        (conversation_id, content),
+    )
+    await db.execute(
+        "UPDATE conversations SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (conversation_id,),
+    )
+    return cursor.lastrowid
+
+
+async def _insert_assistant_message(db, conversation_id: int, content: str) -> None:
+    await db.execute(
+        "INSERT INTO messages (conversation_id, role, content) VALUES (?, 'assistant', ?)",
+        (conversation_id, content),
+    )
+
+
+async def _rewrite_from_message(db, conversation_id: int, message_id: int, content: str) -> bool:
+    """Replace a user message and drop everything after it; False if there is no such message."""
+    user_rows = await db.execute_fetchall(
+        "SELECT id FROM messages WHERE id = ? AND conversation_id = ? AND role = 'user'",
+        (message_id, conversation_id),
+    )
+    if not user_rows:
+        return False
+    await db.execute(
+        "UPDATE messages SET content = ? WHERE id = ?",
+        (content, message_id),
+    )
+    await db.execute(
+        "DELETE FROM messages WHERE conversation_id = ? AND id > ?",
+        (conversation_id, message_id),
+    )
+    await invalidate_summary(db, conversation_id, message_id)
+    await db.execute(
+        "UPDATE conversations SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (conversation_id,),
+    )
+    return True
+
+
+def _build_system_prompt(candidate_id: str, display_name: str, query: str | None = None) -> str:
+    profile_context = get_profile_prompt_context(candidate_id, query)
     return (
         f"You are an AI assistant representing the professional experience of {display_name}. "
         "Answer questions about their work experience, skills, education, and publications "
         "based ONLY on the following data. If information is not in the data, say so.\n\n"
-        f"=== CANDIDATE DATA ===\n{profile_json}"
+        f"=== CANDIDATE DATA ===\n{profile_context}"
     )
 
 
-async def _build_llm_messages(db, conversation_id: int, candidate_id: str, candidate_name: str):
-    system_prompt = _build_system_prompt(candidate_id, candidate_name)
-    history = await db.execute_fetchall(
-        "SELECT role, content FROM messages WHERE conversation_id = ? AND role != 'system' ORDER BY id",
-        (conversation_id,),
-    )
-    messages = [{"role": "system", "content": system_prompt}]
-    messages.extend({"role": row["role"], "content": row["content"]} for row in history)
-    return messages
+async def _build_llm_messages(
+    conversation_id: int,
+    candidate_id: str,
+    candidate_name: str,
+    model: str,
+    query: str | None = None,
+    edit: tuple[int, str] | None = None,
+    pending: str | None = None,
+) -> ContextWindow:
+    """The context for a turn not accepted yet; its summary refresh waits for ``start_summary_refresh``."""
+    await ensure_prompt_context(candidate_id)
+    system_prompt = _build_system_prompt(candidate_id, candidate_name, query)
+    async with read_db() as db:
+        return await build_context_messages(
+            db, conversation_id, system_prompt, model, edit=edit, pending=pending, defer_summary=True
+        )
 
 
-def _build_streaming_response(db, conversation_id: int, model: str, messages, user_message_id: int):
+def _build_streaming_response(
+    conversation_id: int,
+    candidate_id: str,
+    model: str,
+    messages,
+    user_message_id: int,
+    reservation: Reservation,
+):
     async def event_generator():
+        try:
+            async for event in _stream_events():
+                yield event
+        finally:
+            # No-op once log_request has settled it; frees the hold on cache hits and errors
+            get_budget_ledger().release(reservation)
+
+    async def _stream_events():
         full_response = ""
         usage_info = None
         yield f"data: {json.dumps({'type': 'user_message', 'message_id': user_message_id})}\n\n"
 
-        async for chunk in stream_chat(messages, model=model):
-            if chunk["type"] == "token":
-                full_response += chunk["content"]
-                yield f"data: {json.dumps(chunk)}\n\n"
-            elif chunk["type"] == "usage":
-                usage_info = chunk
-
-        # Save assistant message
-        await db.execute(
-            "INSERT INTO messages (conversation_id, role, content) VALUES (?, 'assistant', ?)",
-            (conversation_id, full_response),
-        )
-        await db.commit()
-
-        # Log cost
-        if usage_info:
+        cache_key = make_cache_key(model, messages)
+        cached = await get_cached_response(cache_key)
+        if cached:
+            full_response = cached["response"]
+            yield f"data: {json.dumps({'type': 'token', 'content': full_response, 'cached': True})}\n\n"
+        else:
+            async for chunk in stream_chat(messages, model=model):
+                if chunk["type"] == "token":
+                    full_response += chunk["content"]
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                elif chunk["type"] == "usage":
+                    usage_info = chunk
+
+        # Save assistant message with the next group commit; the stream does not wait for it
+        queue_write(_insert_assistant_message, conversation_id, full_response)
+
+        if cached:
+            # Replayed answers are free: report zero cost alongside today's totals
+            usage_info = {
+                "type": "usage",
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cached": True,
+                "request_cost_usd": 0.0,
+            }
+            # Same source as live answers, so totals agree before queued writes commit
+            usage_info.update(get_ledger_usage())
+            yield f"data: {json.dumps(usage_info)}\n\n"
+        elif usage_info:
+            # Log cost
             cost_info = await log_request(
                 conversation_id=conversation_id,
                 model_id=model,
                 input_tokens=usage_info["input_tokens"],
                 output_tokens=usage_info["output_tokens"],
+                reservation=reservation,
+            )
+            await store_response(
+                cache_key,
+                candidate_id=candidate_id,
+                model_id=model,
+                response=full_response,
+                input_tokens=usage_info["input_tokens"],
+                output_tokens=usage_info["output_tokens"],
             )
             usage_info.update(cost_info)
             yield f"data: {json.dumps(usage_info)}\n\n"
@@ -150,112 +250,94 @@ def _build_streaming_response(db, conversation_id: int, model: str, messages, us
 
 @router.post("/api/chat/{conversation_id}")
 async def chat_stream(conversation_id: int, body: ChatRequest):
-    db = await get_db()
     if await is_daily_cost_limit_reached():
-        return JSONResponse(
-            status_code=429,
-            content={
-                "error": (
-                    f"Daily chat limit reached (${settings.max_daily_cost_usd:.2f}). "
-                    "Please try again tomorrow."
-                )
-            },
-        )
+        return _daily_limit_response()
+    await ensure_restored(conversation_id)
 
     # Get conversation and candidate info
-    rows = await db.execute_fetchall(
-        "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) "
-        "as candidate_name FROM conversations c "
-        "JOIN candidates ca ON c.candidate_id = ca.id WHERE c.id = ?",
-        (conversation_id,),
-    )
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) "
+            "as candidate_name FROM conversations c "
+            "JOIN candidates ca ON c.candidate_id = ca.id WHERE c.id = ?",
+            (conversation_id,),
+        )
     if not rows:
         return {"error": "Conversation not found"}
 
     conv = rows[0]
 
-    # Save user message
-    cursor = await db.execute(
-        "INSERT INTO messages (conversation_id, role, content) VALUES (?, 'user', ?)",
-        (conversation_id, body.message),
-    )
-    user_message_id = cursor.lastrowid
-    await db.execute(
-        "UPDATE conversations SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-        (conversation_id,),
-    )
-    await db.commit()
-
-    messages = await _build_llm_messages(
-        db,
+    # The budget is reserved against the context with the new message before anything is
+    # written, so a refused turn leaves the thread and its place in the sidebar as they were
+    window = await _build_llm_messages(
         conversation_id=conversation_id,
         candidate_id=conv["candidate_id"],
         candidate_name=conv["candidate_name"],
+        model=body.model,
+        query=body.message,
+        pending=body.message,
     )
+    reservation = await reserve_for(body.model, window.messages)
+    if reservation is None:
+        return _daily_limit_response()
+    # Committed, along with every write queued before it, before streaming starts
+    user_message_id = await commit_write(_insert_user_message, conversation_id, body.message)
+    start_summary_refresh(window)
     return _build_streaming_response(
-        db,
         conversation_id=conversation_id,
+        candidate_id=conv["candidate_id"],
         model=body.model,
-        messages=messages,
+        messages=window.messages,
         user_message_id=user_message_id,
+        reservation=reservation,
     )
 
 
 @router.post("/api/chat/{conversation_id}/edit/{message_id}")
 async def edit_chat_stream(conversation_id: int, message_id: int, body: ChatRequest):
-    db = await get_db()
     if await is_daily_cost_limit_reached():
-        return JSONResponse(
-            status_code=429,
-            content={
-                "error": (
-                    f"Daily chat limit reached (${settings.max_daily_cost_usd:.2f}). "
-                    "Please try again tomorrow."
-                )
-            },
+        return _daily_limit_response()
+    await ensure_restored(conversation_id)
+
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) "
+            "as candidate_name FROM conversations c "
+            "JOIN candidates ca ON c.candidate_id = ca.id WHERE c.id = ?",
+            (conversation_id,),
+        )
+        user_rows = await db.execute_fetchall(
+            "SELECT id FROM messages WHERE id = ? AND conversation_id = ? AND role = 'user'",
+            (message_id, conversation_id),
         )
-
-    rows = await db.execute_fetchall(
-        "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) "
-        "as candidate_name FROM conversations c "
-        "JOIN candidates ca ON c.candidate_id = ca.id WHERE c.id = ?",
-        (conversation_id,),
-    )
     if not rows:
         raise HTTPException(status_code=404, detail="Conversation not found")
-
-    user_rows = await db.execute_fetchall(
-        "SELECT id FROM messages WHERE id = ? AND conversation_id = ? AND role = 'user'",
-        (message_id, conversation_id),
-    )
     if not user_rows:
         raise HTTPException(status_code=404, detail="User message not found")
 
-    await db.execute(
-        "UPDATE messages SET content = ? WHERE id = ?",
-        (body.message, message_id),
-    )
-    await db.execute(
-        "DELETE FROM messages WHERE conversation_id = ? AND id > ?",
-        (conversation_id, message_id),
-    )
-    await db.execute(
-        "UPDATE conversations SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-        (conversation_id,),
-    )
-    await db.commit()
-
+    # The budget is reserved against the edited context before anything is rewritten,
+    # so a refused edit leaves the thread as it was
     conv = rows[0]
-    messages = await _build_llm_messages(
-        db,
+    window = await _build_llm_messages(
         conversation_id=conversation_id,
         candidate_id=conv["candidate_id"],
         candidate_name=conv["candidate_name"],
+        model=body.model,
+        query=body.message,
+        edit=(message_id, body.message),
     )
+    reservation = await reserve_for(body.model, window.messages)
+    if reservation is None:
+        return _daily_limit_response()
+    if not await commit_write(_rewrite_from_message, conversation_id, message_id, body.message):
+        get_budget_ledger().release(reservation)
+        raise HTTPException(status_code=404, detail="User message not found")
+    start_summary_refresh(window)
     return _build_streaming_response(
-        db,
         conversation_id=conversation_id,
+        candidate_id=conv["candidate_id"],
         model=body.model,
-        messages=messages,
+        messages=window.messages,
         user_message_id=message_id,
+        reservation=reservation,
     )
@@ -7,6 +7,7 @@ from starlette.templating import Jinja2Templates
 
 from app.config import settings
 from app.services.contact_email import send_contact_email
+from app.services.http_client import get_http_client
 
 router = APIRouter(tags=["contact"])
 templates = Jinja2Templates(directory=Path(__file__).resolve().parent.parent / "templates")
@@ -31,15 +32,16 @@ def _contact_context(
 
 
 async def _verify_turnstile_token(token: str, remote_ip: str | None) -> bool:
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.post(
-            settings.turnstile_challenge_url,
-            data={
-                "secret": settings.contact_turnstile_secret_key,
-                "response": token,
-                "remoteip": remote_ip or "",
-            },
-        )
+    client = get_http_client()
+    response = await client.post(
+        settings.contact_turnstile_challenge_url,
+        data={
+            "secret": settings.contact_turnstile_secret_key,
+            "response": token,
+            "remoteip": remote_ip or "",
+        },
+        timeout=10,
+    )
     response.raise_for_status()
     verification = response.json()
     return bool(verification.get("success"))
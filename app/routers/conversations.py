@@ -1,59 +1,81 @@
-from fastapi import APIRouter, HTTPException
-from app.database import get_db
+from fastapi import APIRouter, HTTPException, Query
+from app.config import settings
+from app.database import commit_write, read_db, write_db
 from app.models import ConversationCreate, ConversationOut, ConversationRename
+from app.services.archive import ensure_restored
+from app.services.history import conversation_page, message_page
+
+MAX_PAGE_SIZE = 200
 
 router = APIRouter(prefix="/api/conversations", tags=["conversations"])
 
 
 @router.post("")
 async def create_conversation(body: ConversationCreate):
-    db = await get_db()
-    cursor = await db.execute(
-        "INSERT INTO conversations (candidate_id, title) VALUES (?, ?)",
-        (body.candidate_id, "New Interview"),
-    )
-    await db.commit()
-    conv_id = cursor.lastrowid
-    row = await db.execute_fetchall(
-        "SELECT * FROM conversations WHERE id = ?", (conv_id,)
-    )
+    async with write_db() as db:
+        cursor = await db.execute(
+            "INSERT INTO conversations (candidate_id, title) VALUES (?, ?)",
+            (body.candidate_id, "New Interview"),
+        )
+        conv_id = cursor.lastrowid
+        row = await db.execute_fetchall(
+            "SELECT * FROM conversations WHERE id = ?", (conv_id,)
+        )
     return dict(row[0])
 
 
 @router.get("")
-async def list_conversations():
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        "SELECT c.*, TRIM(ca.first_name || ' ' || COALESCE(ca.middle_name || ' ', '') || ca.last_name) "
-        "as candidate_name FROM conversations c "
-        "JOIN candidates ca ON c.candidate_id = ca.id ORDER BY c.updated_at DESC"
-    )
-    return [dict(r) for r in rows]
+async def list_conversations(
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    q: str | None = Query(None, max_length=200),
+):
+    async with read_db() as db:
+        try:
+            return await conversation_page(db, limit or settings.pagination_conversations_page_size, cursor, q)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/{conversation_id}/messages")
+async def list_messages(
+    conversation_id: int,
+    before: int | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+):
+    await ensure_restored(conversation_id)
+    async with read_db() as db:
+        existing = await db.execute_fetchall("SELECT id FROM conversations WHERE id = ?", (conversation_id,))
+        if not existing:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        return await message_page(db, conversation_id, limit or settings.pagination_messages_page_size, before)
 
 
 @router.delete("/{conversation_id}")
 async def delete_conversation(conversation_id: int):
-    db = await get_db()
+    # Queued behind any of the conversation's pending writes, so none can land after it
+    await commit_write(_delete_conversation, conversation_id)
+    return {"ok": True}
+
+
+async def _delete_conversation(db, conversation_id: int) -> None:
     await db.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
     await db.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
-    await db.commit()
-    return {"ok": True}
 
 
 @router.put("/{conversation_id}")
 async def rename_conversation(conversation_id: int, body: ConversationRename):
-    db = await get_db()
-    existing = await db.execute_fetchall(
-        "SELECT id FROM conversations WHERE id = ?", (conversation_id,)
-    )
-    if not existing:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-    await db.execute(
-        "UPDATE conversations SET title = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-        (body.title, conversation_id),
-    )
-    await db.commit()
-    row = await db.execute_fetchall(
-        "SELECT * FROM conversations WHERE id = ?", (conversation_id,)
-    )
+    async with write_db() as db:
+        existing = await db.execute_fetchall(
+            "SELECT id FROM conversations WHERE id = ?", (conversation_id,)
+        )
+        if not existing:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        await db.execute(
+            "UPDATE conversations SET title = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (body.title, conversation_id),
+        )
+        row = await db.execute_fetchall(
+            "SELECT * FROM conversations WHERE id = ?", (conversation_id,)
+        )
     return dict(row[0])
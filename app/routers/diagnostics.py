@@ -0,0 +1,56 @@
+from fastapi import APIRouter
+
+from app.database import get_db_settings, get_db_stats
+from app.services.archive import get_archive_stats
+from app.services.candidate_loader import get_loader_stats
+from app.services.candidate_watcher import get_watcher_stats
+from app.services.cost_tracker import get_reconciler_stats
+from app.services.http_client import get_http_stats
+from app.services.llm import get_ttft_stats
+from app.services.response_cache import get_cache_stats
+from app.services.search import get_search_stats
+
+router = APIRouter(prefix="/api/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/http")
+async def http_diagnostics():
+    return {
+        "pool": get_http_stats(),
+        "time_to_first_token": get_ttft_stats(),
+    }
+
+
+@router.get("/response-cache")
+async def response_cache_diagnostics():
+    return await get_cache_stats()
+
+
+@router.get("/database")
+async def database_diagnostics():
+    return get_db_stats()
+
+
+@router.get("/database/settings")
+async def database_settings_diagnostics():
+    return await get_db_settings()
+
+
+@router.get("/cost-reconciler")
+async def cost_reconciler_diagnostics():
+    return get_reconciler_stats()
+
+
+@router.get("/search")
+async def search_diagnostics():
+    return await get_search_stats()
+
+
+@router.get("/archive")
+async def archive_diagnostics():
+    return await get_archive_stats()
+
+
+@router.get("/candidates")
+async def candidate_loader_diagnostics():
+    return {**get_loader_stats(), "watcher": get_watcher_stats()}
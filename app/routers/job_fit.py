@@ -1,3 +1,4 @@
+import hashlib
 import json
 
 from fastapi import APIRouter, Request
@@ -5,10 +6,11 @@ from fastapi.responses import StreamingResponse
 from starlette.templating import Jinja2Templates
 from pathlib import Path
 
-from app.database import get_db
+from app.database import read_db
 from app.services.llm import stream_chat
-from app.services.candidate_loader import get_profile_json
+from app.services.candidate_loader import ensure_prompt_context, get_profile_json, get_profile_prompt_context
 from app.services.cost_tracker import log_request
+from app.services.stream_fanout import SharedStream, join_stream
 from app.models import JobFitRequest
 from app.config import settings
 
@@ -17,7 +19,7 @@ templates = Jinja2Templates(directory=Path(__file__).resolve().parent.parent / "
 
 
 def _build_job_fit_prompt(candidate_id: str, display_name: str, job_description: str) -> list[dict]:
-    profile_json = get_profile_json(candidate_id)
+    profile_context = get_profile_prompt_context(candidate_id, job_description)
     system = (
         f"You are an expert hiring consultant evaluating whether {display_name} "
         "is a good fit for a specific job. Analyze the candidate's profile against the "
@@ -31,7 +33,7 @@ def _build_job_fit_prompt(candidate_id: str, display_name: str, job_description:
         "## Verdict\nA final recommendation (Strong Fit / Good Fit / Partial Fit / Poor Fit) "
         "with a brief justification.\n\n"
         "Base your analysis ONLY on the candidate data provided. Be honest and balanced.\n\n"
-        f"=== CANDIDATE DATA ===\n{profile_json}"
+        f"=== CANDIDATE DATA ===\n{profile_context}"
     )
     user = f"Please evaluate this candidate for the following job:\n\n{job_description}"
     return [
@@ -40,14 +42,20 @@ def _build_job_fit_prompt(candidate_id: str, display_name: str, job_description:
     ]
 
 
+def _job_fit_flight_key(candidate_id: str, job_description: str, model: str) -> str:
+    profile_hash = hashlib.sha256((get_profile_json(candidate_id) or "").encode("utf-8")).hexdigest()
+    job_hash = hashlib.sha256(" ".join(job_description.split()).encode("utf-8")).hexdigest()
+    return f"{candidate_id}:{profile_hash}:{job_hash}:{model}"
+
+
 @router.get("/job-fit")
 async def job_fit_page(request: Request):
-    db = await get_db()
-    candidates = await db.execute_fetchall(
-        "SELECT id, first_name, middle_name, last_name, "
-        "TRIM(first_name || ' ' || COALESCE(middle_name || ' ', '') || last_name) AS display_name "
-        "FROM candidates ORDER BY display_name"
-    )
+    async with read_db() as db:
+        candidates = await db.execute_fetchall(
+            "SELECT id, first_name, middle_name, last_name, "
+            "TRIM(first_name || ' ' || COALESCE(middle_name || ' ', '') || last_name) AS display_name "
+            "FROM candidates ORDER BY display_name"
+        )
     return templates.TemplateResponse("job_fit.html.j2", {
         "request": request,
         "candidates": candidates,
@@ -58,24 +66,28 @@ async def job_fit_page(request: Request):
 
 @router.post("/api/job-fit")
 async def job_fit_stream(body: JobFitRequest):
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        "SELECT id, TRIM(first_name || ' ' || last_name) "
-        "AS display_name FROM candidates WHERE id = ?",
-        (body.candidate_id,),
-    )
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT id, TRIM(first_name || ' ' || last_name) "
+            "AS display_name FROM candidates WHERE id = ?",
+            (body.candidate_id,),
+        )
     if not rows:
         return {"error": "Candidate not found"}
 
     candidate = rows[0]
+    await ensure_prompt_context(body.candidate_id)
     messages = _build_job_fit_prompt(
         body.candidate_id, candidate["display_name"], body.job_description
     )
+    # Identical runs already in flight are joined instead of billed again
+    key = _job_fit_flight_key(body.candidate_id, body.job_description, body.model)
 
-    async def event_generator():
+    async def upstream(stream: SharedStream):
+        usage = None
         async for chunk in stream_chat(messages, model=body.model):
             if chunk["type"] == "token":
-                yield f"data: {json.dumps(chunk)}\n\n"
+                yield chunk
             elif chunk["type"] == "usage":
                 cost_info = await log_request(
                     conversation_id=None,
@@ -83,8 +95,16 @@ async def job_fit_stream(body: JobFitRequest):
                     input_tokens=chunk["input_tokens"],
                     output_tokens=chunk["output_tokens"],
                 )
-                chunk.update(cost_info)
-                yield f"data: {json.dumps(chunk)}\n\n"
+                usage = {**chunk, **cost_info}
+        if usage is not None:
+            # Sent last, once no one else can join, so the count includes late joiners
+            stream.stop_joins()
+            usage["subscribers"] = stream.subscribers
+            yield usage
+
+    async def event_generator():
+        async for chunk in join_stream(key, upstream):
+            yield f"data: {json.dumps(chunk)}\n\n"
         yield "data: [DONE]\n\n"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
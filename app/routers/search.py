@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Query
+
+from app.services.search import search
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+MAX_PAGE_SIZE = 100
+
+
+@router.get("")
+async def search_conversations(
+    q: str = Query(..., min_length=1),
+    candidate_id: str | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """Ranked matches in message content and conversation titles; snippets mark hits with <mark>."""
+    return await search(q, candidate_id=candidate_id, limit=limit, offset=offset)
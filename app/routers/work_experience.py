@@ -1,41 +1,39 @@
+import asyncio
+import hashlib
 import json
 
-from fastapi import APIRouter, File, HTTPException, Request, UploadFile
-from fastapi.responses import JSONResponse, Response
+from fastapi import APIRouter, File, Header, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
 from pathlib import Path
 from pydantic import ValidationError
 from starlette.templating import Jinja2Templates
-import tiktoken
 
-from app.database import get_db
-from app.models import Candidate, WorkExperience
-from app.services.candidate_loader import get_candidate, load_candidates, save_candidate, save_profile
+from app.database import read_db
+from app.models import Candidate, PatchOperation, WorkExperience
+from app.services.candidate_loader import (
+    ProfileVersionConflict,
+    ensure_loaded,
+    get_profile_hash,
+    get_profile_token_breakdown,
+    get_response_body,
+    load_candidate,
+    patch_profile,
+    save_candidate,
+    save_profile,
+)
+from app.services.etag import etag_response, not_modified, not_modified_response, strong_etag
+from app.services.profile_patch import PatchError, PatchTestFailed
 
 router = APIRouter(tags=["work_experience"])
-templates = Jinja2Templates(directory=Path(__file__).resolve().parent.parent / "templates")
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
+# Part of every page ETag, so changed templates are never answered with a 304
+TEMPLATES_HASH = hashlib.sha256(b"".join(path.read_bytes() for path in sorted(TEMPLATES_DIR.glob("*.j2")))).hexdigest()
 
 
-async def _get_candidate_with_reload(candidate_id: str):
-    candidate = get_candidate(candidate_id)
-    if candidate is None:
-        await load_candidates()
-        candidate = get_candidate(candidate_id)
-    return candidate
-
-
-@router.get("/work-experience")
-async def work_experience_page(request: Request, candidate_id: str | None = None):
-    db = await get_db()
-    candidates = await db.execute_fetchall(
-        "SELECT id, TRIM(first_name || ' ' || COALESCE(middle_name || ' ', '') || last_name) "
-        "AS display_name FROM candidates ORDER BY display_name"
-    )
-    candidates = [dict(c) for c in candidates]
-
-    if not candidate_id and candidates:
-        candidate_id = candidates[0]["id"]
-
-    candidate = await _get_candidate_with_reload(candidate_id) if candidate_id else None
+def _render_page(
+    request: Request, candidates: list[dict], candidate_id: str | None, version: int | None, candidate: Candidate | None
+) -> bytes:
     profile = candidate.work_experience if candidate else None
     profile_json = json.dumps(profile.model_dump(), default=str) if profile else "null"
     display_name = ""
@@ -57,7 +55,7 @@ async def work_experience_page(request: Request, candidate_id: str | None = None
         else:
             page_title = display_name or page_title
 
-    return templates.TemplateResponse("work_experience.html.j2", {
+    return templates.get_template("work_experience.html.j2").render({
         "request": request,
         "candidates": candidates,
         "candidate_id": candidate_id,
@@ -65,40 +63,98 @@ async def work_experience_page(request: Request, candidate_id: str | None = None
         "page_title": page_title,
         "page_subtitle": page_subtitle,
         "profile_json": profile_json,
-    })
+        "profile_version": version,
+    }).encode("utf-8")
+
+
+@router.get("/work-experience")
+async def work_experience_page(request: Request, candidate_id: str | None = None):
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT id, TRIM(first_name || ' ' || COALESCE(middle_name || ' ', '') || last_name) "
+            "AS display_name, version FROM candidates ORDER BY display_name"
+        )
+    candidates = [{"id": row["id"], "display_name": row["display_name"]} for row in rows]
+
+    if not candidate_id and candidates:
+        candidate_id = candidates[0]["id"]
+
+    loaded = await ensure_loaded(candidate_id) if candidate_id else False
+    version = next((row["version"] for row in rows if row["id"] == candidate_id), None) if loaded else None
+    # The page is a function of the templates, the candidate list and this profile version
+    etag = strong_etag(
+        TEMPLATES_HASH, json.dumps(candidates), candidate_id or "", get_profile_hash(candidate_id) or "", str(version)
+    )
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    body = None
+    if loaded:
+        body = get_response_body(
+            candidate_id,
+            "page",
+            etag,
+            lambda candidate: _render_page(request, candidates, candidate_id, version, candidate),
+        )
+    if body is None:
+        body = _render_page(request, candidates, candidate_id, None, None)
+    return etag_response(request, etag, body, "text/html; charset=utf-8")
 
 
 @router.put("/api/candidates/{candidate_id}/work-experience")
 async def update_work_experience(candidate_id: str, body: WorkExperience):
-    candidate = await _get_candidate_with_reload(candidate_id)
+    candidate = await load_candidate(candidate_id)
     existing = candidate.work_experience if candidate else None
     if existing is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
-    await save_profile(candidate_id, body)
-    return JSONResponse({"ok": True})
+    version = await save_profile(candidate_id, body)
+    return JSONResponse({"ok": True}, headers={"X-Profile-Version": str(version)})
+
+
+@router.patch("/api/candidates/{candidate_id}/work-experience")
+async def patch_work_experience(
+    candidate_id: str,
+    operations: list[PatchOperation],
+    x_profile_version: int | None = Header(default=None),
+):
+    """RFC 6902 patch of the work experience, made against the version in ``X-Profile-Version``."""
+    if x_profile_version is None:
+        raise HTTPException(status_code=428, detail="X-Profile-Version header is required")
+    try:
+        version = await patch_profile(candidate_id, x_profile_version, operations)
+    except ProfileVersionConflict as exc:
+        raise HTTPException(
+            status_code=412,
+            detail="Profile was changed elsewhere; reload to continue",
+            headers={"X-Profile-Version": str(exc.version)},
+        )
+    except PatchTestFailed as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except PatchError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if version is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return JSONResponse({"ok": True}, headers={"X-Profile-Version": str(version)})
 
 
 @router.get("/api/candidates/{candidate_id}/")
-async def download_work_experience(candidate_id: str):
-    candidate = await _get_candidate_with_reload(candidate_id)
-    if candidate is None:
+async def download_work_experience(request: Request, candidate_id: str):
+    if not await ensure_loaded(candidate_id):
         raise HTTPException(status_code=404, detail="Candidate not found")
-    return Response(
-        content=candidate.model_dump_json(indent=2, exclude_unset=True),
-        media_type="application/json",
-        headers={
-            "Content-Disposition": f'attachment; filename="{candidate_id}.json"'
-        },
+    # The profile hash is computed when the candidate is cached, so a 304 costs no serialization
+    etag = f'"{get_profile_hash(candidate_id)}"'
+    headers = {"Content-Disposition": f'attachment; filename="{candidate_id}.json"'}
+    if not_modified(request, etag):
+        return not_modified_response(etag, headers)
+    body = get_response_body(
+        candidate_id,
+        "download",
+        etag,
+        lambda candidate: candidate.model_dump_json(indent=2, exclude_unset=True).encode("utf-8"),
     )
+    return etag_response(request, etag, body, "application/json", headers)
 
 
-@router.post("/api/candidates/{candidate_id}/work-experience/upload")
-async def upload_work_experience(candidate_id: str, file: UploadFile = File(...)):
-    candidate = await _get_candidate_with_reload(candidate_id)
-    existing = candidate.work_experience if candidate else None
-    if existing is None:
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    raw = await file.read()
+def _parse_uploaded_candidate(raw: bytes) -> Candidate:
     try:
         payload = json.loads(raw.decode("utf-8"))
     except UnicodeDecodeError:
@@ -109,28 +165,31 @@ async def upload_work_experience(candidate_id: str, file: UploadFile = File(...)
     if not isinstance(payload, dict) or not required_keys.issubset(payload.keys()):
         raise HTTPException(status_code=422, detail="Uploaded JSON must match Candidate schema")
     try:
-        uploaded_candidate = Candidate.model_validate(payload)
+        return Candidate.model_validate(payload)
     except ValidationError:
         raise HTTPException(status_code=422, detail="Uploaded JSON must match Candidate schema")
-    await save_candidate(candidate_id, uploaded_candidate)
-    return JSONResponse({"ok": True, "profile": uploaded_candidate.work_experience.model_dump()})
 
-def _nr_tokens_from_string(string: str, encoding_name: str) -> int:
-    encoding = tiktoken.get_encoding(encoding_name)
-    nr_tokens = len(encoding.encode(string))
-    return nr_tokens
+
+@router.post("/api/candidates/{candidate_id}/work-experience/upload")
+async def upload_work_experience(candidate_id: str, file: UploadFile = File(...)):
+    candidate = await load_candidate(candidate_id)
+    existing = candidate.work_experience if candidate else None
+    if existing is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    raw = await file.read()
+    # Parsing and validating a large profile is CPU bound; keep it off the event loop
+    uploaded_candidate = await asyncio.to_thread(_parse_uploaded_candidate, raw)
+    version = await save_candidate(candidate_id, uploaded_candidate)
+    return JSONResponse(
+        {"ok": True, "profile": uploaded_candidate.work_experience.model_dump()},
+        headers={"X-Profile-Version": str(version)},
+    )
 
 @router.get("/api/candidates/{candidate_id}/work-experience/token-count")
 async def get_nr_tokens(candidate_id: str):
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        "SELECT c.work_experience " \
-        "FROM candidates c "
-        "WHERE c.id = ?",
-        (candidate_id,),
-    )
-    if not rows:
+    await ensure_loaded(candidate_id)
+    breakdown = await get_profile_token_breakdown(candidate_id)
+    if breakdown is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
-    work_experience = rows[0]["work_experience"] or ""
-    nr_tokens = _nr_tokens_from_string(work_experience, "cl100k_base")
-    return JSONResponse({"nr_tokens": nr_tokens})
+    sections = {name: count for name, count in breakdown.items() if name != "total"}
+    return JSONResponse({"nr_tokens": breakdown["total"], "sections": sections})
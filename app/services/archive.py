@@ -0,0 +1,155 @@
+"""Cold storage for idle conversations.
+
+A conversation nobody has touched for ``archive.idle_days`` has its messages moved
+out of the hot ``messages`` table into ``conversation_archive`` as a single
+zlib-compressed JSON blob. The conversation row stays, so it is still listed, and its
+title and messages stay in the search index; opening or continuing it restores the
+messages with their original ids.
+"""
+
+import asyncio
+import json
+import logging
+import zlib
+
+from app.config import settings
+from app.database import commit_write, incremental_vacuum, read_db, write_db
+
+logger = logging.getLogger(__name__)
+
+# Last time a conversation was written to or brought back from the archive
+LAST_ACTIVE = "MAX(updated_at, COALESCE(restored_at, updated_at))"
+
+_stats = {"archived": 0, "restored": 0, "skipped": 0, "vacuumed_pages": 0}
+
+
+def _idle_cutoff() -> str:
+    return f"-{int(settings.archive_idle_days)} days"
+
+
+def _pack(messages: list[dict]) -> tuple[bytes, int]:
+    raw = json.dumps(messages, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return zlib.compress(raw, settings.archive_compression_level), len(raw)
+
+
+def _unpack(payload: bytes) -> list[dict]:
+    return json.loads(zlib.decompress(payload))
+
+
+async def _store_archive(
+    db, conversation_id: int, message_count: int, last_message_id: int, payload: bytes, raw_bytes: int
+) -> bool:
+    # The thread was read outside this transaction; only archive it if it is still idle and unchanged
+    idle = await db.execute_fetchall(
+        f"SELECT 1 FROM conversations WHERE id = ? AND archived_at IS NULL AND {LAST_ACTIVE} < datetime('now', ?)",
+        (conversation_id, _idle_cutoff()),
+    )
+    current = await db.execute_fetchall(
+        "SELECT COUNT(*) AS n, COALESCE(MAX(id), 0) AS last_id FROM messages WHERE conversation_id = ?",
+        (conversation_id,),
+    )
+    if not idle or (current[0]["n"], current[0]["last_id"]) != (message_count, last_message_id):
+        return False
+    await db.execute(
+        "INSERT INTO conversation_archive (conversation_id, message_count, raw_bytes, payload) VALUES (?, ?, ?, ?)",
+        (conversation_id, message_count, raw_bytes, payload),
+    )
+    await db.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+    await db.execute("UPDATE conversations SET archived_at = CURRENT_TIMESTAMP WHERE id = ?", (conversation_id,))
+    return True
+
+
+async def archive_conversation(conversation_id: int) -> bool:
+    """Move one conversation's messages into the archive; False if it is no longer eligible."""
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT id, role, content, created_at FROM messages WHERE conversation_id = ? ORDER BY id",
+            (conversation_id,),
+        )
+    messages = [dict(row) for row in rows]
+    payload, raw_bytes = await asyncio.to_thread(_pack, messages)
+    last_message_id = messages[-1]["id"] if messages else 0
+    archived = await commit_write(
+        _store_archive, conversation_id, len(messages), last_message_id, payload, raw_bytes
+    )
+    _stats["archived" if archived else "skipped"] += 1
+    return archived
+
+
+async def archive_idle_conversations() -> int:
+    """Archive one batch of idle conversations and release the pages they freed."""
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            f"SELECT id FROM conversations WHERE archived_at IS NULL AND {LAST_ACTIVE} < datetime('now', ?) "
+            "ORDER BY id LIMIT ?",
+            (_idle_cutoff(), settings.archive_batch_size),
+        )
+    archived = 0
+    for row in rows:
+        if await archive_conversation(row["id"]):
+            archived += 1
+    if archived:
+        async with write_db() as db:
+            _stats["vacuumed_pages"] += await incremental_vacuum(db, settings.database_incremental_vacuum_pages)
+    return archived
+
+
+async def _apply_restore(db, conversation_id: int, messages: list[dict]) -> bool:
+    cursor = await db.execute("DELETE FROM conversation_archive WHERE conversation_id = ?", (conversation_id,))
+    if cursor.rowcount != 1:
+        # Another request restored it first
+        return False
+    await db.executemany(
+        "INSERT INTO messages (id, conversation_id, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+        [(m["id"], conversation_id, m["role"], m["content"], m["created_at"]) for m in messages],
+    )
+    await db.execute(
+        "UPDATE conversations SET archived_at = NULL, restored_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (conversation_id,),
+    )
+    return True
+
+
+async def ensure_restored(conversation_id: int) -> bool:
+    """Bring an archived conversation's messages back; returns True if it was archived."""
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT payload FROM conversation_archive WHERE conversation_id = ?", (conversation_id,)
+        )
+    if not rows:
+        return False
+    messages = await asyncio.to_thread(_unpack, rows[0]["payload"])
+    if await commit_write(_apply_restore, conversation_id, messages):
+        _stats["restored"] += 1
+        logger.info("Restored conversation %s from the archive (%s messages)", conversation_id, len(messages))
+    return True
+
+
+async def run_archiver() -> None:
+    """Background task started from the app lifespan."""
+    if not settings.archive_enabled:
+        return
+    while True:
+        try:
+            while await archive_idle_conversations():
+                pass
+        except Exception:
+            logger.exception("Conversation archival failed")
+        await asyncio.sleep(settings.archive_interval_seconds)
+
+
+async def get_archive_stats() -> dict:
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT COUNT(*) AS conversations, COALESCE(SUM(message_count), 0) AS messages, "
+            "COALESCE(SUM(raw_bytes), 0) AS raw_bytes, COALESCE(SUM(LENGTH(payload)), 0) AS stored_bytes "
+            "FROM conversation_archive"
+        )
+    totals = dict(rows[0])
+    return {
+        "enabled": settings.archive_enabled,
+        "idle_days": settings.archive_idle_days,
+        **totals,
+        "compression_ratio": round(totals["raw_bytes"] / totals["stored_bytes"], 2) if totals["stored_bytes"] else None,
+        **_stats,
+    }
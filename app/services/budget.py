@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.services.pricing import get_model_pricing
+from app.services.tokens import count_message_tokens, encoding_name_for_model
+
+
+def _utc_today() -> str:
+    # Same calendar as SQLite's DATE('now') used for created_at
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+@dataclass
+class Reservation:
+    id: int
+    amount_usd: float
+
+
+class BudgetLedger:
+    """Today's spend, kept in memory so the daily limit check never touches SQLite.
+
+    The ledger is only mutated from the event loop without awaiting in between, so
+    each check-and-reserve is atomic with respect to other requests.
+    """
+
+    def __init__(self) -> None:
+        self.day = _utc_today()
+        self.spent_usd = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.seeded = False
+        self._reservations: dict[int, float] = {}
+        self._ids = itertools.count(1)
+
+    def seed(self, spent_usd: float, input_tokens: int, output_tokens: int) -> None:
+        self.day = _utc_today()
+        self.spent_usd = spent_usd
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.seeded = True
+
+    def _roll_over(self) -> None:
+        today = _utc_today()
+        if today != self.day:
+            # Streams still in flight keep their reservations; they will bill the new day
+            self.day = today
+            self.spent_usd = 0.0
+            self.input_tokens = 0
+            self.output_tokens = 0
+
+    @property
+    def reserved_usd(self) -> float:
+        return sum(self._reservations.values())
+
+    def is_limit_reached(self) -> bool:
+        self._roll_over()
+        return self.spent_usd + self.reserved_usd >= settings.max_daily_cost_usd
+
+    def reserve(self, amount_usd: float) -> Reservation | None:
+        """Hold ``amount_usd`` of today's budget, or return None if it would exceed the limit."""
+        self._roll_over()
+        if self.spent_usd + self.reserved_usd + amount_usd > settings.max_daily_cost_usd:
+            return None
+        reservation = Reservation(next(self._ids), amount_usd)
+        self._reservations[reservation.id] = amount_usd
+        return reservation
+
+    def release(self, reservation: Reservation | None) -> None:
+        if reservation is not None:
+            self._reservations.pop(reservation.id, None)
+
+    def record(
+        self,
+        cost_usd: float | None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        reservation: Reservation | None = None,
+    ) -> None:
+        """Book actual usage and drop the reservation it replaces."""
+        self._roll_over()
+        self.release(reservation)
+        self.spent_usd += cost_usd or 0.0
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+    def totals(self) -> dict[str, float | int]:
+        self._roll_over()
+        return {
+            "daily_total_usd": self.spent_usd,
+            "daily_input_tokens": self.input_tokens,
+            "daily_output_tokens": self.output_tokens,
+            "daily_reserved_usd": self.reserved_usd,
+            "daily_limit_usd": float(settings.max_daily_cost_usd),
+        }
+
+
+_ledger = BudgetLedger()
+
+
+def get_budget_ledger() -> BudgetLedger:
+    return _ledger
+
+
+def _prompt_tokens(model: str, messages: list[dict[str, str]]) -> int:
+    encoding_name = encoding_name_for_model(model)
+    return sum(count_message_tokens(message, encoding_name) for message in messages)
+
+
+async def estimate_cost(model: str, messages: list[dict[str, str]]) -> float:
+    """Expected cost of a completion: the prompt as sent plus the configured output allowance."""
+    pricing = get_model_pricing(model)
+    if not pricing:
+        return 0.0
+    prompt_tokens = await asyncio.to_thread(_prompt_tokens, model, messages)
+    return prompt_tokens * pricing["input"] + settings.budget_max_output_tokens * pricing["output"]
+
+
+async def reserve_for(model: str, messages: list[dict[str, str]]) -> Reservation | None:
+    return _ledger.reserve(await estimate_cost(model, messages))
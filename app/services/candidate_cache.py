@@ -0,0 +1,118 @@
+"""Bounded LRU of candidate profiles, kept as JSON bytes.
+
+An entry holds the canonical JSON of one candidate plus its prompt rendering, retrieval
+index and serialized HTTP responses once something has asked for them. ``Candidate`` models are validated
+from the bytes when an endpoint needs one and are not kept, so a cached profile costs
+roughly its JSON size instead of a model tree plus a string copy of it.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.models import Candidate
+from app.services.profile_retrieval import ProfileIndex
+
+
+@dataclass(slots=True)
+class CachedCandidate:
+    json: bytes
+    # Hash of the canonical JSON, keying derived caches such as token counts
+    profile_hash: str
+    # Hash of the JSON as stored in the DB; differs from profile_hash for legacy rows
+    stored_hash: str
+    text: str | None = None
+    index: ProfileIndex | None = None
+    # Response kind -> (ETag, body); an entry is one version of the profile, so the ETag
+    # only has to cover what else the body depends on
+    responses: dict[str, tuple[str, bytes]] | None = None
+
+    @property
+    def nbytes(self) -> int:
+        # Approximate: the JSON, the rendering and responses; an index holds about the rendering's text again
+        text = len(self.text) if self.text is not None else 0
+        responses = sum(len(body) for _etag, body in self.responses.values()) if self.responses else 0
+        return len(self.json) + text + (text if self.index is not None else 0) + responses
+
+    def model(self) -> Candidate:
+        return Candidate.model_validate_json(self.json)
+
+
+class CandidateCache:
+    """Least recently used candidates, bounded by entry count and by approximate bytes.
+
+    Only ``get`` counts as a use; ``peek`` reads without touching recency or the hit rate.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedCandidate] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, candidate_id: object) -> bool:
+        return candidate_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def get(self, candidate_id: str) -> CachedCandidate | None:
+        entry = self._entries.get(candidate_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(candidate_id)
+        return entry
+
+    def peek(self, candidate_id: str) -> CachedCandidate | None:
+        return self._entries.get(candidate_id)
+
+    def put(self, candidate_id: str, entry: CachedCandidate) -> CachedCandidate | None:
+        """Insert or replace an entry; returns the one it replaced."""
+        previous = self.pop(candidate_id)
+        self._entries[candidate_id] = entry
+        self._bytes += entry.nbytes
+        self._evict(keep=candidate_id)
+        return previous
+
+    def resize(self, candidate_id: str, delta: int) -> None:
+        """Account for derived data added to a cached entry."""
+        if candidate_id in self._entries:
+            self._bytes += delta
+            self._evict(keep=candidate_id)
+
+    def pop(self, candidate_id: str) -> CachedCandidate | None:
+        entry = self._entries.pop(candidate_id, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _evict(self, keep: str) -> None:
+        # The entry just added or grown stays even if it alone is over the byte budget
+        while (len(self._entries) > self.max_entries or self._bytes > self.max_bytes) and len(self._entries) > 1:
+            oldest = next(candidate_id for candidate_id in self._entries if candidate_id != keep)
+            self.pop(oldest)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int | float | None]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
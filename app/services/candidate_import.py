@@ -0,0 +1,188 @@
+"""Bulk candidate imports from a directory, a zip archive or a JSONL stream.
+
+Documents are validated in the process pool from ``candidate_validation``, a few
+chunks per worker in flight so a large import never sits in memory at once, and
+accepted candidates are written ``import.batch_size`` per transaction through the
+write queue. Bad documents do not stop the import; each one is reported with its
+source (file, zip entry or line number) and the reason it was rejected.
+
+A document's id is its file name for directories and zips, and its ``id`` field in
+JSONL. An imported candidate replaces any existing DB copy of the same id.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import zipfile
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO
+
+from app.config import settings
+from app.database import commit_write
+from app.services.candidate_loader import CANDIDATE_ID_RE, UPSERT_CANDIDATE_SQL, forget_candidates
+from app.services.candidate_validation import ValidatedRecord, get_validation_pool, validate_chunk
+
+logger = logging.getLogger(__name__)
+
+# (source key, candidate id or None to read it from the document, content or None if over the size limit)
+Document = tuple[str, str | None, bytes | None]
+
+_READ_SIZE = 1024 * 1024
+
+
+def _max_document_bytes() -> int:
+    return int(settings.import_max_document_mb * 1024 * 1024)
+
+
+def _read_files(files: list[Path], max_bytes: int) -> list[Document]:
+    return [(str(path), path.stem, path.read_bytes() if path.stat().st_size <= max_bytes else None) for path in files]
+
+
+async def iter_directory(path: Path) -> AsyncIterator[Document]:
+    """Every ``*.json`` file directly in ``path``, read a chunk of files per thread hop."""
+    files = await asyncio.to_thread(lambda: sorted(path.glob("*.json")))
+    max_bytes = _max_document_bytes()
+    for start in range(0, len(files), settings.import_chunk_size):
+        chunk = files[start : start + settings.import_chunk_size]
+        for document in await asyncio.to_thread(_read_files, chunk, max_bytes):
+            yield document
+
+
+def _read_entries(archive: zipfile.ZipFile, entries: list[zipfile.ZipInfo], max_bytes: int) -> list[Document]:
+    documents = []
+    for info in entries:
+        # The declared size can lie; never decompress more than the limit
+        with archive.open(info) as entry:
+            raw = entry.read(max_bytes + 1)
+        documents.append((info.filename, PurePosixPath(info.filename).stem, raw if len(raw) <= max_bytes else None))
+    return documents
+
+
+async def iter_zip(source: str | Path | BinaryIO) -> AsyncIterator[Document]:
+    """Every ``*.json`` entry in a zip archive, at any depth."""
+    archive = await asyncio.to_thread(zipfile.ZipFile, source)
+    max_bytes = _max_document_bytes()
+    with archive:
+        entries = [
+            info
+            for info in archive.infolist()
+            if not info.is_dir()
+            and info.filename.endswith(".json")
+            and not any(part.startswith(("__MACOSX", ".")) for part in PurePosixPath(info.filename).parts)
+        ]
+        for start in range(0, len(entries), settings.import_chunk_size):
+            chunk = entries[start : start + settings.import_chunk_size]
+            for document in await asyncio.to_thread(_read_entries, archive, chunk, max_bytes):
+                yield document
+
+
+async def _split_lines(chunks: AsyncIterable[bytes], max_bytes: int) -> AsyncIterator[bytes | None]:
+    # Lines over the limit come out as None; their bytes are dropped as they arrive rather than buffered
+    buffer = b""
+    oversized = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield None if oversized else line
+            oversized = False
+        if len(buffer) > max_bytes:
+            oversized = True
+            buffer = b""
+    if buffer or oversized:
+        yield None if oversized else buffer
+
+
+async def iter_jsonl(chunks: AsyncIterable[bytes]) -> AsyncIterator[Document]:
+    """One candidate per line, with its id in the ``id`` field; blank lines are skipped."""
+    number = 0
+    async for line in _split_lines(chunks, _max_document_bytes()):
+        number += 1
+        if line is None or line.strip():
+            yield f"line {number}", None, line
+
+
+async def read_chunks(fileobj: BinaryIO) -> AsyncIterator[bytes]:
+    """A blocking binary file (or stdin) as an async stream."""
+    while chunk := await asyncio.to_thread(fileobj.read, _READ_SIZE):
+        yield chunk
+
+
+async def _store_candidates(db, records: list[ValidatedRecord]) -> None:
+    await db.executemany(
+        UPSERT_CANDIDATE_SQL,
+        [(record.candidate_id, *record.names, record.candidate_json) for record in records],
+    )
+    await db.execute(
+        "DELETE FROM llm_response_cache WHERE candidate_id IN (SELECT value FROM json_each(?))",
+        (json.dumps([record.candidate_id for record in records]),),
+    )
+
+
+async def import_candidates(documents: AsyncIterable[Document]) -> dict:
+    """Validate and store every document; returns counts, timings and one error per rejected document."""
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    workers = settings.import_workers or os.cpu_count() or 1
+    pool = get_validation_pool(settings.import_workers)
+    report = {"accepted": 0, "rejected": 0, "errors": [], "batches": 0}
+    in_flight: deque[asyncio.Future] = deque()
+    accepted: list[ValidatedRecord] = []
+
+    def reject(key: str, error: str) -> None:
+        report["rejected"] += 1
+        report["errors"].append({"record": key, "error": error})
+
+    async def write(records: list[ValidatedRecord]) -> None:
+        await commit_write(_store_candidates, records)
+        forget_candidates([record.candidate_id for record in records])
+        report["accepted"] += len(records)
+        report["batches"] += 1
+
+    async def drain(limit: int) -> None:
+        # Oldest chunk first, so errors are reported in input order
+        while len(in_flight) > limit:
+            for record in await in_flight.popleft():
+                if record.error is None and not CANDIDATE_ID_RE.fullmatch(record.candidate_id):
+                    record.error = f"Invalid candidate id {record.candidate_id!r}"
+                if record.error is not None:
+                    reject(record.key, record.error)
+                else:
+                    accepted.append(record)
+            while len(accepted) >= settings.import_batch_size:
+                await write(accepted[: settings.import_batch_size])
+                del accepted[: settings.import_batch_size]
+
+    chunk: list[tuple[str, str | None, bytes]] = []
+    async for key, candidate_id, raw in documents:
+        if raw is None:
+            reject(key, f"Document exceeds {settings.import_max_document_mb} MB")
+            continue
+        chunk.append((key, candidate_id, raw))
+        if len(chunk) >= settings.import_chunk_size:
+            in_flight.append(loop.run_in_executor(pool, validate_chunk, chunk))
+            chunk = []
+            # Bounded look-ahead: enough to keep every worker busy, never the whole import
+            await drain(2 * workers)
+    if chunk:
+        in_flight.append(loop.run_in_executor(pool, validate_chunk, chunk))
+    await drain(0)
+    if accepted:
+        await write(accepted)
+
+    elapsed = time.perf_counter() - started
+    processed = report["accepted"] + report["rejected"]
+    report["elapsed_ms"] = round(elapsed * 1000, 1)
+    report["candidates_per_second"] = round(processed / elapsed, 1) if elapsed else None
+    logger.info(
+        "Imported %s candidates (%s rejected) in %s batches, %.0f ms",
+        report["accepted"],
+        report["rejected"],
+        report["batches"],
+        report["elapsed_ms"],
+    )
+    return report
@@ -1,34 +1,50 @@
+import asyncio
+import hashlib
 import json
+import logging
+import re
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 
 from app.config import settings
-from app.database import get_db
-from app.models import Candidate, WorkExperience
-
-# In-memory cache: candidate_id -> Candidate
-_candidates: dict[str, Candidate] = {}
-_profile_json: dict[str, str] = {}
-
-
-def _slug_to_name_parts(slug: str) -> tuple[str, str, str | None]:
-    parts = slug.replace("_", " ").replace(".", " ").replace("-", " ").split()
-    titled = [part.title() for part in parts]
-    if not titled:
-        return "Unknown", "Candidate", None
-    if len(titled) == 1:
-        return titled[0], titled[0], None
-    if len(titled) == 2:
-        return titled[0], titled[1], None
-    return titled[0], titled[-1], " ".join(titled[1:-1])
-
-
-def _candidate_to_name_parts(candidate: Candidate) -> tuple[str, str, str | None] | None:
-    first_name = (candidate.first_name or "").strip()
-    last_name = (candidate.last_name or "").strip()
-    middle_name = (candidate.middle_name or "").strip()
-    if not first_name or not last_name:
-        return None
-    return first_name, last_name, middle_name or None
+from app.database import commit_write, read_db, write_db
+from app.models import Candidate, PatchOperation, WorkExperience
+from app.services.candidate_cache import CachedCandidate, CandidateCache
+from app.services.candidate_validation import validate_chunk, validate_record, validate_records
+from app.services.profile_patch import JsonEdit, apply_patch, patch_expression
+from app.services.profile_renderer import render_candidate
+from app.services import token_counter
+from app.services.profile_retrieval import ProfileIndex, build_index, render_retrieved_context
+from app.services.response_cache import invalidate_candidate
+
+# In-memory cache: candidate_id -> canonical JSON bytes and derived renderings, loaded on demand
+_candidates = CandidateCache(
+    settings.candidates_cache_max_entries, settings.candidates_cache_max_mb * 1024 * 1024
+)
+
+_load_stats: dict = {"loads": 0, "last": None}
+
+# Ids that matched neither a DB row nor a file -> monotonic expiry, oldest first
+_missing: dict[str, float] = {}
+# Cache misses being looked up, shared by concurrent requests for the same id
+_pending_lookups: dict[str, asyncio.Task] = {}
+_lookup_stats = {"lookups": 0, "coalesced": 0, "negative_hits": 0}
+# Background renderings of freshly saved profiles
+_prewarm_tasks: set[asyncio.Task] = set()
+
+# Ids that may name a file in data_dir
+CANDIDATE_ID_RE = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+
+logger = logging.getLogger(__name__)
+
+UPSERT_CANDIDATE_SQL = (
+    "INSERT INTO candidates (id, first_name, last_name, middle_name, work_experience) "
+    "VALUES (?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET first_name = excluded.first_name, "
+    "last_name = excluded.last_name, middle_name = excluded.middle_name, "
+    "work_experience = excluded.work_experience, version = candidates.version + 1"
+)
 
 
 def _candidate_from_json(raw_json: str) -> Candidate:
@@ -39,108 +55,446 @@ def _candidate_from_json(raw_json: str) -> Candidate:
     return Candidate(work_experience=legacy_profile)
 
 
-async def load_candidates():
-    """Scan data directory for candidate JSON files and register them."""
-    _candidates.clear()
-    _profile_json.clear()
-    data_dir = Path(settings.data_dir)
+def _cache_candidate(candidate_id: str, candidate_json: str, stored_hash: str | None = None) -> CachedCandidate:
+    """Cache a candidate; ``stored_hash`` is the hash of its DB JSON when that differs from ``candidate_json``."""
+    profile_hash = token_counter.content_hash(candidate_json)
+    entry = CachedCandidate(candidate_json.encode("utf-8"), profile_hash, stored_hash or profile_hash)
+    previous = _candidates.put(candidate_id, entry)
+    _missing.pop(candidate_id, None)
+    if previous is not None and previous.profile_hash != profile_hash:
+        token_counter.forget(previous.profile_hash)
+    return entry
 
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        "SELECT id, work_experience FROM candidates WHERE work_experience IS NOT NULL"
+
+def _cache_row(candidate_id: str, stored_json: str) -> CachedCandidate:
+    candidate = _candidate_from_json(stored_json)
+    return _cache_candidate(
+        candidate_id, candidate.model_dump_json(), stored_hash=token_counter.content_hash(stored_json)
     )
-    for row in rows:
-        candidate = _candidate_from_json(row["work_experience"])
-        _candidates[row["id"]] = candidate
-        _profile_json[row["id"]] = candidate.model_dump_json()
 
-    existing_rows = await db.execute_fetchall("SELECT id, work_experience FROM candidates")
-    existing_ids = {row["id"] for row in existing_rows}
-    existing_with_work = {row["id"] for row in existing_rows if row["work_experience"]}
 
-    if not data_dir.exists():
-        return
+def _forget_candidate(candidate_id: str) -> None:
+    _candidates.pop(candidate_id)
+
+
+def forget_candidates(candidate_ids: list[str]) -> None:
+    """Drop cached entries of candidates written behind the loader's back, e.g. by a bulk import."""
+    for candidate_id in candidate_ids:
+        entry = _candidates.pop(candidate_id)
+        if entry is not None:
+            token_counter.forget(entry.profile_hash)
+        _missing.pop(candidate_id, None)
 
-    for path in sorted(data_dir.glob("*.json")):
+
+def _merge_file_metadata(existing: Candidate, candidate: Candidate) -> Candidate:
+    """The DB copy wins; the file only fills in names and location it is missing."""
+    needs_metadata_update = (
+        (not existing.first_name and bool(candidate.first_name))
+        or (not existing.middle_name and bool(candidate.middle_name))
+        or (not existing.last_name and bool(candidate.last_name))
+        or (existing.location is None and candidate.location is not None)
+    )
+    if not needs_metadata_update:
+        return existing
+    return existing.model_copy(
+        update={
+            "first_name": candidate.first_name or existing.first_name,
+            "middle_name": candidate.middle_name or existing.middle_name,
+            "last_name": candidate.last_name or existing.last_name,
+            "location": candidate.location or existing.location,
+        }
+    )
+
+
+@dataclass
+class _FileChange:
+    path: str
+    candidate_id: str
+    mtime_ns: int
+    size: int
+    sha256: str
+    # Content awaiting validation; None when only the stat changed and the hash still matches the manifest
+    raw: bytes | None
+    # Hash of the candidate's DB JSON once this file is applied
+    work_experience_sha256: str | None = None
+    # Set by validation
+    candidate_json: str | None = None
+    names: tuple[str, str, str | None] | None = None
+
+
+def _scan_candidate_files(
+    data_dir: Path,
+    manifest: dict[str, tuple[int, int, str, str]],
+    row_hashes: dict[str, str],
+    timings: dict[str, float],
+) -> tuple[list[_FileChange], set[str]]:
+    """Stat every candidate file, reading and hashing only those whose stat moved.
+
+    Files whose hash moved too come back with their content, for ``_validate_file_changes``.
+
+    A file is also re-applied when its candidate's DB JSON changed since the last sync, since
+    the file may fill in names or a location the new DB copy lacks.
+    """
+    changes: list[_FileChange] = []
+    seen: set[str] = set()
+    if not data_dir.exists():
+        return changes, seen
+    started = time.perf_counter()
+    stats = [(path, path.stat()) for path in sorted(data_dir.glob("*.json"))]
+    timings["scan"] = time.perf_counter() - started
+    timings["hash"] = 0.0
+    for path, stat in stats:
+        key = str(path.resolve())
+        seen.add(key)
         candidate_id = path.stem
-        data = json.loads(path.read_text(encoding="utf-8"))
-
-        candidate = Candidate.model_validate(data)
-        work_experience_json = candidate.model_dump_json()
-
-        name_parts = _candidate_to_name_parts(candidate)
-        if name_parts is None:
-            name_parts = _slug_to_name_parts(candidate_id)
-        first_name, last_name, middle_name = name_parts
-        if candidate_id in existing_ids:
-            work_experience_to_store = work_experience_json
-            candidate_to_cache = candidate
-            if candidate_id in existing_with_work:
-                existing_candidate = _candidates[candidate_id]
-                candidate_to_cache = existing_candidate
-                needs_metadata_update = (
-                    (not existing_candidate.first_name and bool(candidate.first_name))
-                    or (not existing_candidate.middle_name and bool(candidate.middle_name))
-                    or (not existing_candidate.last_name and bool(candidate.last_name))
-                    or (existing_candidate.location is None and candidate.location is not None)
-                )
-                if needs_metadata_update:
-                    candidate_to_cache = existing_candidate.model_copy(
-                        update={
-                            "first_name": candidate.first_name or existing_candidate.first_name,
-                            "middle_name": candidate.middle_name or existing_candidate.middle_name,
-                            "last_name": candidate.last_name or existing_candidate.last_name,
-                            "location": candidate.location or existing_candidate.location,
-                        }
-                    )
-                work_experience_to_store = candidate_to_cache.model_dump_json()
+        known = manifest.get(key)
+        if known is not None and known[3] != row_hashes.get(candidate_id):
+            known = None
+        if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            continue
+        started = time.perf_counter()
+        raw = path.read_bytes()
+        sha256 = hashlib.sha256(raw).hexdigest()
+        timings["hash"] += time.perf_counter() - started
+        content = raw if known is None or known[2] != sha256 else None
+        changes.append(
+            _FileChange(
+                key,
+                candidate_id,
+                stat.st_mtime_ns,
+                stat.st_size,
+                sha256,
+                content,
+                None if content is not None else row_hashes[candidate_id],
+            )
+        )
+    return changes, seen
 
-            await db.execute(
-                "UPDATE candidates SET first_name = ?, last_name = ?, middle_name = ?, work_experience = ? "
-                "WHERE id = ?",
-                (
-                    first_name,
-                    last_name,
-                    middle_name,
-                    work_experience_to_store,
-                    candidate_id,
-                ),
+
+def _check(change: _FileChange, record) -> None:
+    if record.error is not None:
+        raise ValueError(f"Invalid candidate file {change.path}: {record.error}")
+    change.candidate_json, change.names, change.raw = record.candidate_json, record.names, None
+
+
+async def _validate_file_changes(changes: list[_FileChange], timings: dict[str, float]) -> None:
+    """Validate changed files, over the process pool once there are enough to pay for starting it."""
+    started = time.perf_counter()
+    pending = [change for change in changes if change.raw is not None]
+    documents = [(change.path, change.candidate_id, change.raw) for change in pending]
+    if len(documents) >= settings.import_parallel_min_documents:
+        records = await validate_records(documents, settings.import_workers, settings.import_chunk_size)
+    else:
+        records = await asyncio.to_thread(validate_chunk, documents)
+    for change, record in zip(pending, records):
+        _check(change, record)
+    timings["validate"] = time.perf_counter() - started
+
+
+async def _apply_file_changes(
+    changes: list[_FileChange], vanished: list[tuple[str]], timings: dict[str, float], replace: bool = False
+) -> int:
+    """Upsert changed files' candidates and the manifest in one transaction, then cache them.
+
+    With ``replace`` the file's content replaces the DB copy instead of only filling in its names.
+    """
+    started = time.perf_counter()
+    to_cache = []
+    candidate_rows = []
+    if changes or vanished:
+        async with write_db() as db:
+            existing = {}
+            changed_ids = [change.candidate_id for change in changes if change.candidate_json is not None]
+            if changed_ids and not replace:
+                rows = await db.execute_fetchall(
+                    "SELECT id, work_experience FROM candidates WHERE id IN (SELECT value FROM json_each(?)) "
+                    "AND work_experience IS NOT NULL",
+                    (json.dumps(changed_ids),),
+                )
+                existing = {row["id"]: _candidate_from_json(row["work_experience"]) for row in rows}
+            for change in changes:
+                if change.candidate_json is None:
+                    continue
+                first_name, last_name, middle_name = change.names
+                candidate_json = change.candidate_json
+                if change.candidate_id in existing:
+                    candidate = Candidate.model_validate_json(candidate_json)
+                    candidate_json = _merge_file_metadata(existing[change.candidate_id], candidate).model_dump_json()
+                change.work_experience_sha256 = token_counter.content_hash(candidate_json)
+                candidate_rows.append((change.candidate_id, first_name, last_name, middle_name, candidate_json))
+                to_cache.append((change.candidate_id, candidate_json))
+            await db.executemany(UPSERT_CANDIDATE_SQL, candidate_rows)
+            await db.executemany(
+                "INSERT INTO candidate_files (path, candidate_id, mtime_ns, size, sha256, work_experience_sha256) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET candidate_id = excluded.candidate_id, "
+                "mtime_ns = excluded.mtime_ns, size = excluded.size, sha256 = excluded.sha256, "
+                "work_experience_sha256 = excluded.work_experience_sha256, loaded_at = CURRENT_TIMESTAMP",
+                [(c.path, c.candidate_id, c.mtime_ns, c.size, c.sha256, c.work_experience_sha256) for c in changes],
             )
-            _candidates[candidate_id] = candidate_to_cache
-            _profile_json[candidate_id] = work_experience_to_store
-        else:
+            await db.executemany("DELETE FROM candidate_files WHERE path = ?", vanished)
+    timings["write"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for candidate_id, candidate_json in to_cache:
+        _cache_candidate(candidate_id, candidate_json)
+    timings["cache"] = time.perf_counter() - started
+    return len(candidate_rows)
+
+
+async def load_candidates():
+    """Sync the cache with the DB and ``data_dir``, re-validating only rows and files that changed."""
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    rows_revalidated = 0
+    row_hashes = {}
+    async with read_db() as db:
+        # Streamed, so a large pool is never held in memory at once
+        async with db.execute("SELECT id, work_experience FROM candidates") as cursor:
+            async for row in cursor:
+                if not row["work_experience"]:
+                    continue
+                stored_hash = row_hashes[row["id"]] = token_counter.content_hash(row["work_experience"])
+                entry = _candidates.peek(row["id"])
+                if entry is not None and entry.stored_hash != stored_hash:
+                    # Only cached candidates are refreshed; the rest load on demand
+                    _cache_row(row["id"], row["work_experience"])
+                    rows_revalidated += 1
+        manifest_rows = await db.execute_fetchall(
+            "SELECT path, mtime_ns, size, sha256, work_experience_sha256 FROM candidate_files"
+        )
+    for candidate_id in set(_candidates) - row_hashes.keys():
+        _forget_candidate(candidate_id)
+    timings["rows"] = time.perf_counter() - started
+
+    manifest = {row["path"]: tuple(row)[1:] for row in manifest_rows}
+    changes, seen = await asyncio.to_thread(
+        _scan_candidate_files, Path(settings.data_dir), manifest, row_hashes, timings
+    )
+    await _validate_file_changes(changes, timings)
+
+    vanished = [(path,) for path in manifest.keys() - seen]
+    changed = await _apply_file_changes(changes, vanished, timings)
+
+    _load_stats["loads"] += 1
+    _load_stats["last"] = {
+        "files": len(seen),
+        "files_changed": changed,
+        "files_touched": len(changes) - changed,
+        "rows_revalidated": rows_revalidated,
+        "phases_ms": {phase: round(seconds * 1000, 2) for phase, seconds in timings.items()},
+        "total_ms": round(sum(timings.values()) * 1000, 2),
+    }
+    logger.info(
+        "Loaded candidates in %.1f ms: %s files, %s changed, %s DB rows re-validated %s",
+        _load_stats["last"]["total_ms"],
+        len(seen),
+        changed,
+        rows_revalidated,
+        _load_stats["last"]["phases_ms"],
+    )
+
+
+def _read_candidate_file(path: Path) -> _FileChange:
+    stat = path.stat()
+    raw = path.read_bytes()
+    change = _FileChange(
+        str(path.resolve()), path.stem, stat.st_mtime_ns, stat.st_size, hashlib.sha256(raw).hexdigest(), raw
+    )
+    _check(change, validate_record(change.path, change.candidate_id, raw))
+    return change
+
+
+def _remember_missing(candidate_id: str) -> None:
+    _missing[candidate_id] = time.monotonic() + settings.candidates_negative_cache_ttl_seconds
+    while len(_missing) > settings.candidates_negative_cache_max_entries:
+        del _missing[next(iter(_missing))]
+
+
+async def _lookup_candidate(candidate_id: str) -> CachedCandidate | None:
+    _lookup_stats["lookups"] += 1
+    async with read_db() as db:
+        rows = await db.execute_fetchall("SELECT work_experience FROM candidates WHERE id = ?", (candidate_id,))
+    if rows and rows[0]["work_experience"]:
+        stored_json = rows[0]["work_experience"]
+        candidate = await asyncio.to_thread(_candidate_from_json, stored_json)
+        return _cache_candidate(
+            candidate_id, candidate.model_dump_json(), stored_hash=token_counter.content_hash(stored_json)
+        )
+    path = Path(settings.data_dir) / f"{candidate_id}.json"
+    if CANDIDATE_ID_RE.fullmatch(candidate_id) and path.is_file():
+        change = await asyncio.to_thread(_read_candidate_file, path)
+        await _apply_file_changes([change], [], {})
+        return _candidates.peek(candidate_id)
+    _remember_missing(candidate_id)
+    return None
+
+
+def _forget_lookup(candidate_id: str, task: asyncio.Task) -> None:
+    if _pending_lookups.get(candidate_id) is task:
+        del _pending_lookups[candidate_id]
+
+
+async def _load_entry(candidate_id: str) -> CachedCandidate | None:
+    """The cached entry, else its DB row or its file; unknown ids are remembered for a while.
+
+    Concurrent misses for the same id share one lookup.
+    """
+    entry = _candidates.get(candidate_id)
+    if entry is not None:
+        return entry
+    expires_at = _missing.get(candidate_id)
+    if expires_at is not None:
+        if expires_at > time.monotonic():
+            _lookup_stats["negative_hits"] += 1
+            return None
+        del _missing[candidate_id]
+    task = _pending_lookups.get(candidate_id)
+    if task is None:
+        task = asyncio.create_task(_lookup_candidate(candidate_id))
+        _pending_lookups[candidate_id] = task
+        task.add_done_callback(lambda done: _forget_lookup(candidate_id, done))
+    else:
+        _lookup_stats["coalesced"] += 1
+    # A caller going away must not cancel the lookup for the others
+    return await asyncio.shield(task)
+
+
+async def load_candidate(candidate_id: str) -> Candidate | None:
+    """The candidate's model, loading it into the cache on a miss."""
+    entry = await _load_entry(candidate_id)
+    return entry.model() if entry is not None else None
+
+
+async def ensure_loaded(candidate_id: str) -> bool:
+    """Make sure the candidate is cached, so the synchronous getters below can read it."""
+    return await _load_entry(candidate_id) is not None
+
+
+def _render_prompt_parts(entry: CachedCandidate, with_index: bool) -> tuple[str, ProfileIndex | None]:
+    candidate = entry.model()
+    text = entry.text if entry.text is not None else render_candidate(candidate)
+    index = entry.index if entry.index is not None or not with_index else build_index(candidate)
+    return text, index
+
+
+async def _prepare_entry(candidate_id: str, entry: CachedCandidate) -> None:
+    with_index = settings.profile_prompt_mode == "retrieval"
+    if entry.text is not None and (entry.index is not None or not with_index):
+        return
+    text, index = await asyncio.to_thread(_render_prompt_parts, entry, with_index)
+    # A save while rendering replaced the entry; its own preparation covers the new version
+    if _candidates.peek(candidate_id) is not entry:
+        return
+    before = entry.nbytes
+    entry.text, entry.index = text, index
+    _candidates.resize(candidate_id, entry.nbytes - before)
+
+
+async def ensure_prompt_context(candidate_id: str) -> bool:
+    """Load the candidate and build its prompt rendering and retrieval index off the event loop.
+
+    Callers of ``get_profile_prompt_context`` await this first so the getter only reads.
+    """
+    entry = await _load_entry(candidate_id)
+    if entry is None:
+        return False
+    await _prepare_entry(candidate_id, entry)
+    return True
+
+
+def _prewarm_prompt_context(candidate_id: str, entry: CachedCandidate) -> None:
+    """Render a freshly saved profile in the background so the next chat request is a hit."""
+
+    async def _warm() -> None:
+        try:
+            await _prepare_entry(candidate_id, entry)
+        except Exception:
+            logger.exception("Failed to prepare profile prompt context")
+
+    task = asyncio.create_task(_warm())
+    _prewarm_tasks.add(task)
+    task.add_done_callback(_prewarm_tasks.discard)
+
+
+async def reload_candidate_file(path: Path) -> bool:
+    """Apply one added or edited file; False if only its stat changed.
+
+    An edit seen while running is newer than the DB copy, so the file's content replaces it.
+    """
+    change = await asyncio.to_thread(_read_candidate_file, path)
+    async with read_db() as db:
+        rows = await db.execute_fetchall("SELECT sha256 FROM candidate_files WHERE path = ?", (change.path,))
+    if rows and rows[0]["sha256"] == change.sha256:
+        async with write_db() as db:
             await db.execute(
-                "INSERT INTO candidates (id, first_name, last_name, middle_name, work_experience) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (candidate_id, first_name, last_name, middle_name, work_experience_json),
+                "UPDATE candidate_files SET mtime_ns = ?, size = ? WHERE path = ?",
+                (change.mtime_ns, change.size, change.path),
             )
-            _candidates[candidate_id] = candidate
-            _profile_json[candidate_id] = work_experience_json
-    await db.commit()
+        return False
+    await _apply_file_changes([change], [], {}, replace=True)
+    await invalidate_candidate(change.candidate_id)
+    return True
+
+
+async def remove_candidate_file(path: Path) -> bool:
+    """Forget a deleted file; its candidate is removed too unless conversations still reference it."""
+    candidate_id = path.stem
+    async with write_db() as db:
+        await db.execute("DELETE FROM candidate_files WHERE path = ?", (str(path.resolve()),))
+        cursor = await db.execute(
+            "DELETE FROM candidates WHERE id = ? AND NOT EXISTS (SELECT 1 FROM conversations WHERE candidate_id = ?)",
+            (candidate_id, candidate_id),
+        )
+    if cursor.rowcount < 1:
+        return False
+    entry = _candidates.pop(candidate_id)
+    if entry is not None:
+        token_counter.forget(entry.profile_hash)
+    await invalidate_candidate(candidate_id)
+    return True
+
+
+def get_loader_stats() -> dict:
+    return {
+        **_load_stats,
+        "lookups": {**_lookup_stats, "negative_cache_size": len(_missing), "in_flight": len(_pending_lookups)},
+        "cache": _candidates.stats(),
+    }
 
 
 def get_candidate(candidate_id: str) -> Candidate | None:
-    return _candidates.get(candidate_id)
+    entry = _candidates.peek(candidate_id)
+    return entry.model() if entry is not None else None
 
 
 def get_candidate_json(candidate_id: str) -> str | None:
-    return _profile_json.get(candidate_id)
+    entry = _candidates.peek(candidate_id)
+    return entry.json.decode("utf-8") if entry is not None else None
 
 
-async def save_candidate(candidate_id: str, candidate: Candidate) -> None:
+async def save_candidate(candidate_id: str, candidate: Candidate) -> int | None:
+    """Replace a candidate's stored JSON; returns its new version."""
     candidate_json = candidate.model_dump_json()
-    db = await get_db()
-    await db.execute(
-        "UPDATE candidates SET work_experience = ? WHERE id = ?",
-        (candidate_json, candidate_id),
-    )
-    await db.commit()
-    _candidates[candidate_id] = candidate
-    _profile_json[candidate_id] = candidate_json
+    async with write_db() as db:
+        rows = await db.execute_fetchall(
+            "UPDATE candidates SET work_experience = ?, version = version + 1 WHERE id = ? RETURNING version",
+            (candidate_json, candidate_id),
+        )
+    entry = _cache_candidate(candidate_id, candidate_json)
+    token_counter.prewarm(entry.profile_hash, candidate)
+    _prewarm_prompt_context(candidate_id, entry)
+    await invalidate_candidate(candidate_id)
+    return rows[0]["version"] if rows else None
+
+
+async def get_profile_version(candidate_id: str) -> int | None:
+    async with read_db() as db:
+        rows = await db.execute_fetchall("SELECT version FROM candidates WHERE id = ?", (candidate_id,))
+    return rows[0]["version"] if rows else None
 
 
 def get_profile(candidate_id: str) -> WorkExperience | None:
-    candidate = _candidates.get(candidate_id)
+    candidate = get_candidate(candidate_id)
     return candidate.work_experience if candidate else None
 
 
@@ -148,10 +502,136 @@ def get_profile_json(candidate_id: str) -> str | None:
     return get_candidate_json(candidate_id)
 
 
-async def save_profile(candidate_id: str, profile: WorkExperience) -> None:
+def get_profile_text(candidate_id: str) -> str | None:
+    """Compact prompt rendering of the candidate, rendered once per cached version."""
+    entry = _candidates.peek(candidate_id)
+    if entry is None:
+        return None
+    if entry.text is None:
+        before = entry.nbytes
+        entry.text = render_candidate(entry.model())
+        _candidates.resize(candidate_id, entry.nbytes - before)
+    return entry.text
+
+
+def get_profile_hash(candidate_id: str) -> str | None:
+    entry = _candidates.peek(candidate_id)
+    return entry.profile_hash if entry is not None else None
+
+
+def get_response_body(
+    candidate_id: str, kind: str, etag: str, render: Callable[[Candidate], bytes]
+) -> bytes | None:
+    """A response body built from the candidate by ``render``, serialized once per version and ``etag``.
+
+    One body per ``kind`` is kept on the cached entry; a new ETag replaces it.
+    """
+    entry = _candidates.peek(candidate_id)
+    if entry is None:
+        return None
+    cached = entry.responses.get(kind) if entry.responses is not None else None
+    if cached is not None and cached[0] == etag:
+        return cached[1]
+    body = render(entry.model())
+    before = entry.nbytes
+    entry.responses = {**(entry.responses or {}), kind: (etag, body)}
+    _candidates.resize(candidate_id, entry.nbytes - before)
+    return body
+
+
+async def get_profile_token_breakdown(candidate_id: str) -> dict[str, int] | None:
+    """Token counts of the candidate's prompt rendering, per section and in total."""
+    entry = _candidates.peek(candidate_id)
+    if entry is None:
+        return None
+    # Validated only on a memo miss, in the counting thread
+    return await token_counter.get_token_breakdown(entry.profile_hash, entry.model)
+
+
+def get_profile_prompt_context(candidate_id: str, query: str | None = None) -> str | None:
+    """Candidate data for a system prompt: the full rendering, or outline plus top sections for ``query``.
+
+    Builds anything ``ensure_prompt_context`` has not already prepared, on the caller's thread.
+    """
+    text = get_profile_text(candidate_id)
+    entry = _candidates.peek(candidate_id)
+    if settings.profile_prompt_mode != "retrieval" or not query or entry is None:
+        return text
+    if entry.index is None:
+        before = entry.nbytes
+        entry.index = build_index(entry.model())
+        _candidates.resize(candidate_id, entry.nbytes - before)
+    return render_retrieved_context(entry.index, query, settings.profile_retrieval_top_k)
+
+
+async def save_profile(candidate_id: str, profile: WorkExperience) -> int | None:
     """Persist validated WorkExperience into a Candidate and update cache/DB."""
-    existing = _candidates.get(candidate_id)
+    existing = await load_candidate(candidate_id)
     if existing is None:
         raise ValueError(f"Candidate not found: {candidate_id}")
     updated = existing.model_copy(update={"work_experience": profile})
-    await save_candidate(candidate_id, updated)
+    return await save_candidate(candidate_id, updated)
+
+
+class ProfileVersionConflict(Exception):
+    """The stored profile is no longer at the version a patch was made against."""
+
+    def __init__(self, version: int) -> None:
+        super().__init__(f"Profile is at version {version}")
+        self.version = version
+
+
+async def _store_patch(
+    db, candidate_id: str, version: int, entry: CachedCandidate, edits: list[JsonEdit]
+) -> tuple[int, str | None] | None:
+    """The new version and stored JSON; the current version and None on a conflict; None for no such row."""
+    rows = await db.execute_fetchall("SELECT version, work_experience FROM candidates WHERE id = ?", (candidate_id,))
+    if not rows:
+        return None
+    current, stored = rows[0]["version"], rows[0]["work_experience"]
+    # The patch was applied to the cached copy; it must still be what the row holds
+    if current != version or token_counter.content_hash(stored) != entry.stored_hash:
+        return current, None
+    if entry.stored_hash == entry.profile_hash:
+        expression, params = patch_expression("work_experience", edits)
+    else:
+        # A legacy row: patch the canonical JSON its paths were resolved against
+        expression, params = patch_expression("?", edits)
+        params.insert(0, entry.json.decode("utf-8"))
+    rows = await db.execute_fetchall(
+        f"UPDATE candidates SET work_experience = {expression}, version = version + 1 WHERE id = ? "
+        "RETURNING version, work_experience",
+        (*params, candidate_id),
+    )
+    return rows[0]["version"], rows[0]["work_experience"]
+
+
+async def patch_profile(candidate_id: str, version: int, operations: list[PatchOperation]) -> int | None:
+    """Apply JSON Patch ``operations`` to a candidate's work experience if it is still at ``version``.
+
+    Only the values the operations write are validated, and only the paths they touch are
+    rewritten in the stored JSON. Returns the new version, or None for an unknown candidate;
+    raises ``PatchError`` for a patch that does not apply and ``ProfileVersionConflict``.
+    """
+    entry = await _load_entry(candidate_id)
+    if entry is None:
+        return None
+    document = json.loads(entry.json)
+    edits = apply_patch(document["work_experience"], operations)
+    if not edits:
+        current = await get_profile_version(candidate_id)
+        if current != version:
+            raise ProfileVersionConflict(current)
+        return current
+    result = await commit_write(_store_patch, candidate_id, version, entry, edits)
+    if result is None:
+        _forget_candidate(candidate_id)
+        return None
+    new_version, stored = result
+    if stored is None:
+        # Drop the cached copy in case another process changed the row
+        _forget_candidate(candidate_id)
+        raise ProfileVersionConflict(new_version)
+    _prewarm_prompt_context(candidate_id, _cache_candidate(candidate_id, stored))
+    await invalidate_candidate(candidate_id)
+    return new_version
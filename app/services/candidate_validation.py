@@ -0,0 +1,129 @@
+"""Candidate document validation, in-process or fanned out over a process pool.
+
+Pydantic validation of a large ``Candidate`` is CPU bound, so batches of documents are
+validated in worker processes and come back as canonical JSON. Workers import only
+this module and ``app.models``; keep it free of settings and database imports.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from pydantic import ValidationError
+
+from app.models import Candidate
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+
+
+@dataclass(slots=True)
+class ValidatedRecord:
+    # Where the document came from: a file path, zip entry or JSONL line
+    key: str
+    candidate_id: str | None
+    candidate_json: str | None = None
+    # (first, last, middle) for the candidates table
+    names: tuple[str, str, str | None] | None = None
+    error: str | None = None
+
+
+def _slug_to_name_parts(slug: str) -> tuple[str, str, str | None]:
+    parts = slug.replace("_", " ").replace(".", " ").replace("-", " ").split()
+    titled = [part.title() for part in parts]
+    if not titled:
+        return "Unknown", "Candidate", None
+    if len(titled) == 1:
+        return titled[0], titled[0], None
+    if len(titled) == 2:
+        return titled[0], titled[1], None
+    return titled[0], titled[-1], " ".join(titled[1:-1])
+
+
+def _candidate_to_name_parts(candidate: Candidate) -> tuple[str, str, str | None] | None:
+    first_name = (candidate.first_name or "").strip()
+    last_name = (candidate.last_name or "").strip()
+    middle_name = (candidate.middle_name or "").strip()
+    if not first_name or not last_name:
+        return None
+    return first_name, last_name, middle_name or None
+
+
+def name_parts(candidate_id: str, candidate: Candidate) -> tuple[str, str, str | None]:
+    """Names for the candidates table: the profile's own, else ones made up from the id."""
+    return _candidate_to_name_parts(candidate) or _slug_to_name_parts(candidate_id)
+
+
+def describe_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'document'}: {error['msg']}"
+        for error in exc.errors(include_url=False)
+    )
+
+
+def validate_record(key: str, candidate_id: str | None, raw: bytes) -> ValidatedRecord:
+    """Validate one document; without ``candidate_id`` it is taken from the document's ``id`` field."""
+    record = ValidatedRecord(key, candidate_id)
+    try:
+        payload = json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        record.error = f"Invalid JSON: {exc}"
+        return record
+    if not isinstance(payload, dict):
+        record.error = "Document must be a JSON object"
+        return record
+    if candidate_id is None:
+        record.candidate_id = candidate_id = payload.pop("id", None)
+        if not isinstance(candidate_id, str) or not candidate_id:
+            record.error = "Document has no string id"
+            return record
+    try:
+        candidate = Candidate.model_validate(payload)
+    except ValidationError as exc:
+        record.error = describe_validation_error(exc)
+        return record
+    record.candidate_json = candidate.model_dump_json()
+    record.names = name_parts(candidate_id, candidate)
+    return record
+
+
+def validate_chunk(chunk: list[tuple[str, str | None, bytes]]) -> list[ValidatedRecord]:
+    """Worker entry point: validate a batch, so pickling costs one round trip per batch."""
+    return [validate_record(key, candidate_id, raw) for key, candidate_id, raw in chunk]
+
+
+def get_validation_pool(workers: int = 0) -> ProcessPoolExecutor:
+    """The shared pool, (re)created with ``workers`` processes (0: one per core)."""
+    global _pool, _pool_workers
+    workers = workers or os.cpu_count() or 1
+    if _pool is None or _pool_workers != workers:
+        shutdown_validation_pool()
+        # Forking a process that runs aiosqlite threads can deadlock; start clean workers instead
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_validation_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def validate_records(
+    records: Iterable[tuple[str, str | None, bytes]], workers: int = 0, chunk_size: int = 32
+) -> list[ValidatedRecord]:
+    """Validate documents across the pool; results are in input order."""
+    loop = asyncio.get_running_loop()
+    pool = get_validation_pool(workers)
+    records = list(records)
+    chunks = [records[i : i + chunk_size] for i in range(0, len(records), chunk_size)]
+    results = await asyncio.gather(*(loop.run_in_executor(pool, validate_chunk, chunk) for chunk in chunks))
+    return [record for chunk in results for record in chunk]
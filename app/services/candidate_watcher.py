@@ -0,0 +1,104 @@
+"""Hot reload of the candidate data directory.
+
+Polls ``data_dir`` for ``*.json`` files that were added, edited or deleted and applies
+each one on its own once it has stopped changing for ``candidates.watch_debounce_seconds``.
+The baseline is the candidate_files manifest written by ``load_candidates``, so nothing
+is rescanned or revalidated at startup beyond what the loader already did.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.database import read_db
+from app.services.candidate_loader import reload_candidate_file, remove_candidate_file
+
+logger = logging.getLogger(__name__)
+
+_stats = {"polls": 0, "reloaded": 0, "unchanged": 0, "removed": 0, "kept": 0, "failed": 0}
+
+
+def _snapshot(data_dir: Path) -> dict[str, tuple[int, int]]:
+    """Resolved path -> (mtime_ns, size) of every candidate file."""
+    if not data_dir.is_dir():
+        return {}
+    snapshot = {}
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                stat = entry.stat()
+                snapshot[str(Path(entry.path).resolve())] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+async def _manifest_snapshot() -> dict[str, tuple[int, int]]:
+    async with read_db() as db:
+        rows = await db.execute_fetchall("SELECT path, mtime_ns, size FROM candidate_files")
+    return {row["path"]: (row["mtime_ns"], row["size"]) for row in rows}
+
+
+async def _apply(path: str, stat: tuple[int, int] | None) -> None:
+    try:
+        if stat is None:
+            removed = await remove_candidate_file(Path(path))
+            _stats["removed" if removed else "kept"] += 1
+            if not removed:
+                logger.info("Candidate file %s deleted; keeping the candidate, conversations reference it", path)
+        elif await reload_candidate_file(Path(path)):
+            _stats["reloaded"] += 1
+            logger.info("Reloaded candidate file %s", path)
+        else:
+            _stats["unchanged"] += 1
+    except Exception:
+        # The previous version stays cached until the file changes again
+        _stats["failed"] += 1
+        logger.exception("Could not reload candidate file %s", path)
+
+
+async def run_candidate_watcher() -> None:
+    """Background task started from the app lifespan."""
+    if not settings.candidates_watch_enabled:
+        return
+    data_dir = Path(settings.data_dir)
+    # State the DB and caches reflect, and what the previous poll saw
+    applied = await _manifest_snapshot()
+    previous = dict(applied)
+    # Path -> when it was last seen changing
+    changed_at: dict[str, float] = {}
+    while True:
+        await asyncio.sleep(settings.candidates_watch_interval_seconds)
+        try:
+            current = await asyncio.to_thread(_snapshot, data_dir)
+        except OSError:
+            logger.exception("Could not scan %s", data_dir)
+            continue
+        _stats["polls"] += 1
+        now = time.monotonic()
+        for path in current.keys() | previous.keys():
+            if current.get(path) != previous.get(path):
+                changed_at[path] = now
+        previous = current
+        for path, seen_at in list(changed_at.items()):
+            if now - seen_at < settings.candidates_watch_debounce_seconds:
+                continue
+            del changed_at[path]
+            stat = current.get(path)
+            if stat == applied.get(path):
+                continue
+            await _apply(path, stat)
+            if stat is None:
+                applied.pop(path, None)
+            else:
+                applied[path] = stat
+
+
+def get_watcher_stats() -> dict:
+    return {
+        "enabled": settings.candidates_watch_enabled,
+        "interval_seconds": settings.candidates_watch_interval_seconds,
+        "debounce_seconds": settings.candidates_watch_debounce_seconds,
+        **_stats,
+    }
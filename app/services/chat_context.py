@@ -0,0 +1,267 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from app.config import settings
+from app.database import write_db
+from app.services.budget import get_budget_ledger, reserve_for
+from app.services.cost_tracker import log_request
+from app.services.llm import stream_chat
+from app.services.tokens import count_message_tokens, count_tokens, encoding_name_for_model
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HEADER = "=== EARLIER CONVERSATION SUMMARY ==="
+
+# Conversation -> last message id folded in by the summary refresh currently running for it
+_summarizing: dict[int, int] = {}
+_summary_tasks: set[asyncio.Task] = set()
+
+
+@dataclass
+class SummaryRefresh:
+    """Turns that no longer fit the window, to be folded into the conversation's summary."""
+
+    conversation_id: int
+    # conversations.summary_generation the turns were read under
+    generation: int
+    previous_summary: str
+    turns: list[dict]
+    turn_tokens: int
+    model: str
+
+
+@dataclass
+class ContextWindow:
+    messages: list[dict[str, str]]
+    kept_turns: int
+    kept_tokens: int
+    summarized_tokens: int
+    pending_tokens: int
+    summary_refresh: SummaryRefresh | None = None
+
+
+def input_budget_for(model: str) -> int:
+    return int(settings.context_budgets.get(model, settings.context_default_budget_tokens))
+
+
+def _select_window(
+    system_prompt: str,
+    summary: str,
+    turns: list[dict],
+    budget: int,
+    encoding_name: str,
+) -> tuple[list[dict], list[dict], int, int]:
+    """Keep the newest turns that fit in the budget; return (kept, overflow, kept_tokens, overflow_tokens)."""
+    available = budget - count_tokens(system_prompt, encoding_name) - count_tokens(summary, encoding_name)
+    kept_tokens = 0
+    index = len(turns)
+    while index > 0:
+        cost = count_message_tokens(turns[index - 1], encoding_name)
+        # The newest turn is always sent, even when it alone exceeds the budget
+        if index < len(turns) and kept_tokens + cost > available:
+            break
+        kept_tokens += cost
+        index -= 1
+    kept = turns[index:]
+    overflow = turns[:index]
+    overflow_tokens = sum(count_message_tokens(turn, encoding_name) for turn in overflow)
+    return kept, overflow, kept_tokens, overflow_tokens
+
+
+async def build_context_messages(
+    db,
+    conversation_id: int,
+    system_prompt: str,
+    model: str,
+    edit: tuple[int, str] | None = None,
+    pending: str | None = None,
+    defer_summary: bool = False,
+) -> ContextWindow:
+    """Build the LLM message list for a conversation within the model's input budget.
+
+    Turns already folded into the stored rolling summary are replaced by it. Newer turns
+    that no longer fit are sent to a background task to extend the summary, so each
+    request only counts tokens and never waits on summarization.
+
+    ``edit`` is a (message id, new content) pair: the context is built as if that user
+    message had been rewritten and everything after it dropped, without writing anything.
+    ``pending`` is a new user message not stored yet, sent as the newest turn. With
+    ``defer_summary`` the refresh is left on the window for ``start_summary_refresh``, so a
+    caller can start it only once the turn it builds for is accepted.
+    """
+    summary_rows = await db.execute_fetchall(
+        "SELECT c.summary_generation, s.summary, s.summarized_through_id, s.summarized_tokens "
+        "FROM conversations c LEFT JOIN conversation_summaries s ON s.conversation_id = c.id WHERE c.id = ?",
+        (conversation_id,),
+    )
+    generation, summary, summarized_through_id, summarized_tokens = 0, "", 0, 0
+    if summary_rows:
+        row = summary_rows[0]
+        generation = row["summary_generation"]
+        if row["summary"] is not None:
+            summary, summarized_through_id, summarized_tokens = (
+                row["summary"], row["summarized_through_id"], row["summarized_tokens"]
+            )
+    if edit is not None and summarized_through_id >= edit[0]:
+        # The edit will invalidate this summary
+        summary, summarized_through_id, summarized_tokens = "", 0, 0
+
+    last_id = edit[0] if edit is not None else None
+    history = await db.execute_fetchall(
+        "SELECT id, role, content FROM messages "
+        "WHERE conversation_id = ? AND role != 'system' AND id > ? AND (? IS NULL OR id <= ?) ORDER BY id",
+        (conversation_id, summarized_through_id, last_id, last_id),
+    )
+    turns = [{"id": row["id"], "role": row["role"], "content": row["content"]} for row in history]
+    if edit is not None and turns and turns[-1]["id"] == edit[0]:
+        turns[-1]["content"] = edit[1]
+    if pending is not None:
+        turns.append({"id": None, "role": "user", "content": pending})
+
+    encoding_name = encoding_name_for_model(model)
+    kept, overflow, kept_tokens, overflow_tokens = await asyncio.to_thread(
+        _select_window, system_prompt, summary, turns, input_budget_for(model), encoding_name
+    )
+    refresh = None
+    if overflow:
+        refresh = SummaryRefresh(conversation_id, generation, summary, overflow, overflow_tokens, model)
+        if not defer_summary:
+            _schedule_summary_refresh(refresh)
+
+    system_content = system_prompt
+    if summary:
+        system_content = f"{system_prompt}\n\n{SUMMARY_HEADER}\n{summary}"
+    messages = [{"role": "system", "content": system_content}]
+    messages.extend({"role": turn["role"], "content": turn["content"]} for turn in kept)
+
+    logger.info(
+        "conversation %s context: kept %s turns / %s history tokens, summarized %s tokens, %s tokens pending summary",
+        conversation_id,
+        len(kept),
+        kept_tokens,
+        summarized_tokens,
+        overflow_tokens,
+    )
+    return ContextWindow(
+        messages=messages,
+        kept_turns=len(kept),
+        kept_tokens=kept_tokens,
+        summarized_tokens=summarized_tokens,
+        pending_tokens=overflow_tokens,
+        summary_refresh=refresh if defer_summary else None,
+    )
+
+
+def start_summary_refresh(window: ContextWindow) -> None:
+    """Start the summary refresh ``build_context_messages`` deferred, if it left one."""
+    if window.summary_refresh is not None:
+        _schedule_summary_refresh(window.summary_refresh)
+
+
+def _schedule_summary_refresh(refresh: SummaryRefresh) -> None:
+    if refresh.conversation_id in _summarizing:
+        return
+    _summarizing[refresh.conversation_id] = refresh.turns[-1]["id"]
+    task = asyncio.create_task(_refresh_summary(refresh))
+    _summary_tasks.add(task)
+    task.add_done_callback(_summary_tasks.discard)
+
+
+def _summary_prompt(previous_summary: str, turns: list[dict]) -> list[dict[str, str]]:
+    transcript = "\n\n".join(f"{turn['role'].upper()}: {turn['content']}" for turn in turns)
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You maintain a concise running summary of an interview between a hiring manager "
+                "and an AI assistant answering questions about a candidate. Merge the new turns into "
+                "the existing summary. Keep the questions asked, the facts given in answers and any "
+                "open threads. Reply with the updated summary only."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+                f"New turns:\n{transcript}"
+            ),
+        },
+    ]
+
+
+async def _refresh_summary(refresh: SummaryRefresh) -> None:
+    """Fold the turns into the summary; dropped if the summary was invalidated since they were read.
+
+    The call is paid, so it holds a budget reservation like a chat turn and is skipped while
+    the daily limit has no room for it; the turns stay pending and are retried next time.
+    """
+    conversation_id, turns = refresh.conversation_id, refresh.turns
+    summary_model = settings.context_summary_model or refresh.model
+    prompt = _summary_prompt(refresh.previous_summary, turns)
+    reservation = None
+    try:
+        reservation = await reserve_for(summary_model, prompt)
+        if reservation is None:
+            logger.info("Skipped summary refresh for conversation %s: daily limit reached", conversation_id)
+            return
+        summary = ""
+        usage = None
+        async for chunk in stream_chat(prompt, model=summary_model):
+            if chunk["type"] == "token":
+                summary += chunk["content"]
+            elif chunk["type"] == "usage":
+                usage = chunk
+        if usage:
+            await log_request(
+                conversation_id=conversation_id,
+                model_id=summary_model,
+                input_tokens=usage["input_tokens"],
+                output_tokens=usage["output_tokens"],
+                reservation=reservation,
+            )
+        if not summary.strip():
+            return
+        async with write_db() as db:
+            await db.execute(
+                """
+                INSERT INTO conversation_summaries
+                    (conversation_id, summary, summarized_through_id, summarized_tokens, updated_at)
+                SELECT ?, ?, ?, ?, CURRENT_TIMESTAMP
+                WHERE (SELECT summary_generation FROM conversations WHERE id = ?) = ?
+                ON CONFLICT(conversation_id) DO UPDATE SET
+                    summary = excluded.summary,
+                    summarized_through_id = excluded.summarized_through_id,
+                    summarized_tokens = conversation_summaries.summarized_tokens + excluded.summarized_tokens,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    conversation_id,
+                    summary.strip(),
+                    turns[-1]["id"],
+                    refresh.turn_tokens,
+                    conversation_id,
+                    refresh.generation,
+                ),
+            )
+    except Exception:
+        logger.exception("Failed to refresh summary for conversation %s", conversation_id)
+    finally:
+        # No-op once log_request has settled it
+        get_budget_ledger().release(reservation)
+        _summarizing.pop(conversation_id, None)
+
+
+async def invalidate_summary(db, conversation_id: int, from_message_id: int) -> None:
+    """Drop a summary that covers messages being edited or removed, and any refresh in flight that does.
+
+    A refresh of turns before ``from_message_id`` is still valid after the edit and is kept.
+    """
+    await db.execute(
+        "DELETE FROM conversation_summaries WHERE conversation_id = ? AND summarized_through_id >= ?",
+        (conversation_id, from_message_id),
+    )
+    if _summarizing.get(conversation_id, 0) >= from_message_id:
+        await db.execute(
+            "UPDATE conversations SET summary_generation = summary_generation + 1 WHERE id = ?", (conversation_id,)
+        )
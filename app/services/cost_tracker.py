@@ -1,102 +1,171 @@
-from app.database import get_db
-from app.services.llm import fetch_models, get_model_pricing
+import asyncio
+import json
+import logging
+
+from app.database import COST_ROLLUPS, cost_rollup_upsert, fill_cost_rollups, queue_write, read_db, write_db
+from app.services.budget import Reservation, get_budget_ledger
+from app.services.pricing import get_model_pricing
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Requests still waiting for a price, as of the reconciler's last pass
+_reconciler_stats: dict[str, int | float] = {"backlog": 0, "priced": 0, "passes": 0, "next_delay_seconds": 0}
+
+TODAY_TOTALS = """
+    SELECT
+        COALESCE(SUM(cost_usd), 0) AS total,
+        COALESCE(SUM(input_tokens + unpriced_input_tokens), 0) AS input_tokens,
+        COALESCE(SUM(output_tokens + unpriced_output_tokens), 0) AS output_tokens
+    FROM cost_daily
+    WHERE day = DATE('now')
+"""
+
+
+async def _insert_request(
+    db, conversation_id: int | None, model_id: str, input_tokens: int, output_tokens: int, cost_usd: float | None
+) -> None:
+    cursor = await db.execute(
+        "INSERT INTO llm_requests (conversation_id, model_id, input_tokens, output_tokens, cost_usd) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (conversation_id, model_id, input_tokens, output_tokens, cost_usd),
+    )
+    for table in COST_ROLLUPS:
+        await db.execute(cost_rollup_upsert(table, "id = :id"), {"sign": 1, "id": cursor.lastrowid})
+
 
 async def log_request(
     conversation_id: int | None,
     model_id: str,
     input_tokens: int,
     output_tokens: int,
+    reservation: Reservation | None = None,
 ) -> dict[str, float | int]:
-    """Log an LLM request and compute cost."""
+    """Log an LLM request and compute cost, settling its budget reservation if any.
+
+    The row is written with the next group commit; the ledger, and so the totals
+    returned here, reflect it immediately.
+    """
     pricing = get_model_pricing(model_id)
-    if pricing is None:
-        await fetch_models()
-        pricing = get_model_pricing(model_id)
     cost_usd = None
     if pricing:
         cost_usd = (
             input_tokens * pricing["input"] + output_tokens * pricing["output"]
         )
 
-    db = await get_db()
-    await db.execute(
-        "INSERT INTO llm_requests (conversation_id, model_id, input_tokens, output_tokens, cost_usd) "
-        "VALUES (?, ?, ?, ?, ?)",
-        (conversation_id, model_id, input_tokens, output_tokens, cost_usd),
-    )
-    await db.commit()
-    daily_totals_row = await db.execute_fetchall(
-        """
-        SELECT
-            COALESCE(SUM(cost_usd), 0) AS total,
-            COALESCE(SUM(input_tokens), 0) AS input_tokens,
-            COALESCE(SUM(output_tokens), 0) AS output_tokens
-        FROM llm_requests
-        WHERE DATE(created_at) = DATE('now')
-        """
-    )
+    queue_write(_insert_request, conversation_id, model_id, input_tokens, output_tokens, cost_usd)
+    get_budget_ledger().record(cost_usd, input_tokens, output_tokens, reservation)
+    return {"request_cost_usd": float(cost_usd or 0.0), **get_ledger_usage()}
+
+
+def get_ledger_usage() -> dict[str, float | int]:
+    """Today's totals from the in-memory ledger, which already counts requests not committed yet."""
+    totals = get_budget_ledger().totals()
     return {
-        "request_cost_usd": float(cost_usd or 0.0),
-        "daily_total_usd": float(daily_totals_row[0]["total"]),
-        "daily_input_tokens": int(daily_totals_row[0]["input_tokens"]),
-        "daily_output_tokens": int(daily_totals_row[0]["output_tokens"]),
+        "daily_total_usd": float(totals["daily_total_usd"]),
+        "daily_input_tokens": int(totals["daily_input_tokens"]),
+        "daily_output_tokens": int(totals["daily_output_tokens"]),
         "daily_limit_usd": float(settings.max_daily_cost_usd),
     }
 
 
-async def _backfill_missing_costs():
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        "SELECT id, model_id, input_tokens, output_tokens FROM llm_requests WHERE cost_usd IS NULL"
-    )
-    if not rows:
-        return
+async def seed_budget_ledger() -> None:
+    """Load today's totals from the cost rollup into the in-memory ledger; run at startup."""
+    async with read_db() as db:
+        rows = await db.execute_fetchall(TODAY_TOTALS)
+    get_budget_ledger().seed(float(rows[0]["total"]), int(rows[0]["input_tokens"]), int(rows[0]["output_tokens"]))
 
-    if any(get_model_pricing(row["model_id"]) is None for row in rows):
-        await fetch_models()
 
-    updated = False
+async def reconcile_missing_costs() -> int:
+    """Price one batch of NULL-cost requests; returns how many rows were priced."""
+    async with read_db() as db:
+        pending = await db.execute_fetchall(
+            "SELECT model_id, COUNT(*) AS n FROM llm_requests WHERE cost_usd IS NULL GROUP BY model_id"
+        )
+        backlog = sum(int(row["n"]) for row in pending)
+        # Rows of models without a known price stay NULL and must not crowd out the rest of the batch
+        priceable = [row["model_id"] for row in pending if get_model_pricing(row["model_id"])]
+        rows = []
+        if priceable:
+            rows = await db.execute_fetchall(
+                "SELECT id, model_id, input_tokens, output_tokens, DATE(created_at) AS day "
+                "FROM llm_requests WHERE cost_usd IS NULL AND model_id IN (SELECT value FROM json_each(?)) "
+                "ORDER BY id LIMIT ?",
+                (json.dumps(priceable), settings.cost_reconciler_batch_size),
+            )
+    updates = []
     for row in rows:
         pricing = get_model_pricing(row["model_id"])
-        if not pricing:
+        cost_usd = row["input_tokens"] * pricing["input"] + row["output_tokens"] * pricing["output"]
+        updates.append((cost_usd, row["id"], row["day"]))
+
+    if updates:
+        batch = {"ids": json.dumps([row_id for _, row_id, _ in updates])}
+        in_batch = "id IN (SELECT value FROM json_each(:ids))"
+        async with write_db() as db:
+            # Move the batch from the unpriced to the priced rollup columns
+            for table in COST_ROLLUPS:
+                await db.execute(cost_rollup_upsert(table, in_batch), {**batch, "sign": -1})
+            await db.executemany(
+                "UPDATE llm_requests SET cost_usd = ? WHERE id = ?",
+                [(cost_usd, row_id) for cost_usd, row_id, _ in updates],
+            )
+            for table in COST_ROLLUPS:
+                await db.execute(cost_rollup_upsert(table, in_batch), {**batch, "sign": 1})
+        ledger = get_budget_ledger()
+        ledger.record(sum(cost_usd for cost_usd, _, day in updates if day == ledger.day))
+
+    _reconciler_stats["backlog"] = backlog - len(updates)
+    _reconciler_stats["priced"] += len(updates)
+    _reconciler_stats["passes"] += 1
+    return len(updates)
+
+
+async def run_cost_reconciler() -> None:
+    """Background task started from the app lifespan.
+
+    Runs batches back to back while they make progress; when rows remain that cannot
+    be priced yet, waits with exponential backoff for the pricing refresher to catch up.
+    """
+    delay = settings.cost_reconciler_interval_seconds
+    while True:
+        try:
+            priced = await reconcile_missing_costs()
+        except Exception:
+            logger.exception("Cost reconciliation pass failed")
+            priced = 0
+        if priced == settings.cost_reconciler_batch_size:
             continue
-        cost_usd = (
-            row["input_tokens"] * pricing["input"]
-            + row["output_tokens"] * pricing["output"]
-        )
-        await db.execute(
-            "UPDATE llm_requests SET cost_usd = ? WHERE id = ?",
-            (cost_usd, row["id"]),
-        )
-        updated = True
+        if _reconciler_stats["backlog"] and not priced:
+            delay = min(delay * 2, settings.cost_reconciler_max_backoff_seconds)
+        else:
+            delay = settings.cost_reconciler_interval_seconds
+        _reconciler_stats["next_delay_seconds"] = delay
+        await asyncio.sleep(delay)
+
 
-    if updated:
-        await db.commit()
+def get_reconciler_stats() -> dict[str, int | float]:
+    return dict(_reconciler_stats)
+
+
+async def rebuild_cost_rollups() -> int:
+    """Recompute the daily and monthly rollups from llm_requests; returns the daily row count."""
+    async with write_db() as db:
+        await fill_cost_rollups(db)
+        rows = await db.execute_fetchall("SELECT COUNT(*) AS n FROM cost_daily")
+    return int(rows[0]["n"])
 
 
 async def get_daily_costs() -> list[dict]:
-    await _backfill_missing_costs()
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        """
-        SELECT
-            DATE(created_at) as day,
-            model_id,
-            SUM(cost_usd) as total,
-            COUNT(*) as calls,
-            COALESCE(SUM(input_tokens), 0) as input_tokens,
-            COALESCE(SUM(output_tokens), 0) as output_tokens
-        FROM llm_requests
-        WHERE cost_usd IS NOT NULL
-        GROUP BY DATE(created_at), model_id
-        ORDER BY day, model_id
-        """
-    )
-    model_ids = {row["model_id"] for row in rows}
-    if any(get_model_pricing(model_id) is None for model_id in model_ids):
-        await fetch_models()
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            """
+            SELECT day, model_id, cost_usd AS total, calls, input_tokens, output_tokens
+            FROM cost_daily
+            WHERE calls > 0
+            ORDER BY day, model_id
+            """
+        )
     return [
         {
             "date": row["day"],
@@ -118,26 +187,15 @@ async def get_daily_costs() -> list[dict]:
 
 
 async def get_monthly_costs() -> list[dict]:
-    await _backfill_missing_costs()
-    db = await get_db()
-    rows = await db.execute_fetchall(
-        """
-        SELECT
-            strftime('%Y-%m', created_at) as month,
-            model_id,
-            SUM(cost_usd) as total,
-            COUNT(*) as calls,
-            COALESCE(SUM(input_tokens), 0) as input_tokens,
-            COALESCE(SUM(output_tokens), 0) as output_tokens
-        FROM llm_requests
-        WHERE cost_usd IS NOT NULL
-        GROUP BY strftime('%Y-%m', created_at), model_id
-        ORDER BY month, model_id
-        """
-    )
-    model_ids = {row["model_id"] for row in rows}
-    if any(get_model_pricing(model_id) is None for model_id in model_ids):
-        await fetch_models()
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            """
+            SELECT month, model_id, cost_usd AS total, calls, input_tokens, output_tokens
+            FROM cost_monthly
+            WHERE calls > 0
+            ORDER BY month, model_id
+            """
+        )
     return [
         {
             "month": row["month"],
@@ -159,35 +217,20 @@ async def get_monthly_costs() -> list[dict]:
 
 
 async def get_today_cost_usage() -> dict[str, float | int]:
-    await _backfill_missing_costs()
-    db = await get_db()
-    row = await db.execute_fetchall(
-        """
-        SELECT
-            COALESCE(SUM(CASE WHEN DATE(created_at) = DATE('now') THEN cost_usd END), 0) AS daily_total,
-            COALESCE(SUM(CASE WHEN DATE(created_at) = DATE('now') THEN input_tokens END), 0) AS daily_input_tokens,
-            COALESCE(SUM(CASE WHEN DATE(created_at) = DATE('now') THEN output_tokens END), 0) AS daily_output_tokens,
-            COALESCE(SUM(cost_usd), 0) AS total
-        FROM llm_requests
-        """
-    )
+    async with read_db() as db:
+        today = await db.execute_fetchall(TODAY_TOTALS)
+        overall = await db.execute_fetchall("SELECT COALESCE(SUM(cost_usd), 0) AS total FROM cost_monthly")
     return {
-        "daily_total_usd": float(row[0]["daily_total"]),
-        "daily_input_tokens": int(row[0]["daily_input_tokens"]),
-        "daily_output_tokens": int(row[0]["daily_output_tokens"]),
-        "total_cost_usd": float(row[0]["total"]),
+        "daily_total_usd": float(today[0]["total"]),
+        "daily_input_tokens": int(today[0]["input_tokens"]),
+        "daily_output_tokens": int(today[0]["output_tokens"]),
+        "total_cost_usd": float(overall[0]["total"]),
         "daily_limit_usd": float(settings.max_daily_cost_usd),
     }
 
 
 async def is_daily_cost_limit_reached() -> bool:
-    await _backfill_missing_costs()
-    db = await get_db()
-    row = await db.execute_fetchall(
-        """
-        SELECT COALESCE(SUM(cost_usd), 0) AS total
-        FROM llm_requests
-        WHERE cost_usd IS NOT NULL AND DATE(created_at) = DATE('now')
-        """
-    )
-    return float(row[0]["total"]) >= settings.max_daily_cost_usd
+    ledger = get_budget_ledger()
+    if not ledger.seeded:
+        await seed_budget_ledger()
+    return ledger.is_limit_reached()
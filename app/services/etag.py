@@ -0,0 +1,41 @@
+"""Strong ETags and ``If-None-Match`` handling for responses served from cached bytes."""
+
+import hashlib
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Clients may keep the body but must revalidate before reusing it
+CACHE_CONTROL = "no-cache"
+
+
+def strong_etag(*parts: str | bytes) -> str:
+    """An ETag for a body fully determined by ``parts``."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else part.encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match compares weakly, so a W/ prefix still matches
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def etag_response(
+    request: Request, etag: str, body: bytes, media_type: str, headers: dict[str, str] | None = None
+) -> Response:
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def not_modified_response(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag, "Cache-Control": CACHE_CONTROL})
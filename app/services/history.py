@@ -0,0 +1,76 @@
+"""Keyset pagination over conversations and their messages.
+
+Conversations are ordered newest first by ``(updated_at, id)`` and messages oldest
+first by ``id``; each page returns the cursor of the page after it, so a page costs
+an index seek no matter how deep into the history it is.
+"""
+
+import base64
+import binascii
+import json
+
+CONVERSATION_COLUMNS = (
+    "c.*, TRIM(ca.first_name || ' ' || COALESCE(ca.middle_name || ' ', '') || ca.last_name) AS candidate_name"
+)
+
+
+def encode_cursor(updated_at: str, conversation_id: int) -> str:
+    raw = json.dumps([updated_at, conversation_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """Inverse of ``encode_cursor``; raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, conversation_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(updated_at, str) or not isinstance(conversation_id, int):
+        raise ValueError("Invalid cursor")
+    return updated_at, conversation_id
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+async def conversation_page(db, limit: int, cursor: str | None = None, title: str | None = None) -> dict:
+    """One page of conversations, most recently updated first; ``title`` keeps those whose title contains it."""
+    conditions = []
+    params: list = []
+    if cursor:
+        conditions.append("(c.updated_at, c.id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+    if title:
+        # LIKE ignores case for ASCII letters only
+        conditions.append("COALESCE(c.title, 'New Interview') LIKE ? ESCAPE '\\'")
+        params.append(_like_pattern(title))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = await db.execute_fetchall(
+        f"SELECT {CONVERSATION_COLUMNS} FROM conversations c "
+        f"JOIN candidates ca ON c.candidate_id = ca.id {where} "
+        "ORDER BY c.updated_at DESC, c.id DESC LIMIT ?",
+        (*params, limit + 1),
+    )
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(items[-1]["updated_at"], items[-1]["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def message_page(db, conversation_id: int, limit: int, before: int | None = None) -> dict:
+    """The newest ``limit`` messages older than ``before``, returned in chronological order."""
+    where = "conversation_id = ? AND role != 'system'"
+    params: list = [conversation_id]
+    if before is not None:
+        where += " AND id < ?"
+        params.append(before)
+    rows = await db.execute_fetchall(
+        f"SELECT * FROM messages WHERE {where} ORDER BY id DESC LIMIT ?",
+        (*params, limit + 1),
+    )
+    items = [dict(row) for row in reversed(rows[:limit])]
+    return {"items": items, "next_cursor": items[0]["id"] if len(rows) > limit else None}
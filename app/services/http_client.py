@@ -0,0 +1,72 @@
+import httpx
+
+from app.config import settings
+
+# Process-wide pooled client, created and closed by the app lifespan.
+_client: httpx.AsyncClient | None = None
+
+_stats: dict[str, int] = {
+    "requests": 0,
+    "connections_opened": 0,
+    "tls_handshakes": 0,
+}
+
+
+async def _trace(event_name: str, info: dict) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        _stats["connections_opened"] += 1
+    elif event_name == "connection.start_tls.complete":
+        _stats["tls_handshakes"] += 1
+
+
+async def _on_request(request: httpx.Request) -> None:
+    _stats["requests"] += 1
+    request.extensions["trace"] = _trace
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        http2=settings.http_http2,
+        timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+        event_hooks={"request": [_on_request]},
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    return get_http_client()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside the lifespan (e.g. tests)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_stats() -> dict[str, float | int | bool]:
+    requests = int(_stats["requests"])
+    opened = int(_stats["connections_opened"])
+    return {
+        "requests": requests,
+        "connections_opened": opened,
+        "connections_reused": max(requests - opened, 0),
+        "reuse_ratio": round(1 - opened / requests, 4) if requests else 0.0,
+        "tls_handshakes": int(_stats["tls_handshakes"]),
+        "http2": settings.http_http2,
+        "max_connections": settings.http_max_connections,
+        "max_keepalive_connections": settings.http_max_keepalive_connections,
+    }
@@ -1,14 +1,16 @@
 import json
+import time
+from collections import deque
 from collections.abc import AsyncGenerator
 
-import httpx
 from app.config import settings
+from app.services.http_client import get_http_client
 
 OPENROUTER_URL = settings.openrouter_url
 MODELS_URL = settings.models_url
 
-# Cached model pricing: model_id -> {input, output} price per token
-_pricing: dict[str, dict[str, float]] = {}
+# Recent time-to-first-token samples (seconds) for diagnostics
+_ttft_samples: deque[float] = deque(maxlen=200)
 
 
 def _headers() -> dict[str, str]:
@@ -21,23 +23,23 @@ def _headers() -> dict[str, str]:
 
 
 async def fetch_models() -> list[dict]:
-    """Fetch available models and cache pricing."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(MODELS_URL, headers=_headers(), timeout=15)
-        resp.raise_for_status()
-        data = resp.json().get("data", [])
-
-    for m in data:
-        pricing = m.get("pricing", {})
-        _pricing[m["id"]] = {
-            "input": float(pricing.get("prompt", "0")),
-            "output": float(pricing.get("completion", "0")),
-        }
-    return data
+    """Fetch the OpenRouter model catalog."""
+    client = get_http_client()
+    resp = await client.get(MODELS_URL, headers=_headers(), timeout=15)
+    resp.raise_for_status()
+    return resp.json().get("data", [])
 
 
-def get_model_pricing(model_id: str) -> dict[str, float] | None:
-    return _pricing.get(model_id)
+def get_ttft_stats() -> dict[str, float | int | None]:
+    samples = sorted(_ttft_samples)
+    if not samples:
+        return {"samples": 0, "avg_seconds": None, "p50_seconds": None, "p95_seconds": None}
+    return {
+        "samples": len(samples),
+        "avg_seconds": round(sum(samples) / len(samples), 4),
+        "p50_seconds": round(samples[len(samples) // 2], 4),
+        "p95_seconds": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+    }
 
 
 async def stream_chat(
@@ -57,39 +59,44 @@ async def stream_chat(
         "usage": {"include": True},
     }
 
-    async with httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=10.0)) as client:
-        async with client.stream(
-            "POST", OPENROUTER_URL, headers=_headers(), json=payload
-        ) as resp:
-            resp.raise_for_status()
-            async for line in resp.aiter_lines():
-                if not line.startswith("data: "):
-                    continue
-                data_str = line[6:]
-                if data_str.strip() == "[DONE]":
-                    break
-                try:
-                    chunk = json.loads(data_str)
-                except json.JSONDecodeError:
-                    continue
+    client = get_http_client()
+    started = time.perf_counter()
+    first_token = True
+    async with client.stream(
+        "POST", OPENROUTER_URL, headers=_headers(), json=payload
+    ) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data_str = line[6:]
+            if data_str.strip() == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data_str)
+            except json.JSONDecodeError:
+                continue
 
-                # Token content
-                choices = chunk.get("choices", [])
-                if choices:
-                    delta = choices[0].get("delta", {})
-                    content = delta.get("content")
-                    if content:
-                        yield {"type": "token", "content": content}
+            # Token content
+            choices = chunk.get("choices", [])
+            if choices:
+                delta = choices[0].get("delta", {})
+                content = delta.get("content")
+                if content:
+                    if first_token:
+                        _ttft_samples.append(time.perf_counter() - started)
+                        first_token = False
+                    yield {"type": "token", "content": content}
 
-                # Usage info (usually in the final chunk)
-                usage = chunk.get("usage")
-                if usage:
-                    prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens", 0))
-                    completion_tokens = usage.get(
-                        "completion_tokens", usage.get("output_tokens", 0)
-                    )
-                    yield {
-                        "type": "usage",
-                        "input_tokens": int(prompt_tokens or 0),
-                        "output_tokens": int(completion_tokens or 0),
-                    }
+            # Usage info (usually in the final chunk)
+            usage = chunk.get("usage")
+            if usage:
+                prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens", 0))
+                completion_tokens = usage.get(
+                    "completion_tokens", usage.get("output_tokens", 0)
+                )
+                yield {
+                    "type": "usage",
+                    "input_tokens": int(prompt_tokens or 0),
+                    "output_tokens": int(completion_tokens or 0),
+                }
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+import httpx
+
+from app.config import settings
+from app.database import read_db, write_db
+from app.services.llm import fetch_models
+
+logger = logging.getLogger(__name__)
+
+# Model pricing: model_id -> {input, output} price per token.
+# Loaded from SQLite at startup, refreshed in the background, never fetched on a request path.
+_pricing: dict[str, dict[str, float]] = {}
+_snapshot_loaded = False
+
+
+def _parse_pricing(pricing: dict) -> dict[str, float]:
+    return {
+        "input": float(pricing.get("prompt", "0") or 0),
+        "output": float(pricing.get("completion", "0") or 0),
+    }
+
+
+def _read_snapshot() -> dict[str, dict[str, float]]:
+    path = Path(settings.pricing_snapshot_path)
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {model_id: _parse_pricing(pricing) for model_id, pricing in data.get("pricing", {}).items()}
+
+
+def _load_snapshot_fallback() -> None:
+    global _snapshot_loaded
+    _snapshot_loaded = True
+    for model_id, pricing in _read_snapshot().items():
+        _pricing.setdefault(model_id, pricing)
+
+
+def get_model_pricing(model_id: str) -> dict[str, float] | None:
+    if model_id not in _pricing and not _snapshot_loaded:
+        _load_snapshot_fallback()
+    return _pricing.get(model_id)
+
+
+async def load_pricing() -> None:
+    """Load persisted pricing into memory, seeding the table from the bundled snapshot if empty."""
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT model_id, input_per_token, output_per_token FROM model_pricing"
+        )
+    if not rows:
+        snapshot = _read_snapshot()
+        async with write_db() as db:
+            await db.executemany(
+                "INSERT OR IGNORE INTO model_pricing (model_id, input_per_token, output_per_token, source) "
+                "VALUES (?, ?, ?, 'snapshot')",
+                [(model_id, p["input"], p["output"]) for model_id, p in snapshot.items()],
+            )
+        _pricing.update(snapshot)
+        return
+    for row in rows:
+        _pricing[row["model_id"]] = {
+            "input": float(row["input_per_token"]),
+            "output": float(row["output_per_token"]),
+        }
+
+
+async def _tracked_model_ids() -> set[str]:
+    async with read_db() as db:
+        rows = await db.execute_fetchall("SELECT DISTINCT model_id FROM llm_requests")
+    return set(settings.models) | {row["model_id"] for row in rows}
+
+
+async def refresh_pricing() -> int:
+    """Download the catalog and persist prices for configured and previously used models."""
+    tracked = await _tracked_model_ids()
+    catalog = await fetch_models()
+    updates = {
+        m["id"]: _parse_pricing(m.get("pricing", {}))
+        for m in catalog
+        if m.get("id") in tracked
+    }
+    if not updates:
+        return 0
+    async with write_db() as db:
+        await db.executemany(
+            """
+            INSERT INTO model_pricing (model_id, input_per_token, output_per_token, source, updated_at)
+            VALUES (?, ?, ?, 'openrouter', CURRENT_TIMESTAMP)
+            ON CONFLICT(model_id) DO UPDATE SET
+                input_per_token = excluded.input_per_token,
+                output_per_token = excluded.output_per_token,
+                source = excluded.source,
+                updated_at = excluded.updated_at
+            """,
+            [(model_id, p["input"], p["output"]) for model_id, p in updates.items()],
+        )
+    _pricing.update(updates)
+    return len(updates)
+
+
+async def run_pricing_refresher() -> None:
+    """Background task started from the app lifespan."""
+    while True:
+        try:
+            await refresh_pricing()
+        except (httpx.HTTPError, ValueError) as exc:
+            logger.warning("Model pricing refresh failed: %s", exc)
+        except Exception:
+            # Anything else (a DB error, an unexpected payload) must not end the refresher
+            logger.exception("Model pricing refresh failed")
+        await asyncio.sleep(settings.pricing_refresh_interval_seconds)
@@ -0,0 +1,259 @@
+"""RFC 6902 JSON Patch for a candidate's work experience.
+
+Paths are JSON Pointers into the ``WorkExperience`` document, e.g.
+``/work/3/roles/0/items/2/description``. Operations are applied in order to a parsed
+copy of the profile, and each value an operation writes is validated against the type
+the models declare at its path, never the whole document. The result is a list of edits
+for SQLite's ``json_set``/``json_remove`` on the stored candidate JSON, so only the
+touched fields are rewritten.
+
+Members the models do not declare are ignored, as they are when a whole document is
+validated; removing a declared member resets it to its default.
+"""
+
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from types import NoneType, UnionType
+from typing import Any, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.models import PatchOperation, WorkExperience
+from app.services.candidate_validation import describe_validation_error
+
+# Where the work experience sits in the stored candidate JSON
+ROOT = "$.work_experience"
+MAX_OPERATIONS = 200
+
+
+class PatchError(ValueError):
+    """An operation that cannot be applied to the document."""
+
+
+class PatchTestFailed(PatchError):
+    """A ``test`` operation did not match the document."""
+
+
+@dataclass(slots=True)
+class JsonEdit:
+    # "set" (json_set) or "remove" (json_remove)
+    kind: str
+    # SQLite JSON path
+    path: str
+    # JSON text, for "set"
+    value: str | None = None
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """JSON value equality per RFC 6902 4.6: key order does not matter, 1 equals 1.0, true does not equal 1."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, (dict, list)) or isinstance(b, (dict, list)):
+        return False
+    return a == b
+
+
+def _model(annotation: Any) -> type[BaseModel] | None:
+    # Optional[X] is walked into as X; the Optional itself still validates the value written
+    if get_origin(annotation) in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        annotation = args[0] if len(args) == 1 else annotation
+    return annotation if isinstance(annotation, type) and issubclass(annotation, BaseModel) else None
+
+
+def _child_type(annotation: Any, token: str) -> Any:
+    model = _model(annotation)
+    if model is not None:
+        if token not in model.model_fields:
+            raise PatchError(f"Unknown field {token!r}")
+        return model.model_fields[token].annotation
+    if get_origin(annotation) is list:
+        return get_args(annotation)[0]
+    raise PatchError(f"Cannot descend into {token!r}")
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _validate(annotation: Any, value: Any, pointer: str) -> Any:
+    adapter = _adapter(annotation)
+    try:
+        return adapter.dump_python(adapter.validate_python(value), mode="json")
+    except ValidationError as exc:
+        raise PatchError(f"{pointer or '/'}: {describe_validation_error(exc)}") from None
+
+
+def _index(token: str, length: int, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return length
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"Invalid array index {token!r}")
+    index = int(token)
+    if index > length or (index == length and not allow_end):
+        raise PatchError(f"Array index {index} out of range")
+    return index
+
+
+def _walk(document: dict, tokens: list[str]) -> tuple[dict | list, Any, str]:
+    """The container holding the target of ``tokens``, its declared type and its SQLite path."""
+    value, annotation, path = document, WorkExperience, ROOT
+    for token in tokens[:-1]:
+        annotation = _child_type(annotation, token)
+        if isinstance(value, list):
+            index = _index(token, len(value))
+            value, path = value[index], f"{path}[{index}]"
+        elif isinstance(value, dict) and token in value:
+            value, path = value[token], f"{path}.{token}"
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    if not isinstance(value, (dict, list)):
+        raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return value, annotation, path
+
+
+def _undeclared(container: dict | list, annotation: Any, token: str) -> bool:
+    model = _model(annotation)
+    return isinstance(container, dict) and model is not None and token not in model.model_fields
+
+
+def _get(document: dict, pointer: str) -> Any:
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return document
+    container, _annotation, _path = _walk(document, tokens)
+    if isinstance(container, list):
+        return container[_index(tokens[-1], len(container))]
+    if tokens[-1] not in container:
+        raise PatchError(f"Path not found: {pointer}")
+    return container[tokens[-1]]
+
+
+def _write(document: dict, pointer: str, value: Any, edits: list[JsonEdit], insert: bool) -> None:
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        value = _validate(WorkExperience, value, pointer)
+        document.clear()
+        document.update(value)
+        edits.append(JsonEdit("set", ROOT, _dumps(value)))
+        return
+    container, annotation, path = _walk(document, tokens)
+    token = tokens[-1]
+    if _undeclared(container, annotation, token):
+        return
+    value = _validate(_child_type(annotation, token), value, pointer)
+    if isinstance(container, dict):
+        # Declared members are always present, so adding one replaces it
+        container[token] = value
+        edits.append(JsonEdit("set", f"{path}.{token}", _dumps(value)))
+    elif not insert:
+        index = _index(token, len(container))
+        container[index] = value
+        edits.append(JsonEdit("set", f"{path}[{index}]", _dumps(value)))
+    else:
+        index = _index(token, len(container), allow_end=True)
+        container.insert(index, value)
+        if index == len(container) - 1:
+            edits.append(JsonEdit("set", f"{path}[#]", _dumps(value)))
+        else:
+            # SQLite cannot insert into the middle of an array; rewrite just this one
+            edits.append(JsonEdit("set", path, _dumps(container)))
+
+
+def _remove(document: dict, pointer: str, edits: list[JsonEdit]) -> Any:
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise PatchError("Cannot remove the whole document")
+    container, annotation, path = _walk(document, tokens)
+    token = tokens[-1]
+    if _undeclared(container, annotation, token):
+        return None
+    if isinstance(container, list):
+        index = _index(token, len(container))
+        edits.append(JsonEdit("remove", f"{path}[{index}]"))
+        return container.pop(index)
+    field = _model(annotation).model_fields[token]
+    if field.is_required():
+        raise PatchError(f"{pointer}: required field cannot be removed")
+    removed = container[token]
+    default = _validate(field.annotation, field.get_default(call_default_factory=True), pointer)
+    container[token] = default
+    edits.append(JsonEdit("set", f"{path}.{token}", _dumps(default)))
+    return removed
+
+
+def _apply(document: dict, operation: PatchOperation, edits: list[JsonEdit]) -> None:
+    if operation.op in ("add", "replace", "test") and "value" not in operation.model_fields_set:
+        raise PatchError(f"{operation.op} needs a value")
+    if operation.op in ("move", "copy") and operation.from_ is None:
+        raise PatchError(f"{operation.op} needs from")
+    if operation.op == "test":
+        if not _json_equal(_get(document, operation.path), operation.value):
+            raise PatchTestFailed(f"Test failed at {operation.path or '/'}")
+    elif operation.op == "add":
+        _write(document, operation.path, operation.value, edits, insert=True)
+    elif operation.op == "replace":
+        _write(document, operation.path, operation.value, edits, insert=False)
+    elif operation.op == "remove":
+        _remove(document, operation.path, edits)
+    elif operation.op == "copy":
+        _write(document, operation.path, _get(document, operation.from_), edits, insert=True)
+    else:
+        if operation.path.startswith(operation.from_ + "/"):
+            raise PatchError("Cannot move a value into itself")
+        value = _get(document, operation.from_)
+        _remove(document, operation.from_, edits)
+        _write(document, operation.path, value, edits, insert=True)
+
+
+def apply_patch(document: dict, operations: list[PatchOperation]) -> list[JsonEdit]:
+    """Apply ``operations`` to a work experience ``document`` in place; returns the matching SQLite edits.
+
+    Raises ``PatchError`` (``PatchTestFailed`` for a failed test) and leaves the stored
+    profile untouched if any operation fails.
+    """
+    if len(operations) > MAX_OPERATIONS:
+        raise PatchError(f"At most {MAX_OPERATIONS} operations per patch")
+    edits: list[JsonEdit] = []
+    for number, operation in enumerate(operations):
+        try:
+            _apply(document, operation, edits)
+        except PatchError as exc:
+            raise type(exc)(f"Operation {number}: {exc}") from None
+    return edits
+
+
+def patch_expression(base: str, edits: list[JsonEdit]) -> tuple[str, list[str]]:
+    """SQL applying ``edits`` to the JSON in ``base``, with its parameters; consecutive sets share a json_set."""
+    expression, params = base, []
+    previous = None
+    for edit in edits:
+        if edit.kind == "set" and previous == "set":
+            expression = expression[:-1] + ", ?, json(?))"
+            params += [edit.path, edit.value]
+        elif edit.kind == "set":
+            expression = f"json_set({expression}, ?, json(?))"
+            params += [edit.path, edit.value]
+        else:
+            expression = f"json_remove({expression}, ?)"
+            params.append(edit.path)
+        previous = edit.kind
+    return expression, params
@@ -0,0 +1,144 @@
+"""Token-lean text rendering of Candidate profiles for LLM prompts.
+
+Empty and default fields are dropped and date ranges are collapsed, so the prompt
+carries the profile's content without JSON keys, quotes and nulls.
+"""
+
+from app.models import (
+    Candidate,
+    DateRange,
+    Education,
+    EndDate,
+    Publication,
+    Role,
+    WorkEntry,
+    WorkItem,
+)
+
+
+def _date(year: int | None, month: int | None) -> str:
+    if not year:
+        return ""
+    return f"{year}-{month:02d}" if month else str(year)
+
+
+def render_span(start: DateRange, end: EndDate) -> str:
+    end_text = "present" if end.present else _date(end.year, end.month)
+    return f"{_date(start.year, start.month)}–{end_text}" if end_text else _date(start.year, start.month)
+
+
+def _join(parts, sep: str = " | ") -> str:
+    return sep.join(p for p in parts if p)
+
+
+def render_header(candidate: Candidate) -> str:
+    name = _join((candidate.first_name, candidate.middle_name, candidate.last_name), " ")
+    location = _join((candidate.location.city, candidate.location.country), ", ") if candidate.location else ""
+    return _join((name, location), " — ")
+
+
+def render_employer_line(entry: WorkEntry) -> str:
+    employer = entry.employer
+    return _join((employer.name, employer.sector, employer.location, render_span(entry.start, entry.end), employer.link))
+
+
+def render_role_line(role: Role) -> str:
+    kind = f"({role.employment_type})" if role.employment_type else ""
+    return _join((_join((role.title, kind), " "), render_span(role.start, role.end)))
+
+
+def render_work_item(item: WorkItem) -> str:
+    lines = [f"- {_join((item.title, item.description), ': ')}"]
+    if item.contribution:
+        lines.append(f"  Contribution: {item.contribution}")
+    return "\n".join(lines)
+
+
+def render_work_entry(entry: WorkEntry) -> str:
+    lines = [f"### {render_employer_line(entry)}"]
+    if entry.employer.description:
+        lines.append(entry.employer.description)
+    for role in entry.roles:
+        lines.append(f"#### {render_role_line(role)}")
+        lines.extend(render_work_item(item) for item in role.items)
+    return "\n".join(lines)
+
+
+def render_education(education: Education) -> str:
+    head = _join(
+        (
+            f"{education.degree}, {education.institution}",
+            render_span(education.start, education.end),
+            "" if education.completed else "not completed",
+            f"GPA {education.GPA}" if education.GPA else "",
+        ),
+        "; ",
+    )
+    lines = [f"- {head}"]
+    if education.subjects:
+        lines.append(f"  Subjects: {', '.join(education.subjects)}")
+    if education.notes:
+        lines.append(f"  Notes: {education.notes}")
+    dissertation = education.dissertation
+    if dissertation and (dissertation.title or dissertation.description):
+        lines.append(f"  Dissertation: {_join((dissertation.title, dissertation.description), ' — ')}")
+        if dissertation.advisors:
+            lines.append(f"  Advisors: {', '.join(dissertation.advisors)}")
+        if dissertation.primary_research:
+            lines.append(f"  Research: {dissertation.primary_research}")
+    return "\n".join(lines)
+
+
+def render_publication(publication: Publication) -> str:
+    venue = publication.publication_name.strip()
+    if publication.volume is not None:
+        venue += f" {publication.volume}"
+        if publication.issue is not None:
+            venue += f"({publication.issue})"
+    if publication.pages and publication.pages.start is not None:
+        end = f"-{publication.pages.end}" if publication.pages.end is not None else ""
+        venue += f":{publication.pages.start}{end}"
+    date = publication.date
+    published = _date(date.year, date.month) if date else ""
+    lines = [f"- {_join((publication.title, venue, published, publication.publisher), '; ')}"]
+    authors = ", ".join(_join((a.first_name, a.last_name), " ") for a in publication.authors)
+    if authors:
+        lines.append(f"  Authors: {authors}")
+    if publication.editor:
+        lines.append(f"  Editor: {publication.editor}")
+    ids = _join(
+        (
+            f"DOI {publication.doi}" if publication.doi else "",
+            f"ISBN {publication.isbn}" if publication.isbn else "",
+            ", ".join(publication.links),
+        ),
+        "; ",
+    )
+    if ids:
+        lines.append(f"  {ids}")
+    if publication.abstract:
+        lines.append(f"  Abstract: {publication.abstract}")
+    return "\n".join(lines)
+
+
+def render_sections(candidate: Candidate) -> dict[str, str]:
+    """Render each top-level profile section separately (empty sections map to "")."""
+    profile = candidate.work_experience
+    return {
+        "summary": f"## Summary\n{profile.summary}" if profile.summary else "",
+        "skills": f"## Skills\n{profile.skills}" if profile.skills else "",
+        "work": "## Work\n" + "\n".join(render_work_entry(e) for e in profile.work) if profile.work else "",
+        "education": "## Education\n" + "\n".join(render_education(e) for e in profile.education)
+        if profile.education
+        else "",
+        "publications": "## Publications\n" + "\n".join(render_publication(p) for p in profile.publications)
+        if profile.publications
+        else "",
+    }
+
+
+def render_candidate(candidate: Candidate) -> str:
+    header = render_header(candidate)
+    parts = [f"# {header}"] if header else []
+    parts.extend(section for section in render_sections(candidate).values() if section)
+    return "\n".join(parts)
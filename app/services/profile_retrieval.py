@@ -0,0 +1,137 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from app.models import Candidate
+from app.services.profile_renderer import (
+    render_education,
+    render_employer_line,
+    render_header,
+    render_publication,
+    render_role_line,
+    render_span,
+    render_work_entry,
+    render_work_item,
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have how i in is it its me of on or "
+    "she he that the their them they this to was were what when where which who why with "
+    "you your about tell any".split()
+)
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+
+def _tokenize(text: str) -> list[str]:
+    tokens = (t.strip(".-") for t in _TOKEN_RE.findall(text.lower()))
+    return [t for t in tokens if t and t not in _STOPWORDS]
+
+
+@dataclass
+class ProfileChunk:
+    kind: str
+    label: str
+    text: str
+
+
+def chunk_candidate(candidate: Candidate) -> list[ProfileChunk]:
+    """Split a profile into retrievable sections, each carrying enough context to stand alone."""
+    profile = candidate.work_experience
+    chunks: list[ProfileChunk] = []
+    if profile.summary:
+        chunks.append(ProfileChunk("summary", "Summary", f"Summary: {profile.summary}"))
+    if profile.skills:
+        chunks.append(ProfileChunk("skills", "Skills", f"Skills: {profile.skills}"))
+    for entry in profile.work:
+        header = render_employer_line(entry)
+        if not entry.roles:
+            chunks.append(ProfileChunk("work", entry.employer.name, render_work_entry(entry)))
+            continue
+        for role in entry.roles:
+            role_header = f"{header}\n{render_role_line(role)}"
+            if not role.items:
+                chunks.append(ProfileChunk("role", f"{entry.employer.name} / {role.title}", role_header))
+            for item in role.items:
+                chunks.append(
+                    ProfileChunk(
+                        "work_item",
+                        f"{entry.employer.name} / {role.title} / {item.title}",
+                        f"{role_header}\n{render_work_item(item)}",
+                    )
+                )
+    for education in profile.education:
+        chunks.append(
+            ProfileChunk("education", f"{education.degree}, {education.institution}", render_education(education))
+        )
+    for publication in profile.publications:
+        chunks.append(ProfileChunk("publication", publication.title, render_publication(publication)))
+    return chunks
+
+
+def build_outline(candidate: Candidate) -> str:
+    """Compact map of the whole profile so the model knows what exists beyond retrieved sections."""
+    profile = candidate.work_experience
+    header = render_header(candidate)
+    lines = [header] if header else []
+    lines.append("Work:")
+    for entry in profile.work:
+        lines.append(f"- {entry.employer.name} ({render_span(entry.start, entry.end)})")
+        for role in entry.roles:
+            items = ", ".join(i.title for i in role.items)
+            lines.append(f"  - {role.title} ({render_span(role.start, role.end)}): {items}")
+    if profile.education:
+        lines.append("Education:")
+        lines.extend(f"- {e.degree}, {e.institution} ({render_span(e.start, e.end)})" for e in profile.education)
+    if profile.publications:
+        lines.append("Publications:")
+        lines.extend(f"- {p.title}" for p in profile.publications)
+    return "\n".join(lines)
+
+
+class ProfileIndex:
+    """Okapi BM25 over the chunks of one candidate profile."""
+
+    def __init__(self, chunks: list[ProfileChunk], outline: str):
+        self.chunks = chunks
+        self.outline = outline
+        self._term_freqs = [Counter(_tokenize(f"{c.label} {c.text}")) for c in chunks]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        doc_freq: Counter = Counter()
+        for tf in self._term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(chunks)
+        self._idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def score(self, query: str) -> list[float]:
+        terms = [t for t in set(_tokenize(query)) if t in self._idf]
+        scores = []
+        for tf, length in zip(self._term_freqs, self._lengths):
+            norm = K1 * (1 - B + B * length / self._avg_length) if self._avg_length else K1
+            scores.append(
+                sum(self._idf[t] * tf[t] * (K1 + 1) / (tf[t] + norm) for t in terms if t in tf)
+            )
+        return scores
+
+    def top_chunks(self, query: str, k: int) -> list[ProfileChunk]:
+        scores = self.score(query)
+        ranked = sorted((i for i, s in enumerate(scores) if s > 0), key=lambda i: scores[i], reverse=True)[:k]
+        if not ranked:
+            # Nothing matched (e.g. "tell me about yourself"): fall back to the leading sections
+            ranked = list(range(min(k, len(self.chunks))))
+        # Keep profile order so the prompt reads chronologically
+        return [self.chunks[i] for i in sorted(ranked)]
+
+
+def build_index(candidate: Candidate) -> ProfileIndex:
+    return ProfileIndex(chunk_candidate(candidate), build_outline(candidate))
+
+
+def render_retrieved_context(index: ProfileIndex, query: str, k: int) -> str:
+    sections = "\n\n".join(c.text for c in index.top_chunks(query, k))
+    return f"=== PROFILE OUTLINE ===\n{index.outline}\n\n=== RELEVANT SECTIONS ===\n{sections}"
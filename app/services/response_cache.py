@@ -0,0 +1,121 @@
+import hashlib
+import json
+
+from app.config import settings
+from app.database import commit_write, queue_write, read_db
+
+# Process-level counters; entries themselves live in SQLite (llm_response_cache)
+_stats: dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0}
+
+
+def _normalize(content: str) -> str:
+    return " ".join(content.split()).casefold()
+
+
+def make_cache_key(model: str, messages: list[dict[str, str]]) -> str:
+    """Key on model, system prompt hash and normalized conversation history."""
+    system_prompt = "".join(m["content"] for m in messages if m["role"] == "system")
+    system_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    history = [[m["role"], _normalize(m["content"])] for m in messages if m["role"] != "system"]
+    raw = json.dumps([model, system_hash, history], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def get_cached_response(cache_key: str) -> dict | None:
+    if not settings.response_cache_enabled:
+        return None
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT response, input_tokens, output_tokens FROM llm_response_cache "
+            "WHERE cache_key = ? AND created_at >= datetime('now', ?)",
+            (cache_key, f"-{settings.response_cache_ttl_seconds} seconds"),
+        )
+    if not rows:
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    queue_write(_record_hit, cache_key)
+    return dict(rows[0])
+
+
+async def _record_hit(db, cache_key: str) -> None:
+    await db.execute(
+        "UPDATE llm_response_cache SET hits = hits + 1, last_hit_at = CURRENT_TIMESTAMP WHERE cache_key = ?",
+        (cache_key,),
+    )
+
+
+async def store_response(
+    cache_key: str,
+    candidate_id: str | None,
+    model_id: str,
+    response: str,
+    input_tokens: int,
+    output_tokens: int,
+) -> None:
+    if not settings.response_cache_enabled or not response:
+        return
+    queue_write(_insert_response, cache_key, candidate_id, model_id, response, input_tokens, output_tokens)
+
+
+async def _insert_response(
+    db,
+    cache_key: str,
+    candidate_id: str | None,
+    model_id: str,
+    response: str,
+    input_tokens: int,
+    output_tokens: int,
+) -> None:
+    await db.execute(
+        "INSERT OR REPLACE INTO llm_response_cache "
+        "(cache_key, candidate_id, model_id, response, input_tokens, output_tokens) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (cache_key, candidate_id, model_id, response, input_tokens, output_tokens),
+    )
+    _stats["stores"] += 1
+    await _evict(db)
+
+
+async def _evict(db) -> None:
+    cursor = await db.execute(
+        "DELETE FROM llm_response_cache WHERE created_at < datetime('now', ?)",
+        (f"-{settings.response_cache_ttl_seconds} seconds",),
+    )
+    _stats["evictions"] += max(cursor.rowcount, 0)
+    cursor = await db.execute(
+        """
+        DELETE FROM llm_response_cache WHERE cache_key IN (
+            SELECT cache_key FROM llm_response_cache
+            ORDER BY last_hit_at DESC, created_at DESC
+            LIMIT -1 OFFSET ?
+        )
+        """,
+        (settings.response_cache_max_entries,),
+    )
+    _stats["evictions"] += max(cursor.rowcount, 0)
+
+
+async def invalidate_candidate(candidate_id: str) -> None:
+    """Drop cached answers for a candidate whose profile changed."""
+    # Through the write queue, so answers stored just before the change cannot land afterwards
+    _stats["invalidations"] += await commit_write(_delete_candidate_responses, candidate_id)
+
+
+async def _delete_candidate_responses(db, candidate_id: str) -> int:
+    cursor = await db.execute("DELETE FROM llm_response_cache WHERE candidate_id = ?", (candidate_id,))
+    return max(cursor.rowcount, 0)
+
+
+async def get_cache_stats() -> dict[str, int | float | bool]:
+    async with read_db() as db:
+        rows = await db.execute_fetchall("SELECT COUNT(*) AS entries FROM llm_response_cache")
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        "enabled": settings.response_cache_enabled,
+        "entries": int(rows[0]["entries"]),
+        "max_entries": settings.response_cache_max_entries,
+        "ttl_seconds": settings.response_cache_ttl_seconds,
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,133 @@
+import asyncio
+import html
+import logging
+import re
+
+from app.config import settings
+from app.database import read_db, write_db
+
+logger = logging.getLogger(__name__)
+
+# Control characters can't occur in the highlighted text, so the markup is added after escaping
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Source table -> INSERT ... SELECT of one id range into its FTS table. OR REPLACE makes it
+# safe for rows the triggers have already indexed (e.g. edited before the backfill got to them)
+_BACKFILL = {
+    "messages": (
+        "INSERT OR REPLACE INTO messages_fts (rowid, content, conversation_id) "
+        "SELECT id, content, conversation_id FROM messages WHERE id > ? AND id <= ? AND role != 'system'"
+    ),
+    "conversations": (
+        "INSERT OR REPLACE INTO conversations_fts (rowid, title) "
+        "SELECT id, COALESCE(title, '') FROM conversations WHERE id > ? AND id <= ?"
+    ),
+}
+
+SEARCH_SQL = f"""
+    SELECT * FROM (
+        SELECT
+            'message' AS kind,
+            messages_fts.rowid AS message_id,
+            m.role,
+            c.id AS conversation_id,
+            c.title,
+            c.candidate_id,
+            c.updated_at,
+            snippet(messages_fts, 0, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 16) AS snippet,
+            bm25(messages_fts) AS rank
+        FROM messages_fts
+        -- Archived messages are only in the index; their role is NULL until the thread is restored
+        LEFT JOIN messages m ON m.id = messages_fts.rowid
+        JOIN conversations c ON c.id = messages_fts.conversation_id
+        WHERE messages_fts MATCH :query AND (:candidate_id IS NULL OR c.candidate_id = :candidate_id)
+        UNION ALL
+        SELECT
+            'title', NULL, NULL, c.id, c.title, c.candidate_id, c.updated_at,
+            highlight(conversations_fts, 0, '{_MARK_OPEN}', '{_MARK_CLOSE}'),
+            bm25(conversations_fts)
+        FROM conversations_fts
+        JOIN conversations c ON c.id = conversations_fts.rowid
+        WHERE conversations_fts MATCH :query AND (:candidate_id IS NULL OR c.candidate_id = :candidate_id)
+    )
+    ORDER BY rank, conversation_id DESC, message_id DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def build_match_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words, the last one as a prefix.
+
+    Every term is quoted, so punctuation and FTS5 operators in user input are never parsed.
+    """
+    terms = _TERM_RE.findall(text)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _render_snippet(snippet: str) -> str:
+    return html.escape(snippet or "").replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+async def search(text: str, candidate_id: str | None = None, limit: int = 20, offset: int = 0) -> dict:
+    """Best matches first across message content and conversation titles, with HTML-safe snippets."""
+    query = build_match_query(text)
+    if not query:
+        return {"items": [], "next_offset": None}
+    async with read_db() as db:
+        rows = await db.execute_fetchall(
+            SEARCH_SQL,
+            {"query": query, "candidate_id": candidate_id, "limit": limit + 1, "offset": offset},
+        )
+    items = []
+    for row in rows[:limit]:
+        item = dict(row)
+        item["snippet"] = _render_snippet(item["snippet"])
+        items.append(item)
+    return {"items": items, "next_offset": offset + limit if len(rows) > limit else None}
+
+
+async def backfill_search_index() -> int:
+    """Index one batch of rows that predate the search index; returns how many ids were covered."""
+    covered = 0
+    async with write_db() as db:
+        pending = await db.execute_fetchall(
+            "SELECT source, next_id, end_id FROM search_backfill WHERE next_id < end_id ORDER BY source"
+        )
+        for row in pending:
+            upper = min(row["end_id"], row["next_id"] + settings.search_backfill_batch_size)
+            await db.execute(_BACKFILL[row["source"]], (row["next_id"], upper))
+            await db.execute("UPDATE search_backfill SET next_id = ? WHERE source = ?", (upper, row["source"]))
+            covered += upper - row["next_id"]
+    return covered
+
+
+async def run_search_backfill() -> None:
+    """Background task started from the app lifespan; exits once existing rows are indexed."""
+    total = 0
+    while True:
+        try:
+            covered = await backfill_search_index()
+        except Exception:
+            logger.exception("Search index backfill failed")
+            return
+        if not covered:
+            break
+        total += covered
+        # Let queued chat writes through between batches
+        await asyncio.sleep(settings.search_backfill_pause_seconds)
+    if total:
+        logger.info("Search index backfill complete (%s ids)", total)
+
+
+async def get_search_stats() -> dict:
+    async with read_db() as db:
+        rows = await db.execute_fetchall("SELECT source, next_id, end_id FROM search_backfill ORDER BY source")
+    return {
+        "backfill": {row["source"]: {"indexed_through": row["next_id"], "end_id": row["end_id"]} for row in rows},
+        "backfill_complete": all(row["next_id"] >= row["end_id"] for row in rows),
+    }
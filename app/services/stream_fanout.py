@@ -0,0 +1,78 @@
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+
+
+class SharedStream:
+    """One upstream event stream fanned out to every subscriber that joins while it runs."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.events: list[dict] = []
+        self.subscribers = 0
+        self.done = False
+        self.error: BaseException | None = None
+        self._changed = asyncio.Condition()
+        self._task: asyncio.Task | None = None
+
+    async def _publish(self, event: dict | None = None) -> None:
+        async with self._changed:
+            if event is not None:
+                self.events.append(event)
+            self._changed.notify_all()
+
+    def stop_joins(self) -> None:
+        """Let no one else join; after this ``subscribers`` is final, so a source can report it last."""
+        if _in_flight.get(self.key) is self:
+            del _in_flight[self.key]
+
+    async def _pump(self, source: AsyncIterator[dict]) -> None:
+        try:
+            async for event in source:
+                await self._publish(event)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.done = True
+            self.stop_joins()
+            await self._publish()
+
+    async def _subscribe(self) -> AsyncGenerator[dict, None]:
+        # Late joiners start at index 0 and so receive the already-emitted prefix first
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: index < len(self.events) or self.done)
+                pending = self.events[index:]
+            for event in pending:
+                yield event
+            index += len(pending)
+            if self.done and index >= len(self.events):
+                break
+        if self.error is not None:
+            raise self.error
+
+
+# key -> stream currently running upstream
+_in_flight: dict[str, SharedStream] = {}
+
+
+def join_stream(
+    key: str,
+    source_factory: Callable[[SharedStream], AsyncIterator[dict]],
+) -> AsyncGenerator[dict, None]:
+    """Subscribe to the in-flight stream for ``key``, starting it if none is running.
+
+    The upstream runs in its own task, so a subscriber disconnecting never cuts the
+    stream short for the others.
+    """
+    stream = _in_flight.get(key)
+    if stream is None:
+        stream = SharedStream(key)
+        _in_flight[key] = stream
+        stream._task = asyncio.create_task(stream._pump(source_factory(stream)))
+    stream.subscribers += 1
+    return stream._subscribe()
+
+
+def in_flight_count() -> int:
+    return len(_in_flight)
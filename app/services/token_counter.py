@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import Callable
+
+from app.models import Candidate
+from app.services.profile_renderer import render_candidate, render_sections
+from app.services.tokens import DEFAULT_ENCODING, count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Profiles kept in the memo; an entry is a handful of ints, so this only bounds churn
+MAX_ENTRIES = 256
+
+# content hash -> {"summary": n, "skills": n, ..., "total": n}
+_counts: OrderedDict[str, dict[str, int]] = OrderedDict()
+# content hash -> in-progress count, shared by concurrent misses
+_pending: dict[str, asyncio.Task] = {}
+_prewarm_tasks: set[asyncio.Task] = set()
+
+
+def content_hash(candidate_json: str) -> str:
+    return hashlib.sha256(candidate_json.encode("utf-8")).hexdigest()
+
+
+def _compute_breakdown(build: Callable[[], Candidate], encoding_name: str) -> dict[str, int]:
+    """Count tokens of each rendered section and of the full prompt rendering."""
+    candidate = build()
+    breakdown = {
+        section: count_tokens(text, encoding_name) if text else 0
+        for section, text in render_sections(candidate).items()
+    }
+    breakdown["total"] = count_tokens(render_candidate(candidate), encoding_name)
+    return breakdown
+
+
+def _remember(key: str, breakdown: dict[str, int]) -> None:
+    _counts[key] = breakdown
+    _counts.move_to_end(key)
+    while len(_counts) > MAX_ENTRIES:
+        _counts.popitem(last=False)
+
+
+async def get_token_breakdown(
+    profile_hash: str,
+    build: Callable[[], Candidate],
+    encoding_name: str = DEFAULT_ENCODING,
+) -> dict[str, int]:
+    """Per-section token counts for a profile version, encoded off the event loop on a miss.
+
+    ``build`` returns the profile and is only called on a miss, in the worker thread.
+    """
+    key = f"{encoding_name}:{profile_hash}"
+    cached = _counts.get(key)
+    if cached is not None:
+        _counts.move_to_end(key)
+        return cached
+    task = _pending.get(key)
+    if task is None:
+        task = asyncio.create_task(asyncio.to_thread(_compute_breakdown, build, encoding_name))
+        _pending[key] = task
+        task.add_done_callback(lambda _: _pending.pop(key, None))
+    breakdown = await asyncio.shield(task)
+    _remember(key, breakdown)
+    return breakdown
+
+
+def forget(profile_hash: str) -> None:
+    """Drop the counts of a profile version that has been replaced."""
+    for key in [k for k in _counts if k.endswith(f":{profile_hash}")]:
+        del _counts[key]
+
+
+def prewarm(profile_hash: str, candidate: Candidate) -> None:
+    """Count a freshly saved profile in the background so the next page load is a hit."""
+
+    async def _warm() -> None:
+        try:
+            await get_token_breakdown(profile_hash, lambda: candidate)
+        except Exception:
+            logger.exception("Failed to pre-count profile tokens")
+
+    task = asyncio.create_task(_warm())
+    _prewarm_tasks.add(task)
+    task.add_done_callback(_prewarm_tasks.discard)
+
+
+def clear() -> None:
+    _counts.clear()
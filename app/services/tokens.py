@@ -0,0 +1,32 @@
+from functools import lru_cache
+
+import tiktoken
+
+DEFAULT_ENCODING = "cl100k_base"
+# Approximate per-message framing overhead (role markers, separators) in chat formats
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = DEFAULT_ENCODING) -> tiktoken.Encoding:
+    """Return a warm, process-wide encoder; tiktoken setup is only paid once per encoding."""
+    return tiktoken.get_encoding(encoding_name)
+
+
+def encoding_name_for_model(model_id: str) -> str:
+    """Map an OpenRouter model id (``vendor/model``) to a tiktoken encoding name."""
+    vendor, _, model = model_id.partition("/")
+    if vendor == "openai":
+        try:
+            return tiktoken.encoding_name_for_model(model)
+        except KeyError:
+            pass
+    return DEFAULT_ENCODING
+
+
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+    return len(get_encoding(encoding_name).encode(text, disallowed_special=()))
+
+
+def count_message_tokens(message: dict[str, str], encoding_name: str = DEFAULT_ENCODING) -> int:
+    return count_tokens(message["content"], encoding_name) + MESSAGE_OVERHEAD_TOKENS
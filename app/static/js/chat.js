@@ -154,17 +154,6 @@ document.addEventListener("DOMContentLoaded", () => {
         window.location.href = `/chat/${conv.id}`;
     });
 
-    // Delete conversation
-    document.querySelectorAll(".delete-conv").forEach((btn) => {
-        btn.addEventListener("click", async (e) => {
-            e.preventDefault();
-            e.stopPropagation();
-            const id = btn.dataset.id;
-            await fetch(`/api/conversations/${id}`, { method: "DELETE" });
-            window.location.href = "/chat";
-        });
-    });
-
     function startInlineRename(item, id) {
         const titleEl = item?.querySelector(".conv-title");
         if (!titleEl || !id || titleEl.dataset.editing === "true") return;
@@ -213,21 +202,25 @@ document.addEventListener("DOMContentLoaded", () => {
 
     const titleClickTimers = new WeakMap();
 
-    // Rename conversation
-    document.querySelectorAll(".rename-conv").forEach((btn) => {
-        btn.addEventListener("click", (e) => {
+    function bindConversationItem(item) {
+        // Delete conversation
+        item.querySelector(".delete-conv")?.addEventListener("click", async (e) => {
             e.preventDefault();
             e.stopPropagation();
-            startInlineRename(btn.closest(".conversation-item"), btn.dataset.id);
+            await fetch(`/api/conversations/${item.dataset.id}`, { method: "DELETE" });
+            window.location.href = "/chat";
         });
-    });
-    document.querySelectorAll(".edit-message").forEach((btn) => setTooltip(btn, "Edit"));
-    document.querySelectorAll(".conversation-item .conv-title").forEach((titleEl) => {
-        titleEl.addEventListener("click", (e) => {
+        // Rename conversation
+        item.querySelector(".rename-conv")?.addEventListener("click", (e) => {
+            e.preventDefault();
+            e.stopPropagation();
+            startInlineRename(item, item.dataset.id);
+        });
+        const titleEl = item.querySelector(".conv-title");
+        titleEl?.addEventListener("click", (e) => {
             e.preventDefault();
             e.stopPropagation();
-            const item = titleEl.closest(".conversation-item");
-            if (!item || titleEl.dataset.editing === "true") return;
+            if (titleEl.dataset.editing === "true") return;
             if (e.detail === 1) {
                 const timer = setTimeout(() => {
                     window.location.href = item.getAttribute("href");
@@ -240,9 +233,9 @@ document.addEventListener("DOMContentLoaded", () => {
                 clearTimeout(timer);
                 titleClickTimers.delete(titleEl);
             }
-            startInlineRename(item, item?.dataset?.id);
+            startInlineRename(item, item.dataset.id);
         });
-        titleEl.addEventListener("keydown", async (e) => {
+        titleEl?.addEventListener("keydown", async (e) => {
             if (titleEl.dataset.editing !== "true") return;
             if (e.key === "Enter") {
                 e.preventDefault();
@@ -252,18 +245,90 @@ document.addEventListener("DOMContentLoaded", () => {
                 await finishInlineRename(titleEl, false);
             }
         });
-        titleEl.addEventListener("blur", async () => {
+        titleEl?.addEventListener("blur", async () => {
             await finishInlineRename(titleEl, true);
         });
+    }
+
+    function renderConversationItem(conv) {
+        const item = document.createElement("a");
+        item.href = `/chat/${conv.id}`;
+        item.className = "conversation-item";
+        if (conv.id === conversationId) item.classList.add("active");
+        item.dataset.id = String(conv.id);
+        const title = document.createElement("span");
+        title.className = "conv-title";
+        title.textContent = conv.title || "New Interview";
+        const actions = document.createElement("span");
+        actions.className = "conv-actions";
+        actions.innerHTML = `
+            <button class="btn btn-sm btn-link text-muted rename-conv p-0" data-id="${conv.id}">
+                <i class="bi bi-pencil-square"></i>
+            </button>
+            <button class="btn btn-sm btn-link text-muted delete-conv p-0" data-id="${conv.id}">
+                <i class="bi bi-trash3"></i>
+            </button>`;
+        item.append(title, actions);
+        bindConversationItem(item);
+        return item;
+    }
+
+    document.querySelectorAll(".conversation-item").forEach(bindConversationItem);
+    document.querySelectorAll(".edit-message").forEach((btn) => setTooltip(btn, "Edit"));
+
+    // Load older conversations as the sidebar is scrolled to the end
+    const conversationList = document.getElementById("conversationList");
+    let loadingConversations = false;
+    // Title filter applied by the server, so it covers pages not loaded yet
+    let threadQuery = "";
+    function conversationsUrl(cursor) {
+        const params = new URLSearchParams();
+        if (cursor) params.set("cursor", cursor);
+        if (threadQuery) params.set("q", threadQuery);
+        return `/api/conversations?${params}`;
+    }
+    async function loadMoreConversations() {
+        const cursor = conversationList?.dataset.nextCursor;
+        if (!cursor || loadingConversations) return;
+        loadingConversations = true;
+        const query = threadQuery;
+        try {
+            const resp = await fetch(conversationsUrl(cursor));
+            if (!resp.ok || query !== threadQuery) return;
+            const page = await resp.json();
+            page.items.forEach((conv) => conversationList.appendChild(renderConversationItem(conv)));
+            conversationList.dataset.nextCursor = page.next_cursor || "";
+        } catch (e) {
+            console.error(e);
+        } finally {
+            loadingConversations = false;
+        }
+    }
+    conversationList?.addEventListener("scroll", () => {
+        if (conversationList.scrollHeight - conversationList.scrollTop - conversationList.clientHeight < 100) {
+            loadMoreConversations();
+        }
     });
 
-    // Search threads
+    // Search threads: reload the list from its first page with the new filter
+    let filterTimer = null;
+    async function filterThreads() {
+        threadQuery = searchThreads.value.trim();
+        const query = threadQuery;
+        try {
+            const resp = await fetch(conversationsUrl(null));
+            // A newer keystroke has started its own reload
+            if (!resp.ok || query !== threadQuery) return;
+            const page = await resp.json();
+            conversationList.replaceChildren(...page.items.map(renderConversationItem));
+            conversationList.dataset.nextCursor = page.next_cursor || "";
+        } catch (e) {
+            console.error(e);
+        }
+    }
     searchThreads.addEventListener("input", () => {
-        const q = searchThreads.value.toLowerCase();
-        document.querySelectorAll(".conversation-item").forEach((item) => {
-            const title = item.querySelector(".conv-title").textContent.toLowerCase();
-            item.style.display = title.includes(q) ? "" : "none";
-        });
+        clearTimeout(filterTimer);
+        filterTimer = setTimeout(filterThreads, 250);
     });
 
     // Mobile sidebar
@@ -311,6 +376,32 @@ document.addEventListener("DOMContentLoaded", () => {
         scrollBottomBtn.classList.toggle("visible", !atBottom);
     }
     chatMessages?.addEventListener("scroll", updateScrollBtnVisibility);
+
+    // Load older messages as the thread is scrolled to the top, keeping the view in place
+    let loadingMessages = false;
+    async function loadOlderMessages() {
+        const before = chatMessages.dataset.nextCursor;
+        if (!before || !conversationId || loadingMessages) return;
+        loadingMessages = true;
+        try {
+            const resp = await fetch(`/api/conversations/${conversationId}/messages?before=${before}`);
+            if (!resp.ok) return;
+            const page = await resp.json();
+            const previousHeight = chatMessages.scrollHeight;
+            const fragment = document.createDocumentFragment();
+            page.items.forEach((msg) => fragment.appendChild(buildMessage(msg.role, msg.content, msg.id)));
+            chatMessages.prepend(fragment);
+            chatMessages.scrollTop += chatMessages.scrollHeight - previousHeight;
+            chatMessages.dataset.nextCursor = page.next_cursor ?? "";
+        } catch (e) {
+            console.error(e);
+        } finally {
+            loadingMessages = false;
+        }
+    }
+    chatMessages?.addEventListener("scroll", () => {
+        if (chatMessages.scrollTop < 100) loadOlderMessages();
+    });
     scrollBottomBtn?.addEventListener("click", () => scrollToBottom(true));
     updateScrollBtnVisibility();
 
@@ -356,6 +447,8 @@ document.addEventListener("DOMContentLoaded", () => {
     initializeUsageSummary();
     candidateSelect?.addEventListener("change", () => updateTokenCount(candidateSelect.value));
     scrollToBottom();
+    // A first page too short to scroll would never trigger loading the rest
+    if (chatMessages.scrollHeight <= chatMessages.clientHeight) loadOlderMessages();
 
     // Send message
     async function sendMessage(overrideText = null) {
@@ -559,8 +652,16 @@ document.addEventListener("DOMContentLoaded", () => {
         const welcome = chatMessages.querySelector(".welcome-screen");
         if (welcome) welcome.remove();
 
+        const div = buildMessage(role, content);
+        chatMessages.appendChild(div);
+        scrollToBottom();
+        return div;
+    }
+
+    function buildMessage(role, content, messageId = null) {
         const div = document.createElement("div");
         div.className = `message message-${role}`;
+        if (role === "user" && messageId) div.dataset.messageId = String(messageId);
         const contentDiv = document.createElement("div");
         contentDiv.className = "message-content";
 
@@ -574,8 +675,6 @@ document.addEventListener("DOMContentLoaded", () => {
         if (role === "user") {
             ensureEditButton(div);
         }
-        chatMessages.appendChild(div);
-        scrollToBottom();
         return div;
     }
 
@@ -6,6 +6,13 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     if (!totalCostCtx && !dailyCtx && !monthlyCtx) return;
 
+    // Shared by the total and monthly charts so the page fetches it once
+    let monthlyDataPromise = null;
+    function loadMonthlyData() {
+        monthlyDataPromise ??= fetch("/api/costs/monthly").then((resp) => resp.json());
+        return monthlyDataPromise;
+    }
+
     const modelColors = [
         "#a855f7",
         "#3b82f6",
@@ -71,8 +78,7 @@ document.addEventListener("DOMContentLoaded", async () => {
     // Total cost circular chart
     try {
         if (totalCostCtx) {
-            const monthlyResp = await fetch("/api/costs/monthly");
-            const monthlyData = await monthlyResp.json();
+            const monthlyData = await loadMonthlyData();
             const totalsByModel = new Map();
             const callsByModel = new Map();
             const tokensByModel = new Map();
@@ -179,8 +185,7 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     // Monthly bar chart
     try {
-        const monthlyResp = await fetch("/api/costs/monthly");
-        const monthlyData = await monthlyResp.json();
+        const monthlyData = await loadMonthlyData();
 
         const monthlyChartData = buildStackedDatasets(monthlyData, "month");
         new Chart(monthlyCtx, {
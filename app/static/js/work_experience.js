@@ -196,20 +196,94 @@
         render();
     }
 
-    async function saveFull() {
-        const resp = await fetch(`/api/candidates/${candidateId}/work-experience`, {
-            method: "PUT",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify(data),
-        });
-        if (!resp.ok) {
-            const err = await resp.json().catch(() => ({}));
-            throw new Error(err.detail || resp.statusText);
+    /* ── saving: debounced JSON Patch ─────────────────────── */
+    const SAVE_DEBOUNCE_MS = 400;
+    const clone = value => JSON.parse(JSON.stringify(value));
+    const sameJson = (a, b) => JSON.stringify(a) === JSON.stringify(b);
+    let profileVersion = window.__profileVersion;
+    let savedData = clone(data);  // what the server has at profileVersion
+    let saveTimer = null;
+    let saveWaiters = [];
+    let saveChain = Promise.resolve();
+
+    function pointer(path) {
+        return path.map(p => "/" + String(p).replace(/~/g, "~0").replace(/\//g, "~1")).join("");
+    }
+
+    // RFC 6902 operations turning `before` into `after`: a single inserted or deleted array
+    // element becomes one add/remove, anything else per-index or whole-value replaces
+    function diffOps(before, after, path = [], ops = []) {
+        if (sameJson(before, after)) return ops;
+        if (Array.isArray(before) && Array.isArray(after)) {
+            const shift = after.length - before.length;
+            if (Math.abs(shift) === 1) {
+                let i = 0;
+                while (i < Math.min(before.length, after.length) && sameJson(before[i], after[i])) i++;
+                const restMatches = shift > 0
+                    ? sameJson(before.slice(i), after.slice(i + 1))
+                    : sameJson(before.slice(i + 1), after.slice(i));
+                if (restMatches) {
+                    ops.push(shift > 0
+                        ? { op: "add", path: pointer([...path, i]), value: after[i] }
+                        : { op: "remove", path: pointer([...path, i]) });
+                    return ops;
+                }
+            }
+            if (shift === 0) {
+                after.forEach((value, i) => diffOps(before[i], value, [...path, i], ops));
+                return ops;
+            }
+        } else if (before && after && typeof before === "object" && typeof after === "object"
+                   && !Array.isArray(before) && !Array.isArray(after)) {
+            Object.keys(before).forEach(k => {
+                if (!(k in after)) ops.push({ op: "remove", path: pointer([...path, k]) });
+            });
+            Object.keys(after).forEach(k => {
+                if (k in before) diffOps(before[k], after[k], [...path, k], ops);
+                else ops.push({ op: "add", path: pointer([...path, k]), value: after[k] });
+            });
+            return ops;
+        }
+        ops.push({ op: "replace", path: pointer(path), value: after });
+        return ops;
+    }
+
+    async function sendPatch() {
+        const target = clone(data);
+        const ops = diffOps(savedData, target);
+        if (ops.length) {
+            const resp = await fetch(`/api/candidates/${candidateId}/work-experience`, {
+                method: "PATCH",
+                headers: { "Content-Type": "application/json-patch+json", "X-Profile-Version": String(profileVersion) },
+                body: JSON.stringify(ops),
+            });
+            if (!resp.ok) {
+                const err = await resp.json().catch(() => ({}));
+                throw new Error(typeof err.detail === "string" ? err.detail : resp.statusText);
+            }
+            profileVersion = Number(resp.headers.get("X-Profile-Version"));
+            savedData = target;
         }
         await updateTokenCount();
         for (const k of [...editingKeys]) takeSnapshot(k);
     }
 
+    // Saves made in quick succession go out as one patch; patches are sent one at a time
+    function saveFull() {
+        return new Promise((resolve, reject) => {
+            saveWaiters.push({ resolve, reject });
+            clearTimeout(saveTimer);
+            saveTimer = setTimeout(() => {
+                const waiters = saveWaiters;
+                saveWaiters = [];
+                saveChain = saveChain.then(sendPatch).then(
+                    () => waiters.forEach(w => w.resolve()),
+                    e => waiters.forEach(w => w.reject(e)),
+                );
+            }, SAVE_DEBOUNCE_MS);
+        });
+    }
+
     async function saveItem(key) {
         try {
             await saveFull();
@@ -740,6 +814,8 @@
         const body = await resp.json().catch(() => ({}));
         if (!resp.ok) throw new Error(body.detail || resp.statusText);
         data = body.profile;
+        savedData = clone(data);
+        profileVersion = Number(resp.headers.get("X-Profile-Version"));
         normalizePublicationFields();
         editingKeys.clear();
         Object.keys(snapshots).forEach(k => delete snapshots[k]);
@@ -761,6 +837,9 @@
             if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
             const payload = await resp.json();
             nrTokensText.textContent = String(payload.nr_tokens ?? "—");
+            nrTokensText.title = Object.entries(payload.sections || {})
+                .map(([name, count]) => `${name}: ${count}`)
+                .join("\n");
         } catch (e) {
             console.error(e);
             nrTokensText.textContent = "—";
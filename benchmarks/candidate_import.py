@@ -0,0 +1,80 @@
+"""Benchmark: bulk candidate import throughput by number of validation workers.
+
+Writes ``--records`` synthetic copies of ``data/candidates/phil_tillman.json`` as one JSONL
+file and imports it into a fresh database once per worker count, from 1 up to the number
+of cores. Also times validating the same documents serially in this process, which is what
+the import cost on the event loop before the process pool.
+
+Usage (from the repo root):
+    ENV=dev uv run python benchmarks/candidate_import.py [--records 2000] [--max-workers 8]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database
+from app.config import settings
+from app.services.candidate_import import import_candidates, iter_jsonl, read_chunks
+from app.services.candidate_validation import shutdown_validation_pool, validate_record
+
+SOURCE = Path(__file__).resolve().parents[1] / "data" / "candidates" / "phil_tillman.json"
+
+
+def _write_jsonl(path: Path, count: int) -> None:
+    source = json.loads(SOURCE.read_text(encoding="utf-8"))
+    with path.open("w", encoding="utf-8") as fh:
+        for i in range(count):
+            fh.write(json.dumps({**source, "id": f"candidate_{i:05d}", "last_name": f"Tillman{i}"}) + "\n")
+
+
+def _serial(path: Path) -> float:
+    started = time.perf_counter()
+    for line in path.read_bytes().splitlines():
+        validate_record("line", None, line)
+    return time.perf_counter() - started
+
+
+async def _import(tmp: Path, source: Path, workers: int) -> dict:
+    settings.db_path = str(tmp / f"bench_{workers}.db")
+    settings.import_workers = workers
+    await database.init_db()
+    try:
+        with source.open("rb") as fileobj:
+            return await import_candidates(iter_jsonl(read_chunks(fileobj)))
+    finally:
+        await database.close_db()
+        shutdown_validation_pool()
+
+
+async def main(records: int, max_workers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "candidates.jsonl"
+        _write_jsonl(source, records)
+        settings.data_dir = str(tmp / "empty")
+        print(f"{records} candidates, {source.stat().st_size / 1024 / 1024:.1f} MB of JSONL, {os.cpu_count()} cores")
+
+        elapsed = _serial(source)
+        print(f"{'serial validation':<20} {elapsed * 1000:8.0f} ms  {records / elapsed:8.0f} candidates/s")
+        for workers in range(1, max_workers + 1):
+            report = await _import(tmp, source, workers)
+            print(
+                f"{f'import, {workers} workers':<20} {report['elapsed_ms']:8.0f} ms  "
+                f"{report['candidates_per_second']:8.0f} candidates/s  batches={report['batches']}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    asyncio.run(main(args.records, args.max_workers))
@@ -0,0 +1,145 @@
+"""Benchmark: resident memory of the candidate cache for a large candidate pool.
+
+Fills a temporary database with ``--candidates`` copies of ``data/candidates/phil_tillman.json``
+and measures resident heap memory in a fresh process for each strategy:
+
+- "eager": every profile held as a ``Candidate`` model, its JSON string and its prompt
+  rendering, as candidate_loader did before the bounded cache;
+- "lru": the bounded cache after every candidate has been requested once, followed by
+  ``--requests`` lookups skewed towards a popular few, whose hit rate is reported.
+
+Usage (from the repo root):
+    ENV=dev uv run python benchmarks/candidate_memory.py [--candidates 10000] [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database
+from app.config import settings
+
+SOURCE = Path(__file__).resolve().parents[1] / "data" / "candidates" / "phil_tillman.json"
+
+
+def _rss_mb() -> float:
+    # RssAnon leaves out the SQLite file pages mapped in through database.mmap_size
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak rather than current outside Linux; kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def _populate(count: int) -> None:
+    await database.init_db()
+    source = json.loads(SOURCE.read_text(encoding="utf-8"))
+    rows = []
+    for i in range(count):
+        payload = {**source, "last_name": f"Tillman{i}"}
+        rows.append((f"candidate_{i:05d}", source["first_name"], f"Tillman{i}", json.dumps(payload)))
+    async with database.write_db() as db:
+        await db.executemany(
+            "INSERT INTO candidates (id, first_name, last_name, work_experience) VALUES (?, ?, ?, ?)", rows
+        )
+    await database.close_db()
+
+
+async def _eager() -> dict:
+    from app.models import Candidate
+    from app.services.profile_renderer import render_candidate
+
+    candidates, profile_json, profile_text = {}, {}, {}
+    async with database.read_db() as db:
+        rows = await db.execute_fetchall("SELECT id, work_experience FROM candidates")
+    for row in rows:
+        candidate = Candidate.model_validate_json(row["work_experience"])
+        candidates[row["id"]] = candidate
+        profile_json[row["id"]] = candidate.model_dump_json()
+        profile_text[row["id"]] = render_candidate(candidate)
+    del rows
+    return {"held": len(candidates)}
+
+
+async def _lru(requests: int) -> dict:
+    from app.services import candidate_loader
+
+    async with database.read_db() as db:
+        ids = [row["id"] for row in await db.execute_fetchall("SELECT id FROM candidates ORDER BY id")]
+    for candidate_id in ids:
+        await candidate_loader.ensure_loaded(candidate_id)
+        candidate_loader.get_profile_text(candidate_id)
+    cache = candidate_loader._candidates
+    hits, misses = cache.hits, cache.misses
+    # Zipf-like traffic: a few candidates get most of the requests
+    weights = [1 / rank for rank in range(1, len(ids) + 1)]
+    started = time.perf_counter()
+    for candidate_id in random.Random(0).choices(ids, weights, k=requests):
+        await candidate_loader.ensure_loaded(candidate_id)
+        candidate_loader.get_profile_text(candidate_id)
+    elapsed = time.perf_counter() - started
+    lookups = cache.hits - hits + cache.misses - misses
+    return {
+        "held": len(cache),
+        "cache_mb": round(cache.stats()["bytes"] / (1024 * 1024), 1),
+        "hit_rate": round((cache.hits - hits) / lookups, 3) if lookups else None,
+        "us_per_request": round(elapsed / requests * 1e6, 1) if requests else None,
+    }
+
+
+async def _measure(mode: str, requests: int) -> None:
+    await database.init_db()
+    gc.collect()
+    baseline = _rss_mb()
+    result = await (_eager() if mode == "eager" else _lru(requests))
+    gc.collect()
+    result["rss_mb"] = round(_rss_mb() - baseline, 1)
+    await database.close_db()
+    print(json.dumps(result))
+
+
+def main(candidates: int, requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        settings.db_path = db_path
+        asyncio.run(_populate(candidates))
+        print(
+            f"{candidates} candidates, cache bounds {settings.candidates_cache_max_entries} entries / "
+            f"{settings.candidates_cache_max_mb} MB; anonymous RSS growth over an idle app"
+        )
+        for mode in ("eager", "lru"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", mode, "--db", db_path, "--requests", str(requests)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            print(f"{mode:<6} {output.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--measure", choices=("eager", "lru"), help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        settings.db_path = args.db
+        asyncio.run(_measure(args.measure, args.requests))
+    else:
+        main(args.candidates, args.requests)
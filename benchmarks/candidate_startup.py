@@ -0,0 +1,88 @@
+"""Benchmark: candidate loading at startup with and without the file manifest.
+
+Writes ``--files`` synthetic copies of ``data/candidates/phil_tillman.json`` and times
+``load_candidates`` for a cold start, a restart with the manifest, a restart without it
+(every file re-read and re-validated, as before the manifest), a reload with a warm cache
+(the cache-miss path) and a reload after ``--changed`` files were edited.
+
+Usage (from the repo root):
+    ENV=dev uv run python benchmarks/candidate_startup.py [--files 2000] [--changed 20]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database
+from app.config import settings
+from app.services import candidate_loader
+
+SOURCE = Path(__file__).resolve().parents[1] / "data" / "candidates" / "phil_tillman.json"
+
+
+def _write_files(data_dir: Path, count: int) -> list[Path]:
+    source = json.loads(SOURCE.read_text(encoding="utf-8"))
+    paths = []
+    for i in range(count):
+        path = data_dir / f"candidate_{i:05d}.json"
+        payload = {**source, "last_name": f"Tillman{i}"}
+        path.write_text(json.dumps(payload), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _forget_process_cache() -> None:
+    # What a fresh process starts with
+    candidate_loader._candidates.clear()
+
+
+async def _time(label: str) -> None:
+    started = time.perf_counter()
+    await candidate_loader.load_candidates()
+    elapsed = time.perf_counter() - started
+    last = candidate_loader.get_loader_stats()["last"]
+    phases = "  ".join(f"{phase}={ms:.0f}" for phase, ms in last["phases_ms"].items())
+    print(
+        f"{label:<22} {elapsed * 1000:8.1f} ms  changed={last['files_changed']:<5} "
+        f"revalidated={last['rows_revalidated']:<5} {phases}"
+    )
+
+
+async def main(files: int, changed: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "candidates"
+        data_dir.mkdir()
+        paths = _write_files(data_dir, files)
+        settings.db_path = str(Path(tmp) / "bench.db")
+        settings.data_dir = str(data_dir)
+        await database.init_db()
+        print(f"{files} candidate files, phases in ms")
+
+        await _time("cold start")
+        _forget_process_cache()
+        await _time("restart")
+        _forget_process_cache()
+        async with database.write_db() as db:
+            await db.execute("DELETE FROM candidate_files")
+        await _time("restart, no manifest")
+        await _time("warm reload")
+        for path in paths[:changed]:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            payload["work_experience"]["summary"] += " Updated."
+            path.write_text(json.dumps(payload), encoding="utf-8")
+        await _time(f"reload, {changed} edited")
+        await database.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--changed", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.files, args.changed))
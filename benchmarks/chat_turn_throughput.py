@@ -0,0 +1,93 @@
+"""Benchmark: chat turns per second with per-write commits vs. the write-behind queue.
+
+Each simulated turn performs the writes of ``chat_stream``: the user message and the
+``updated_at`` bump, the assistant message and the ``llm_requests`` row with its rollups.
+"per-write" commits each step on its own, as the app did before the write-behind queue;
+"group commit" awaits only the user message and queues the rest.
+
+Usage (from the repo root):
+    ENV=dev uv run python benchmarks/chat_turn_throughput.py [--sessions 16] [--turns 50]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database
+from app.config import settings
+from app.routers.chat import _insert_assistant_message, _insert_user_message
+from app.services.candidate_loader import load_candidates
+from app.services.cost_tracker import _insert_request, log_request
+
+MODEL = "openai/gpt-4o-mini"
+
+
+async def _new_conversation() -> int:
+    candidate_id = Path(next(Path(settings.data_dir).glob("*.json"))).stem
+    async with database.write_db() as db:
+        cursor = await db.execute(
+            "INSERT INTO conversations (candidate_id, title) VALUES (?, 'bench')", (candidate_id,)
+        )
+    return cursor.lastrowid
+
+
+async def _per_write_turn(conversation_id: int) -> None:
+    async with database.write_db() as db:
+        await _insert_user_message(db, conversation_id, "What did you build at your last job?")
+    async with database.write_db() as db:
+        await _insert_assistant_message(db, conversation_id, "streamed answer " * 200)
+    async with database.write_db() as db:
+        await _insert_request(db, conversation_id, MODEL, 1200, 300, 0.0004)
+
+
+async def _group_commit_turn(conversation_id: int) -> None:
+    await database.commit_write(_insert_user_message, conversation_id, "What did you build at your last job?")
+    database.queue_write(_insert_assistant_message, conversation_id, "streamed answer " * 200)
+    await log_request(conversation_id, MODEL, 1200, 300)
+
+
+async def _run(label: str, turn, sessions: int, turns: int) -> None:
+    conversation_ids = [await _new_conversation() for _ in range(sessions)]
+
+    async def _session(conversation_id: int) -> None:
+        for _ in range(turns):
+            await turn(conversation_id)
+
+    commits_before = database.get_db_stats()["writes"]
+    started = time.perf_counter()
+    await asyncio.gather(*(_session(c) for c in conversation_ids))
+    await database.flush_writes()
+    elapsed = time.perf_counter() - started
+    commits = database.get_db_stats()["writes"] - commits_before
+    print(
+        f"{label:<14} {sessions * turns / elapsed:8.1f} turns/s  "
+        f"{elapsed:6.2f} s  {commits} commits for {sessions * turns} turns"
+    )
+
+
+async def main(sessions: int, turns: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.db_path = str(Path(tmp) / "bench.db")
+        await database.init_db()
+        await load_candidates()
+        print(
+            f"{sessions} concurrent sessions x {turns} turns, "
+            f"window {settings.database_write_batch_window_ms} ms, max batch {settings.database_write_batch_max_size}"
+        )
+        await _run("per-write", _per_write_turn, sessions, turns)
+        await _run("group commit", _group_commit_turn, sessions, turns)
+        print(f"largest group commit: {database.get_db_stats()['write_behind']['max_group_size']} writes")
+        await database.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.turns))
@@ -0,0 +1,126 @@
+"""Load test: chat page latency while streaming-style writes hammer the database.
+
+Seeds a throwaway database, then measures ``GET /chat/{id}`` latency with the writer
+idle and again while concurrent tasks keep committing assistant messages and
+``llm_requests`` rows, the way ``chat_stream`` does at the end of each answer.
+
+Usage (from the repo root):
+    ENV=dev uv run python benchmarks/db_read_write_contention.py [--pages 200] [--writers 8]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from httpx import ASGITransport
+
+from app import database
+from app.config import settings
+from app.main import app
+from app.services.candidate_loader import load_candidates
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _seed(conversations: int, turns: int) -> list[int]:
+    candidate_id = Path(next(Path(settings.data_dir).glob("*.json"))).stem
+    ids = []
+    async with database.write_db() as db:
+        for n in range(conversations):
+            cursor = await db.execute(
+                "INSERT INTO conversations (candidate_id, title) VALUES (?, ?)", (candidate_id, f"Interview {n}")
+            )
+            ids.append(cursor.lastrowid)
+            await db.executemany(
+                "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
+                [
+                    (cursor.lastrowid, "user" if t % 2 == 0 else "assistant", "lorem ipsum " * 40)
+                    for t in range(turns)
+                ],
+            )
+    return ids
+
+
+async def _page_loads(client: httpx.AsyncClient, conversation_ids: list[int], pages: int) -> list[float]:
+    latencies = []
+
+    async def _load(i: int) -> None:
+        started = time.perf_counter()
+        resp = await client.get(f"/chat/{conversation_ids[i % len(conversation_ids)]}")
+        resp.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+    for start in range(0, pages, 10):
+        await asyncio.gather(*(_load(i) for i in range(start, min(pages, start + 10))))
+    return latencies
+
+
+async def _writer(conversation_ids: list[int], stop: asyncio.Event) -> int:
+    commits = 0
+    while not stop.is_set():
+        conversation_id = conversation_ids[commits % len(conversation_ids)]
+        async with database.write_db() as db:
+            await db.execute(
+                "INSERT INTO messages (conversation_id, role, content) VALUES (?, 'assistant', ?)",
+                (conversation_id, "streamed answer " * 200),
+            )
+            await db.execute(
+                "INSERT INTO llm_requests (conversation_id, model_id, input_tokens, output_tokens, cost_usd) "
+                "VALUES (?, 'openai/gpt-4o-mini', 1200, 300, 0.0004)",
+                (conversation_id,),
+            )
+        commits += 1
+    return commits
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    print(
+        f"{label:<22} n={len(latencies):<5} "
+        f"p50={_percentile(latencies, 0.5) * 1000:7.2f} ms  "
+        f"p95={_percentile(latencies, 0.95) * 1000:7.2f} ms  "
+        f"max={max(latencies) * 1000:7.2f} ms"
+    )
+
+
+async def main(pages: int, writers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.db_path = str(Path(tmp) / "bench.db")
+        await database.init_db()
+        await load_candidates()
+        conversation_ids = await _seed(conversations=50, turns=40)
+
+        async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            idle = await _page_loads(client, conversation_ids, pages)
+
+            stop = asyncio.Event()
+            writer_tasks = [asyncio.create_task(_writer(conversation_ids, stop)) for _ in range(writers)]
+            busy = await _page_loads(client, conversation_ids, pages)
+            stop.set()
+            commits = sum(await asyncio.gather(*writer_tasks))
+
+        print(f"read pool: {settings.database_read_pool_size} connections, {writers} concurrent writers")
+        _report("pages, writer idle", idle)
+        _report("pages, writers busy", busy)
+        stats = database.get_db_stats()
+        print(
+            f"writes committed: {commits}, max write queue depth: {stats['max_write_queue_depth']}, "
+            f"write wait p95: {stats['write_wait']['p95_ms']} ms, read wait p95: {stats['read_wait']['p95_ms']} ms"
+        )
+        await database.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--writers", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.writers))
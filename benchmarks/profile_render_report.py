@@ -0,0 +1,39 @@
+"""Report prompt token counts of the compact profile rendering against the raw JSON.
+
+Usage (from the repo root):
+    ENV=dev uv run python benchmarks/profile_render_report.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.models import Candidate
+from app.services.profile_renderer import render_candidate, render_sections
+from app.services.tokens import count_tokens
+
+
+def main() -> None:
+    print(f"{'profile':<28} {'section':<14} {'json':>8} {'rendered':>9} {'saved':>8}")
+    for path in sorted(Path(settings.data_dir).glob("*.json")):
+        candidate = Candidate.model_validate(json.loads(path.read_text(encoding="utf-8")))
+        profile = candidate.work_experience
+        rendered = render_sections(candidate)
+        for section, text in rendered.items():
+            raw = getattr(profile, section)
+            raw_json = json.dumps(
+                [item.model_dump(mode="json") for item in raw] if isinstance(raw, list) else raw
+            )
+            json_tokens, text_tokens = count_tokens(raw_json), count_tokens(text)
+            saved = 1 - text_tokens / json_tokens if json_tokens else 0.0
+            print(f"{path.stem:<28} {section:<14} {json_tokens:>8} {text_tokens:>9} {saved:>7.1%}")
+        json_tokens = count_tokens(candidate.model_dump_json())
+        text_tokens = count_tokens(render_candidate(candidate))
+        print(f"{path.stem:<28} {'TOTAL':<14} {json_tokens:>8} {text_tokens:>9} {1 - text_tokens / json_tokens:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
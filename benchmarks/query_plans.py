@@ -0,0 +1,122 @@
+"""Query plans and timings for the hot-path queries before and after the index migrations.
+
+Builds a synthetic database with the base schema only (``user_version = 0``), times the
+history, sidebar and budget queries, then runs the migration runner and times them again.
+After the migrations the budget comes from today's row of the ``cost_daily`` rollup.
+
+Usage (from the repo root):
+    ENV=dev uv run python benchmarks/query_plans.py [--messages 2000000] [--requests 500000]
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database
+from app.config import settings
+from app.services.cost_tracker import TODAY_TOTALS
+
+SIDEBAR = (
+    "SELECT c.*, TRIM(ca.first_name || ' ' || ca.last_name) AS candidate_name FROM conversations c "
+    "JOIN candidates ca ON c.candidate_id = ca.id ORDER BY c.updated_at DESC"
+)
+HISTORY = (
+    "SELECT id, role, content FROM messages "
+    "WHERE conversation_id = :conversation_id AND role != 'system' ORDER BY id"
+)
+BUDGET_BEFORE = (
+    "SELECT COALESCE(SUM(cost_usd), 0) FROM llm_requests "
+    "WHERE cost_usd IS NOT NULL AND DATE(created_at) = DATE('now')"
+)
+BUDGET_AFTER = TODAY_TOTALS
+
+
+def _populate(path: str, conversations: int, messages: int, requests: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(database.SCHEMA)
+    conn.execute(
+        "INSERT INTO candidates (id, first_name, last_name, work_experience) VALUES ('bench', 'Bench', 'Mark', '{}')"
+    )
+    conn.execute(
+        """
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+        INSERT INTO conversations (candidate_id, title, updated_at)
+        SELECT 'bench', 'Interview ' || i, datetime('now', '-' || (i % 720) || ' hours') FROM n
+        """,
+        (conversations,),
+    )
+    conn.execute(
+        """
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+        INSERT INTO messages (conversation_id, role, content)
+        SELECT 1 + (i * 7919) % ?, CASE i % 2 WHEN 0 THEN 'user' ELSE 'assistant' END, 'message ' || i FROM n
+        """,
+        (messages, conversations),
+    )
+    conn.execute(
+        """
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+        INSERT INTO llm_requests (conversation_id, model_id, input_tokens, output_tokens, cost_usd, created_at)
+        SELECT 1 + i % ?, 'openai/gpt-4o-mini', 1200, 300, 0.0004, datetime('now', '-' || (i % 525600) || ' minutes')
+        FROM n
+        """,
+        (requests, conversations),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _measure(conn: sqlite3.Connection, label: str, sql: str, params: dict, repeat: int = 5) -> None:
+    plan = "; ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(sql, params).fetchall()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"  {label:<8} {elapsed * 1000:9.2f} ms  {plan}")
+
+
+def _report(path: str, budget_sql: str) -> None:
+    conn = sqlite3.connect(path)
+    print(f"user_version = {conn.execute('PRAGMA user_version').fetchone()[0]}")
+    _measure(conn, "history", HISTORY, {"conversation_id": 42})
+    _measure(conn, "sidebar", SIDEBAR, {}, repeat=1)
+    _measure(conn, "budget", budget_sql, {})
+    conn.close()
+
+
+async def _migrate(path: str) -> None:
+    settings.db_path = path
+    started = time.perf_counter()
+    await database.init_db()
+    await database.close_db()
+    print(f"\nmigrations applied in {time.perf_counter() - started:.1f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=20_000)
+    parser.add_argument("--messages", type=int, default=2_000_000)
+    parser.add_argument("--requests", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "bench.db")
+        started = time.perf_counter()
+        _populate(path, args.conversations, args.messages, args.requests)
+        print(
+            f"populated {args.messages} messages, {args.conversations} conversations, "
+            f"{args.requests} llm_requests in {time.perf_counter() - started:.1f} s\n"
+        )
+        _report(path, BUDGET_BEFORE)
+        asyncio.run(_migrate(path))
+        _report(path, BUDGET_AFTER)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare system-prompt token counts for full-profile vs retrieval prompt modes.
+
+Usage (from the repo root):
+    ENV=dev uv run python benchmarks/retrieval_token_savings.py [--top-k 8]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.models import Candidate
+from app.services.profile_retrieval import build_index, render_retrieved_context
+from app.services.tokens import count_tokens
+
+QUESTIONS = [
+    "What experience do you have with Kubernetes?",
+    "Tell me about your PhD dissertation.",
+    "Which publications did you write about language learning?",
+    "Have you led teams of data scientists?",
+    "What programming languages do you know?",
+    "Describe a RAG system you built.",
+    "Tell me about yourself.",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top-k", type=int, default=settings.profile_retrieval_top_k)
+    args = parser.parse_args()
+
+    for path in sorted(Path(settings.data_dir).glob("*.json")):
+        candidate = Candidate.model_validate(json.loads(path.read_text(encoding="utf-8")))
+        full_tokens = count_tokens(candidate.model_dump_json())
+        index = build_index(candidate)
+        print(f"\n{path.name}: {len(index.chunks)} chunks, full profile = {full_tokens} tokens")
+        print(f"{'question':<60} {'retrieval':>10} {'saved':>8}")
+        savings = []
+        for question in QUESTIONS:
+            tokens = count_tokens(render_retrieved_context(index, question, args.top_k))
+            savings.append(1 - tokens / full_tokens)
+            print(f"{question:<60} {tokens:>10} {savings[-1]:>7.1%}")
+        print(f"{'mean saving':<60} {'':>10} {sum(savings) / len(savings):>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 from app import database
 from app.config import settings
 from app.services.candidate_loader import load_candidates
+from app.services.cost_tracker import seed_budget_ledger
 
 TEST_CANDIDATE_ID = "philip_j_fry"
 SOURCE_JSON_PATH = Path("data/candidates/phil_tillman.json")
@@ -58,20 +59,21 @@ class UnitTestEnv:
         )
         settings.db_path = str(self._tmp_path / "test.db")
         settings.data_dir = str(data_dir)
-        database._db = None
         await database.init_db()
         await load_candidates()
+        await seed_budget_ledger()
         return self
 
     async def __aexit__(self, *exc):
-        if database._db is not None:
-            db = await database.get_db()
-            await db.execute(
-                "DELETE FROM candidates WHERE id = ?", (TEST_CANDIDATE_ID,)
-            )
-            await db.commit()
-            await database._db.close()
-            database._db = None
+        if database._writer is not None:
+            await database.flush_writes()
+            async with database.write_db() as db:
+                await db.execute("DELETE FROM llm_requests")
+                await db.execute("DELETE FROM conversations WHERE candidate_id = ?", (TEST_CANDIDATE_ID,))
+                await db.execute(
+                    "DELETE FROM candidates WHERE id = ?", (TEST_CANDIDATE_ID,)
+                )
+            await database.close_db()
         settings.db_path = self._orig_db
         settings.data_dir = self._orig_data
 
@@ -80,3 +82,20 @@ class UnitTestEnv:
 def test_candidate_source_data():
     """Load phil_tillman.json once per session as the canonical test data."""
     return json.loads(SOURCE_JSON_PATH.read_text(encoding="utf-8"))
+
+
+class _WhitespaceEncoding:
+    """Offline stand-in for a tiktoken encoding: one token per whitespace-separated word."""
+
+    name = "whitespace"
+
+    def encode(self, text: str, **_kwargs) -> list[int]:
+        return [0] * len(text.split())
+
+
+@pytest.fixture
+def offline_encoding(monkeypatch):
+    """Avoid downloading tiktoken BPE files in unit tests."""
+    from app.services import tokens
+
+    monkeypatch.setattr(tokens, "get_encoding", lambda _name=tokens.DEFAULT_ENCODING: _WhitespaceEncoding())
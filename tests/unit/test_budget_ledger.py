@@ -0,0 +1,212 @@
+"""Tests for the in-memory daily budget ledger and stream reservations."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.config import settings
+from app.services import budget
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+MODEL = "openai/gpt-4o-mini"
+
+
+def test_reservations_hold_budget_and_roll_over_at_midnight(monkeypatch):
+    monkeypatch.setattr(settings, "max_daily_cost_usd", 1.0)
+    monkeypatch.setattr(budget, "_utc_today", lambda: "2026-01-01")
+    ledger = budget.BudgetLedger()
+    ledger.seed(0.5, 100, 10)
+
+    first = ledger.reserve(0.3)
+    assert first is not None
+    assert ledger.reserve(0.3) is None
+    assert not ledger.is_limit_reached()
+
+    ledger.record(0.1, 50, 5, reservation=first)
+    assert ledger.reserved_usd == 0
+    assert ledger.totals()["daily_total_usd"] == 0.6
+    assert ledger.reserve(0.3) is not None
+    assert ledger.is_limit_reached() is False
+    held = ledger.reserve(0.1)
+    assert held is not None and ledger.is_limit_reached()
+
+    monkeypatch.setattr(budget, "_utc_today", lambda: "2026-01-02")
+    assert ledger.totals()["daily_total_usd"] == 0.0
+    # In-flight streams from before midnight still hold their share
+    assert ledger.reserved_usd == 0.4
+
+
+def test_concurrent_chats_cannot_overshoot_the_limit(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import asyncio
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.routers import chat
+            from app.services import pricing
+
+            monkeypatch.setitem(pricing._pricing, MODEL, {"input": 1e-6, "output": 2e-6})
+            # One turn reserves just over $2, so a second concurrent turn does not fit
+            monkeypatch.setattr(settings, "budget_max_output_tokens", 1_000_000)
+            monkeypatch.setattr(settings, "max_daily_cost_usd", 3.0)
+            gate = asyncio.Event()
+
+            async def _fake_stream_chat(messages, model):
+                await gate.wait()
+                yield {"type": "token", "content": "Yes."}
+                yield {"type": "usage", "input_tokens": 1000, "output_tokens": 5}
+
+            monkeypatch.setattr(chat, "stream_chat", _fake_stream_chat)
+            ledger = budget.get_budget_ledger()
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                convs = [
+                    (await client.post("/api/conversations", json={"candidate_id": TEST_CANDIDATE_ID})).json()
+                    for _ in range(2)
+                ]
+                first = asyncio.create_task(
+                    client.post(f"/api/chat/{convs[0]['id']}", json={"message": "Python?", "model": MODEL})
+                )
+                while ledger.reserved_usd == 0:
+                    await asyncio.sleep(0.01)
+
+                second = await client.post(f"/api/chat/{convs[1]['id']}", json={"message": "Go?", "model": MODEL})
+                assert second.status_code == 429
+                gate.set()
+                assert (await first).status_code == 200
+
+            assert ledger.reserved_usd == 0
+            assert ledger.totals()["daily_total_usd"] == 1000 * 1e-6 + 5 * 2e-6
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT COUNT(*) AS n FROM messages WHERE conversation_id = ?", (convs[1]["id"],)
+                )
+            assert rows[0]["n"] == 0
+
+    _run_coro_in_thread(_run())
+
+
+def test_edit_refused_by_the_budget_leaves_the_thread_unchanged(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.routers import chat
+            from app.services import pricing
+
+            monkeypatch.setitem(pricing._pricing, MODEL, {"input": 1e-6, "output": 2e-6})
+            # A turn reserves just over $2, more than is left once $1.5 is held
+            monkeypatch.setattr(settings, "budget_max_output_tokens", 1_000_000)
+            monkeypatch.setattr(settings, "max_daily_cost_usd", 3.0)
+            sent = []
+
+            async def _fake_stream_chat(messages, model):
+                sent.append(messages)
+                yield {"type": "token", "content": "Edited answer."}
+                yield {"type": "usage", "input_tokens": 10, "output_tokens": 5}
+
+            monkeypatch.setattr(chat, "stream_chat", _fake_stream_chat)
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                conv = (await client.post("/api/conversations", json={"candidate_id": TEST_CANDIDATE_ID})).json()
+                async with database.write_db() as db:
+                    for role, content in [("user", "Python?"), ("assistant", "Yes."), ("user", "Go?")]:
+                        await db.execute(
+                            "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
+                            (conv["id"], role, content),
+                        )
+                    await db.execute(
+                        "INSERT INTO conversation_summaries (conversation_id, summary, summarized_through_id) "
+                        "SELECT ?, 'Asked about Python', MAX(id) FROM messages WHERE conversation_id = ?",
+                        (conv["id"], conv["id"]),
+                    )
+
+                async def _thread():
+                    async with database.read_db() as db:
+                        messages = await db.execute_fetchall(
+                            "SELECT id, role, content FROM messages WHERE conversation_id = ? ORDER BY id",
+                            (conv["id"],),
+                        )
+                        summaries = await db.execute_fetchall(
+                            "SELECT summary FROM conversation_summaries WHERE conversation_id = ?", (conv["id"],)
+                        )
+                    return [tuple(row) for row in messages], [row["summary"] for row in summaries]
+
+                before = await _thread()
+                first_id = before[0][0][0]
+                url = f"/api/chat/{conv['id']}/edit/{first_id}"
+                held = budget.get_budget_ledger().reserve(1.5)
+                resp = await client.post(url, json={"message": "Rust?", "model": MODEL})
+                assert resp.status_code == 429
+                assert await _thread() == before
+
+                budget.get_budget_ledger().release(held)
+                resp = await client.post(url, json={"message": "Rust?", "model": MODEL})
+                assert resp.status_code == 200
+                # The context sent is the edited thread: no later turns, no stale summary
+                assert [m["content"] for m in sent[0][1:]] == ["Rust?"]
+                assert "Asked about Python" not in sent[0][0]["content"]
+                messages, summaries = await _thread()
+                assert [row[2] for row in messages][:1] == ["Rust?"] and summaries == []
+
+    _run_coro_in_thread(_run())
+
+
+def test_refused_turn_writes_nothing_and_starts_no_summary(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import asyncio
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.services import chat_context, pricing
+
+            monkeypatch.setitem(pricing._pricing, MODEL, {"input": 1e-6, "output": 2e-6})
+            monkeypatch.setattr(settings, "budget_max_output_tokens", 1_000_000)
+            monkeypatch.setattr(settings, "max_daily_cost_usd", 3.0)
+            # Far over budget, so building the context finds turns to summarize
+            monkeypatch.setattr(settings, "context_budgets", {MODEL: 10})
+            summaries = []
+
+            async def _fake_summary(messages, model):
+                summaries.append(messages)
+                yield {"type": "token", "content": "Summary."}
+
+            monkeypatch.setattr(chat_context, "stream_chat", _fake_summary)
+            async with database.write_db() as db:
+                cursor = await db.execute(
+                    "INSERT INTO conversations (candidate_id, title, updated_at) VALUES (?, 'Old', ?)",
+                    (TEST_CANDIDATE_ID, "2026-01-01 00:00:00"),
+                )
+                conversation_id = cursor.lastrowid
+                await db.executemany(
+                    "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
+                    [(conversation_id, "user" if i % 2 == 0 else "assistant", f"turn {i}") for i in range(4)],
+                )
+
+            held = budget.get_budget_ledger().reserve(1.5)
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                resp = await client.post(f"/api/chat/{conversation_id}", json={"message": "Go?", "model": MODEL})
+            assert resp.status_code == 429
+            await asyncio.gather(*chat_context._summary_tasks)
+            assert summaries == []
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT updated_at, (SELECT COUNT(*) FROM messages WHERE conversation_id = c.id) AS n "
+                    "FROM conversations c WHERE id = ?",
+                    (conversation_id,),
+                )
+            assert (rows[0]["updated_at"], rows[0]["n"]) == ("2026-01-01 00:00:00", 4)
+            budget.get_budget_ledger().release(held)
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,70 @@
+"""Tests for the bounded, lazily populated candidate cache."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.services import candidate_loader
+from app.services.candidate_cache import CachedCandidate, CandidateCache
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def _entry(size: int) -> CachedCandidate:
+    return CachedCandidate(b"x" * size, "hash", "hash")
+
+
+def test_lru_is_bounded_by_count_and_bytes():
+    cache = CandidateCache(max_entries=3, max_bytes=250)
+    for candidate_id in ("a", "b", "c"):
+        cache.put(candidate_id, _entry(50))
+    assert cache.get("a") is not None
+    cache.put("d", _entry(50))
+    # "b" was least recently used
+    assert list(cache) == ["c", "a", "d"]
+
+    cache.put("e", _entry(200))
+    assert list(cache) == ["d", "e"]
+    assert cache.get("b") is None
+    # Growing an entry evicts others, but never the entry itself
+    cache.resize("e", 100)
+    assert list(cache) == ["e"]
+    assert cache.stats() == {
+        "entries": 1,
+        "bytes": 300,
+        "max_entries": 3,
+        "max_bytes": 250,
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+        "evictions": 4,
+    }
+
+
+def test_evicted_candidates_reload_from_the_database(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            monkeypatch.setattr(candidate_loader._candidates, "max_entries", 1)
+            other = {**test_candidate_source_data, "first_name": "Amy", "middle_name": "", "last_name": "Wong"}
+            async with database.write_db() as db:
+                await db.execute(
+                    "INSERT INTO candidates (id, first_name, last_name, work_experience) VALUES (?, ?, ?, ?)",
+                    ("amy_wong", "Amy", "Wong", json.dumps(other)),
+                )
+
+            text = candidate_loader.get_profile_text(TEST_CANDIDATE_ID)
+            assert candidate_loader._candidates.peek(TEST_CANDIDATE_ID).text == text
+            assert (await candidate_loader.load_candidate("amy_wong")).last_name == "Wong"
+            # Only one entry fits; the other is gone until something asks for it again
+            assert candidate_loader.get_profile_text(TEST_CANDIDATE_ID) is None
+            assert await candidate_loader.ensure_loaded(TEST_CANDIDATE_ID)
+            assert candidate_loader.get_profile_text(TEST_CANDIDATE_ID) == text
+            assert list(candidate_loader._candidates) == [TEST_CANDIDATE_ID]
+            assert candidate_loader.get_loader_stats()["cache"]["evictions"] >= 2
+
+            async with database.write_db() as db:
+                await db.execute("DELETE FROM candidates WHERE id = 'amy_wong'")
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,79 @@
+"""Tests for ETags and conditional GETs of candidate downloads, pages and the candidate list."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.services import candidate_loader
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+DOWNLOAD_URL = f"/api/candidates/{TEST_CANDIDATE_ID}/"
+PAGE_URL = f"/work-experience?candidate_id={TEST_CANDIDATE_ID}"
+
+
+def test_download_and_page_answer_304_until_the_profile_changes(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                first = await client.get(DOWNLOAD_URL)
+                etag = first.headers["ETag"]
+                assert first.status_code == 200 and etag.startswith('"')
+                entry = candidate_loader._candidates.peek(TEST_CANDIDATE_ID)
+                assert entry.responses["download"] == (etag, first.content)
+
+                resp = await client.get(DOWNLOAD_URL, headers={"If-None-Match": f'"other", W/{etag}'})
+                assert resp.status_code == 304 and resp.content == b""
+                assert resp.headers["ETag"] == etag
+
+                page = await client.get(PAGE_URL)
+                page_etag = page.headers["ETag"]
+                assert page.status_code == 200 and "window.__profileData" in page.text
+                assert (await client.get(PAGE_URL, headers={"If-None-Match": page_etag})).status_code == 304
+                # Served again from the bytes kept on the cache entry
+                assert (await client.get(PAGE_URL)).content == page.content
+
+                resp = await client.put(
+                    f"/api/candidates/{TEST_CANDIDATE_ID}/work-experience",
+                    json={**test_candidate_source_data["work_experience"], "summary": "Changed"},
+                )
+                assert resp.status_code == 200
+                changed = await client.get(DOWNLOAD_URL, headers={"If-None-Match": etag})
+                assert changed.status_code == 200 and changed.headers["ETag"] != etag
+                assert changed.json()["work_experience"]["summary"] == "Changed"
+                resp = await client.get(PAGE_URL, headers={"If-None-Match": page_etag})
+                assert resp.status_code == 200 and "Changed" in resp.text
+
+    _run_coro_in_thread(_run())
+
+
+def test_candidate_list_etag_follows_its_content(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                first = await client.get("/api/candidates")
+                etag = first.headers["ETag"]
+                assert [row["id"] for row in first.json()] == [TEST_CANDIDATE_ID]
+                assert (await client.get("/api/candidates", headers={"If-None-Match": etag})).status_code == 304
+                page_etag = (await client.get(PAGE_URL)).headers["ETag"]
+
+                async with database.write_db() as db:
+                    await db.execute(
+                        "INSERT INTO candidates (id, first_name, last_name, work_experience) VALUES (?, ?, ?, ?)",
+                        ("amy_wong", "Amy", "Wong", "{}"),
+                    )
+                resp = await client.get("/api/candidates", headers={"If-None-Match": etag})
+                assert resp.status_code == 200 and len(resp.json()) == 2
+                # The page lists every candidate, so it changes too
+                assert (await client.get(PAGE_URL, headers={"If-None-Match": page_etag})).status_code == 200
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,129 @@
+"""Tests for bulk candidate imports over the validation process pool."""
+
+import io
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.config import settings
+from app.services import candidate_import, candidate_loader
+from app.services.candidate_validation import shutdown_validation_pool
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def _small_batches(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "import_workers", 1)
+    monkeypatch.setattr(settings, "import_chunk_size", 2)
+    monkeypatch.setattr(settings, "import_batch_size", 2)
+
+
+async def _last_names() -> dict[str, str]:
+    async with database.read_db() as db:
+        rows = await db.execute_fetchall("SELECT id, last_name FROM candidates ORDER BY id")
+    return {row["id"]: row["last_name"] for row in rows}
+
+
+def test_directory_import_reports_bad_documents_and_stores_the_rest(
+    tmp_path: Path, test_candidate_source_data, monkeypatch
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            _small_batches(monkeypatch)
+            source = tmp_path / "import"
+            source.mkdir()
+            for name in ("amy_wong", "hermes_conrad", "zapp_brannigan"):
+                document = {**test_candidate_source_data, "last_name": name.split("_")[1].title()}
+                (source / f"{name}.json").write_text(json.dumps(document), encoding="utf-8")
+            (source / "broken.json").write_text("{not json", encoding="utf-8")
+            (source / "leela.json").write_text(json.dumps({"work_experience": "nope"}), encoding="utf-8")
+            # Re-importing an existing candidate replaces it and drops its cached entry
+            replacement = {**test_candidate_source_data, "last_name": "Replaced"}
+            (source / f"{TEST_CANDIDATE_ID}.json").write_text(json.dumps(replacement), encoding="utf-8")
+            assert await candidate_loader.load_candidate(TEST_CANDIDATE_ID) is not None
+
+            report = await candidate_import.import_candidates(candidate_import.iter_directory(source))
+            assert (report["accepted"], report["rejected"], report["batches"]) == (4, 2, 2)
+            assert [Path(error["record"]).name for error in report["errors"]] == ["broken.json", "leela.json"]
+            assert report["errors"][0]["error"].startswith("Invalid JSON")
+            assert "work_experience" in report["errors"][1]["error"]
+
+            names = await _last_names()
+            assert names["amy_wong"] == "Wong" and names["zapp_brannigan"] == "Brannigan"
+            assert "broken" not in names and "leela" not in names
+            assert (await candidate_loader.load_candidate(TEST_CANDIDATE_ID)).last_name == "Replaced"
+        shutdown_validation_pool()
+
+    _run_coro_in_thread(_run())
+
+
+def test_jsonl_lines_take_their_id_from_the_document(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            _small_batches(monkeypatch)
+            lines = [
+                json.dumps({**test_candidate_source_data, "id": "amy_wong", "last_name": "Wong"}),
+                "",
+                json.dumps({**test_candidate_source_data, "last_name": "Anonymous"}),
+                json.dumps({**test_candidate_source_data, "id": "../etc", "last_name": "Sneaky"}),
+                json.dumps({**test_candidate_source_data, "id": "big", "padding": "x" * 100_000}),
+            ]
+            monkeypatch.setattr(settings, "import_max_document_mb", 2 * len(lines[0]) / (1024 * 1024))
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+
+            async def chunks():
+                # Split mid-line, as a network stream would
+                for start in range(0, len(payload), 1000):
+                    yield payload[start : start + 1000]
+
+            report = await candidate_import.import_candidates(candidate_import.iter_jsonl(chunks()))
+            assert report["accepted"] == 1
+            assert [error["record"] for error in report["errors"]] == ["line 5", "line 3", "line 4"]
+            assert "exceeds" in report["errors"][0]["error"]
+            assert report["errors"][1]["error"] == "Document has no string id"
+            assert report["errors"][2]["error"].startswith("Invalid candidate id")
+            assert (await _last_names())["amy_wong"] == "Wong"
+        shutdown_validation_pool()
+
+    _run_coro_in_thread(_run())
+
+
+def test_import_endpoint_accepts_zip_and_jsonl(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            _small_batches(monkeypatch)
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("people/amy_wong.json", json.dumps({**test_candidate_source_data, "last_name": "Wong"}))
+                zf.writestr("__MACOSX/people/._amy_wong.json", "junk")
+            jsonl = json.dumps({**test_candidate_source_data, "id": "kif_kroker", "last_name": "Kroker"})
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                url = "/api/candidates/import"
+                assert (await client.post(url, content=jsonl)).status_code == 404
+                monkeypatch.setattr(settings, "admin_token", "s3cret")
+                headers = {"Authorization": "Bearer s3cret"}
+                resp = await client.post(
+                    url, content=archive.getvalue(), headers={**headers, "Content-Type": "application/zip"}
+                )
+                assert resp.status_code == 200
+                assert (resp.json()["accepted"], resp.json()["rejected"]) == (1, 0)
+                resp = await client.post(
+                    url, content=jsonl, headers={**headers, "Content-Type": "application/x-ndjson"}
+                )
+                assert resp.json()["accepted"] == 1
+                resp = await client.post(url, content=jsonl, headers={**headers, "Content-Type": "text/plain"})
+                assert resp.status_code == 415
+
+            names = await _last_names()
+            assert (names["amy_wong"], names["kif_kroker"]) == ("Wong", "Kroker")
+        shutdown_validation_pool()
+
+    _run_coro_in_thread(_run())
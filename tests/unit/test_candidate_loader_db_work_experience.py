@@ -16,11 +16,10 @@ def test_startup_load_candidates_stores_and_uses_db_work_experience(
 
     async def _run():
         async with UnitTestEnv(tmp_path, source_data):
-            db = await database.get_db()
-
-            rows = await db.execute_fetchall(
-                "SELECT id, first_name, last_name, middle_name, work_experience FROM candidates"
-            )
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT id, first_name, last_name, middle_name, work_experience FROM candidates"
+                )
             assert len(rows) == 1
             assert rows[0]["id"] == TEST_CANDIDATE_ID
             assert rows[0]["first_name"] == "Philip"
@@ -44,14 +43,15 @@ def test_startup_load_candidates_stores_and_uses_db_work_experience(
                     "publications": [],
                 },
             }
-            await db.execute(
-                "UPDATE candidates SET work_experience = ? WHERE id = ?",
-                (json.dumps(replacement), TEST_CANDIDATE_ID),
-            )
-            await db.commit()
+            async with database.write_db() as db:
+                await db.execute(
+                    "UPDATE candidates SET work_experience = ? WHERE id = ?",
+                    (json.dumps(replacement), TEST_CANDIDATE_ID),
+                )
 
             await load_candidates()
-            rows_after = await db.execute_fetchall("SELECT id FROM candidates")
+            async with database.read_db() as db:
+                rows_after = await db.execute_fetchall("SELECT id FROM candidates")
             assert len(rows_after) == 1
             profile_after = json.loads(get_profile_json(TEST_CANDIDATE_ID))
             assert profile_after["work_experience"]["summary"] == "from db"
@@ -64,11 +64,11 @@ def test_startup_load_candidates_stores_and_uses_db_work_experience(
                 "education": [],
                 "publications": [],
             }
-            await db.execute(
-                "UPDATE candidates SET work_experience = ? WHERE id = ?",
-                (json.dumps(legacy_replacement), TEST_CANDIDATE_ID),
-            )
-            await db.commit()
+            async with database.write_db() as db:
+                await db.execute(
+                    "UPDATE candidates SET work_experience = ? WHERE id = ?",
+                    (json.dumps(legacy_replacement), TEST_CANDIDATE_ID),
+                )
 
             await load_candidates()
             profile_after_legacy = json.loads(get_profile_json(TEST_CANDIDATE_ID))
@@ -0,0 +1,80 @@
+"""Tests for per-id candidate lookups on cache misses and the admin reload."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.config import settings
+from app.services import candidate_loader
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def _lookups() -> dict:
+    return dict(candidate_loader.get_loader_stats()["lookups"])
+
+
+def test_misses_are_coalesced_and_unknown_ids_negatively_cached(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            loads = candidate_loader.get_loader_stats()["loads"]
+            candidate_loader._forget_candidate(TEST_CANDIDATE_ID)
+            before = _lookups()
+            results = await asyncio.gather(*(candidate_loader.load_candidate(TEST_CANDIDATE_ID) for _ in range(5)))
+            after = _lookups()
+            assert [result.last_name for result in results] == ["Tillman"] * 5
+            assert (after["lookups"] - before["lookups"], after["coalesced"] - before["coalesced"]) == (1, 4)
+
+            assert await candidate_loader.load_candidate("nobody") is None
+            assert await candidate_loader.load_candidate("nobody") is None
+            assert await candidate_loader.load_candidate("../candidates/philip_j_fry") is None
+            final = _lookups()
+            assert final["lookups"] - after["lookups"] == 2
+            assert final["negative_hits"] - after["negative_hits"] == 1
+            # None of this rescanned the whole directory
+            assert candidate_loader.get_loader_stats()["loads"] == loads
+
+    _run_coro_in_thread(_run())
+
+
+def test_new_file_is_found_by_id_and_clears_negative_entry(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            assert await candidate_loader.load_candidate("amy_wong") is None
+            assert "amy_wong" in candidate_loader._missing
+            candidate_loader._missing.clear()
+
+            extra = {**test_candidate_source_data, "first_name": "Amy", "middle_name": "", "last_name": "Wong"}
+            (Path(settings.data_dir) / "amy_wong.json").write_text(json.dumps(extra), encoding="utf-8")
+            candidate = await candidate_loader.load_candidate("amy_wong")
+            assert candidate.first_name == "Amy"
+            async with database.write_db() as db:
+                rows = await db.execute_fetchall("SELECT last_name FROM candidates WHERE id = 'amy_wong'")
+                assert [row["last_name"] for row in rows] == ["Wong"]
+                await db.execute("DELETE FROM candidates WHERE id = 'amy_wong'")
+            candidate_loader._forget_candidate("amy_wong")
+
+    _run_coro_in_thread(_run())
+
+
+def test_full_reload_needs_admin_token(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                assert (await client.post("/api/candidates/reload")).status_code == 404
+                monkeypatch.setattr(settings, "admin_token", "s3cret")
+                headers = {"Authorization": "Bearer wrong"}
+                assert (await client.post("/api/candidates/reload", headers=headers)).status_code == 401
+                headers = {"Authorization": "Bearer s3cret"}
+                resp = await client.post("/api/candidates/reload", headers=headers)
+                assert resp.status_code == 200
+                assert resp.json()["files"] == 1
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,54 @@
+"""Tests for the hash-gated, incremental candidate loader."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.config import settings
+from app.services.candidate_loader import get_candidate, get_loader_stats, load_candidates
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def test_unchanged_files_are_skipped_and_changed_ones_reloaded(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            path = Path(settings.data_dir) / f"{TEST_CANDIDATE_ID}.json"
+            first = get_loader_stats()["last"]
+            assert (first["files"], first["files_changed"]) == (1, 1)
+            assert set(first["phases_ms"]) == {"rows", "scan", "hash", "validate", "write", "cache"}
+
+            await load_candidates()
+            assert get_loader_stats()["last"]["files_changed"] == 0
+            assert get_loader_stats()["last"]["rows_revalidated"] == 0
+
+            # Same content with a new mtime only refreshes the manifest
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            await load_candidates()
+            assert (get_loader_stats()["last"]["files_changed"], get_loader_stats()["last"]["files_touched"]) == (0, 1)
+            await load_candidates()
+            assert get_loader_stats()["last"]["files_touched"] == 0
+
+            # A new candidate file is inserted; the DB copy of the existing one still wins over its file
+            extra = {**test_candidate_source_data, "first_name": "Amy", "middle_name": "", "last_name": "Wong"}
+            (Path(settings.data_dir) / "amy_wong.json").write_text(json.dumps(extra), encoding="utf-8")
+            await load_candidates()
+            assert get_loader_stats()["last"]["files_changed"] == 1
+            assert get_candidate("amy_wong").last_name == "Wong"
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall("SELECT candidate_id FROM candidate_files ORDER BY candidate_id")
+            assert [row["candidate_id"] for row in rows] == ["amy_wong", TEST_CANDIDATE_ID]
+
+            (Path(settings.data_dir) / "amy_wong.json").unlink()
+            await load_candidates()
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall("SELECT candidate_id FROM candidate_files")
+            assert [row["candidate_id"] for row in rows] == [TEST_CANDIDATE_ID]
+            async with database.write_db() as db:
+                await db.execute("DELETE FROM candidates WHERE id = 'amy_wong'")
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,71 @@
+"""Tests for hot reload of the candidate data directory."""
+
+import asyncio
+import json
+import sys
+from contextlib import suppress
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.config import settings
+from app.services import candidate_loader, candidate_watcher
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+async def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "watcher did not pick up the change"
+        await asyncio.sleep(0.01)
+
+
+def test_watcher_applies_added_edited_and_deleted_files(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    monkeypatch.setattr(settings, "candidates_watch_interval_seconds", 0.01)
+    monkeypatch.setattr(settings, "candidates_watch_debounce_seconds", 0.05)
+
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            loads = candidate_loader.get_loader_stats()["loads"]
+            watcher = asyncio.create_task(candidate_watcher.run_candidate_watcher())
+            try:
+                data_dir = Path(settings.data_dir)
+                extra = {**test_candidate_source_data, "first_name": "Amy", "middle_name": "", "last_name": "Wong"}
+                (data_dir / "amy_wong.json").write_text(json.dumps(extra), encoding="utf-8")
+                await _wait_for(lambda: candidate_loader.get_candidate("amy_wong") is not None)
+
+                # A live edit replaces the profile, including the derived prompt rendering
+                edited = json.loads(json.dumps(test_candidate_source_data))
+                edited["work_experience"]["summary"] = "Edited while the app was running."
+                (data_dir / f"{TEST_CANDIDATE_ID}.json").write_text(json.dumps(edited), encoding="utf-8")
+                await _wait_for(lambda: "Edited while" in (candidate_loader.get_profile_text(TEST_CANDIDATE_ID) or ""))
+                async with database.read_db() as db:
+                    rows = await db.execute_fetchall(
+                        "SELECT work_experience FROM candidates WHERE id = ?", (TEST_CANDIDATE_ID,)
+                    )
+                assert "Edited while" in rows[0]["work_experience"]
+
+                # Deleting a file drops its candidate, unless conversations still point at it
+                async with database.write_db() as db:
+                    await db.execute(
+                        "INSERT INTO conversations (candidate_id, title) VALUES (?, 't')", (TEST_CANDIDATE_ID,)
+                    )
+                kept = candidate_watcher.get_watcher_stats()["kept"]
+                (data_dir / f"{TEST_CANDIDATE_ID}.json").unlink()
+                (data_dir / "amy_wong.json").unlink()
+                await _wait_for(lambda: candidate_loader.get_candidate("amy_wong") is None)
+                await _wait_for(lambda: candidate_watcher.get_watcher_stats()["kept"] == kept + 1)
+                assert candidate_loader.get_candidate(TEST_CANDIDATE_ID) is not None
+                async with database.read_db() as db:
+                    rows = await db.execute_fetchall("SELECT id FROM candidates")
+                    manifest = await db.execute_fetchall("SELECT path FROM candidate_files")
+                assert [row["id"] for row in rows] == [TEST_CANDIDATE_ID]
+                assert manifest == []
+                assert candidate_loader.get_loader_stats()["loads"] == loads
+            finally:
+                watcher.cancel()
+                with suppress(asyncio.CancelledError):
+                    await watcher
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,223 @@
+"""Tests for the token-budgeted chat history window and rolling summaries."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+MODEL = "openai/gpt-4o-mini"
+
+
+async def _conversation_with_turns(n_turns: int, words_per_turn: int) -> int:
+    async with database.write_db() as db:
+        cursor = await db.execute(
+            "INSERT INTO conversations (candidate_id, title) VALUES (?, 'Long interview')", (TEST_CANDIDATE_ID,)
+        )
+        conversation_id = cursor.lastrowid
+        for i in range(n_turns):
+            role = "user" if i % 2 == 0 else "assistant"
+            await db.execute(
+                "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
+                (conversation_id, role, f"turn{i} " + "word " * (words_per_turn - 1)),
+            )
+    return conversation_id
+
+
+def test_history_over_budget_is_folded_into_background_summary(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.config import settings
+            from app.services import chat_context
+
+            monkeypatch.setattr(settings, "context_budgets", {MODEL: 100})
+            summarized = {"prompt": None}
+
+            async def _fake_stream_chat(messages, model):
+                summarized["prompt"] = messages[-1]["content"]
+                yield {"type": "token", "content": "Asked about turns 0-5."}
+                yield {"type": "usage", "input_tokens": 10, "output_tokens": 5}
+
+            monkeypatch.setattr(chat_context, "stream_chat", _fake_stream_chat)
+
+            conversation_id = await _conversation_with_turns(n_turns=10, words_per_turn=10)
+
+            # system prompt (3 words) + 6 turns x (10 + 4 overhead) fits in 100 tokens
+            async with database.read_db() as db:
+                window = await chat_context.build_context_messages(db, conversation_id, "You are helpful.", MODEL)
+            assert window.kept_turns == 6
+            assert window.messages[1]["content"].startswith("turn4 ")
+            assert window.pending_tokens == 4 * 14
+
+            await asyncio.gather(*chat_context._summary_tasks)
+            assert "turn0" in summarized["prompt"] and "turn3" in summarized["prompt"]
+
+            async with database.read_db() as db:
+                window = await chat_context.build_context_messages(db, conversation_id, "You are helpful.", MODEL)
+            assert chat_context.SUMMARY_HEADER in window.messages[0]["content"]
+            assert "Asked about turns 0-5." in window.messages[0]["content"]
+            assert window.summarized_tokens == 4 * 14
+            assert window.pending_tokens == 0
+            assert window.messages[1]["content"].startswith("turn4 ")
+
+            await database.flush_writes()
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT COUNT(*) AS n FROM llm_requests WHERE conversation_id = ?", (conversation_id,)
+                )
+            assert rows[0]["n"] == 1
+
+    _run_coro_in_thread(_run())
+
+
+def test_newest_turn_is_always_kept(tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.config import settings
+            from app.services import chat_context
+
+            monkeypatch.setattr(settings, "context_budgets", {MODEL: 5})
+            monkeypatch.setattr(chat_context, "_schedule_summary_refresh", lambda *args: None)
+            conversation_id = await _conversation_with_turns(n_turns=3, words_per_turn=50)
+
+            async with database.read_db() as db:
+                window = await chat_context.build_context_messages(db, conversation_id, "system", MODEL)
+            assert window.kept_turns == 1
+            assert window.messages[-1]["content"].startswith("turn2 ")
+
+    _run_coro_in_thread(_run())
+
+
+def test_refresh_racing_an_edit_does_not_store_a_stale_summary(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.config import settings
+            from app.routers.chat import _rewrite_from_message
+            from app.services import chat_context
+
+            monkeypatch.setattr(settings, "context_budgets", {MODEL: 100})
+            started, gate = asyncio.Event(), asyncio.Event()
+
+            async def _fake_stream_chat(messages, model):
+                started.set()
+                await gate.wait()
+                yield {"type": "token", "content": "Summary of the original turns."}
+
+            monkeypatch.setattr(chat_context, "stream_chat", _fake_stream_chat)
+            conversation_id = await _conversation_with_turns(n_turns=9, words_per_turn=10)
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT id FROM messages WHERE conversation_id = ? ORDER BY id", (conversation_id,)
+                )
+                await chat_context.build_context_messages(db, conversation_id, "You are helpful.", MODEL)
+            await started.wait()
+
+            # turn2 is the last turn being summarized; editing it keeps its id but changes its content
+            assert await database.commit_write(_rewrite_from_message, conversation_id, rows[2]["id"], "Edited")
+            gate.set()
+            await asyncio.gather(*chat_context._summary_tasks)
+
+            async with database.read_db() as db:
+                summaries = await db.execute_fetchall(
+                    "SELECT * FROM conversation_summaries WHERE conversation_id = ?", (conversation_id,)
+                )
+            assert summaries == []
+
+    _run_coro_in_thread(_run())
+
+
+def test_editing_a_long_thread_keeps_the_summary_of_the_turns_before_it(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.config import settings
+            from app.main import app
+            from app.routers import chat
+            from app.services import chat_context
+
+            monkeypatch.setattr(settings, "context_budgets", {MODEL: 100})
+
+            edited = asyncio.Event()
+
+            async def _fake_summary(messages, model):
+                # Finishes only after the edit has been committed
+                await edited.wait()
+                yield {"type": "token", "content": "Summary of the turns before the edit."}
+                yield {"type": "usage", "input_tokens": 10, "output_tokens": 5}
+
+            async def _fake_answer(messages, model):
+                yield {"type": "token", "content": "Answer."}
+
+            monkeypatch.setattr(chat_context, "stream_chat", _fake_summary)
+            monkeypatch.setattr(chat, "stream_chat", _fake_answer)
+            conversation_id = await _conversation_with_turns(n_turns=9, words_per_turn=10)
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT id FROM messages WHERE conversation_id = ? ORDER BY id", (conversation_id,)
+                )
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                resp = await client.post(
+                    f"/api/chat/{conversation_id}/edit/{rows[6]['id']}", json={"message": "Edited", "model": MODEL}
+                )
+                assert resp.status_code == 200
+            edited.set()
+            await asyncio.gather(*chat_context._summary_tasks)
+
+            async with database.read_db() as db:
+                summaries = await db.execute_fetchall(
+                    "SELECT summary, summarized_through_id FROM conversation_summaries WHERE conversation_id = ?",
+                    (conversation_id,),
+                )
+            assert [tuple(row) for row in summaries] == [("Summary of the turns before the edit.", rows[5]["id"])]
+
+    _run_coro_in_thread(_run())
+
+
+def test_summary_refresh_is_skipped_without_budget_room(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.config import settings
+            from app.services import budget, chat_context, pricing
+
+            monkeypatch.setattr(settings, "context_budgets", {MODEL: 100})
+            monkeypatch.setattr(settings, "max_daily_cost_usd", 1.0)
+            monkeypatch.setitem(pricing._pricing, MODEL, {"input": 1e-6, "output": 2e-6})
+            calls = []
+
+            async def _fake_stream_chat(messages, model):
+                calls.append(messages)
+                yield {"type": "token", "content": "Summary."}
+
+            monkeypatch.setattr(chat_context, "stream_chat", _fake_stream_chat)
+            conversation_id = await _conversation_with_turns(n_turns=10, words_per_turn=10)
+            ledger = budget.get_budget_ledger()
+            held = ledger.reserve(1.0)
+
+            async with database.read_db() as db:
+                window = await chat_context.build_context_messages(db, conversation_id, "You are helpful.", MODEL)
+            assert window.pending_tokens > 0
+            await asyncio.gather(*chat_context._summary_tasks)
+            assert calls == [] and conversation_id not in chat_context._summarizing
+            assert ledger.reserved_usd == 1.0
+
+            # With room again the refresh runs and its reservation is settled
+            ledger.release(held)
+            async with database.read_db() as db:
+                await chat_context.build_context_messages(db, conversation_id, "You are helpful.", MODEL)
+            await asyncio.gather(*chat_context._summary_tasks)
+            assert len(calls) == 1 and ledger.reserved_usd == 0
+
+    _run_coro_in_thread(_run())
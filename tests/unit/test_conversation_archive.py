@@ -0,0 +1,120 @@
+"""Tests for archiving idle conversations into compressed cold storage."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+async def _conversation(updated_at: str, n_messages: int) -> tuple[int, list[int]]:
+    async with database.write_db() as db:
+        cursor = await db.execute(
+            "INSERT INTO conversations (candidate_id, title, updated_at) VALUES (?, 'Old interview', ?)",
+            (TEST_CANDIDATE_ID, updated_at),
+        )
+        conversation_id = cursor.lastrowid
+        ids = []
+        for i in range(n_messages):
+            cursor = await db.execute(
+                "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
+                (conversation_id, "user" if i % 2 == 0 else "assistant", f"Kubernetes answer {i} " * 30),
+            )
+            ids.append(cursor.lastrowid)
+    return conversation_id, ids
+
+
+def test_idle_conversation_is_archived_and_restored_on_open(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.services import archive, search
+
+            idle, message_ids = await _conversation("2020-01-01 00:00:00", 6)
+            active, _ = await _conversation("2999-01-01 00:00:00", 2)
+
+            assert await archive.archive_idle_conversations() == 1
+            assert await archive.archive_idle_conversations() == 0
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT conversation_id, COUNT(*) AS n FROM messages GROUP BY conversation_id"
+                )
+                assert [(r["conversation_id"], r["n"]) for r in rows] == [(active, 2)]
+            stats = await archive.get_archive_stats()
+            assert (stats["conversations"], stats["messages"]) == (1, 6)
+            assert stats["compression_ratio"] > 5
+            # Archived messages stay findable by content, as does the title
+            hits = (await search.search("kubernetes answer 5"))["items"]
+            assert [(r["kind"], r["conversation_id"], r["message_id"]) for r in hits] == [
+                ("message", idle, message_ids[5])
+            ]
+            assert hits[0]["role"] is None and "<mark>answer</mark>" in hits[0]["snippet"]
+            assert ("title", idle) in {(r["kind"], r["conversation_id"]) for r in (await search.search("old"))["items"]}
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                html = (await client.get(f"/chat/{idle}")).text
+            assert "Kubernetes answer 5" in html
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT id FROM messages WHERE conversation_id = ? ORDER BY id", (idle,)
+                )
+                conversation = (await db.execute_fetchall("SELECT * FROM conversations WHERE id = ?", (idle,)))[0]
+            assert [r["id"] for r in rows] == message_ids
+            assert conversation["archived_at"] is None and conversation["restored_at"] is not None
+            assert (await archive.get_archive_stats())["conversations"] == 0
+            # Just opened, so not idle any more
+            assert await archive.archive_idle_conversations() == 0
+            hits = (await search.search("answer"))["items"]
+            assert ("message", idle) in {(r["kind"], r["conversation_id"]) for r in hits}
+
+    _run_coro_in_thread(_run())
+
+
+def test_changed_or_deleted_conversations_are_not_lost(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.services import archive
+
+            conversation_id, message_ids = await _conversation("2020-01-01 00:00:00", 3)
+            # A message that arrived after the thread was read for archiving
+            stale = await database.commit_write(
+                archive._store_archive, conversation_id, 2, message_ids[1], b"", 0
+            )
+            assert stale is False
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT id FROM messages WHERE conversation_id = ?", (conversation_id,)
+                )
+            assert len(rows) == 3
+
+            assert await archive.archive_conversation(conversation_id)
+            assert await archive.ensure_restored(conversation_id)
+            assert not await archive.ensure_restored(conversation_id)
+
+            await database.commit_write(
+                lambda db: db.execute("UPDATE conversations SET restored_at = NULL WHERE id = ?", (conversation_id,))
+            )
+            assert await archive.archive_conversation(conversation_id)
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT COUNT(*) AS n FROM messages_fts WHERE conversation_id = ?", (conversation_id,)
+                )
+            assert rows[0]["n"] == 3
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                await client.delete(f"/api/conversations/{conversation_id}")
+            assert (await archive.get_archive_stats())["conversations"] == 0
+            # Deleting an archived thread drops the index rows it kept
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT COUNT(*) AS n FROM messages_fts WHERE conversation_id = ?", (conversation_id,)
+                )
+            assert rows[0]["n"] == 0
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,110 @@
+"""Tests for keyset pagination of conversations and messages."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+async def _seed_conversations(n: int) -> list[int]:
+    ids = []
+    async with database.write_db() as db:
+        for i in range(n):
+            # Pairs share a timestamp so ties have to be broken by id
+            cursor = await db.execute(
+                "INSERT INTO conversations (candidate_id, title, updated_at) VALUES (?, ?, ?)",
+                (TEST_CANDIDATE_ID, f"c{i}", f"2026-01-0{1 + i // 2} 10:00:00"),
+            )
+            ids.append(cursor.lastrowid)
+    return ids
+
+
+def test_conversation_pages_walk_every_row_once(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            ids = await _seed_conversations(7)
+            seen = []
+            cursor = None
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                while True:
+                    params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+                    page = (await client.get("/api/conversations", params=params)).json()
+                    assert len(page["items"]) <= 3
+                    seen.extend(item["id"] for item in page["items"])
+                    cursor = page["next_cursor"]
+                    if cursor is None:
+                        break
+                assert seen == sorted(ids, key=lambda i: (ids.index(i) // 2, i), reverse=True)
+                assert page["items"][-1]["candidate_name"]
+
+                assert (await client.get("/api/conversations", params={"cursor": "not-a-cursor"})).status_code == 400
+                assert (await client.get("/api/conversations", params={"limit": 0})).status_code == 422
+
+    _run_coro_in_thread(_run())
+
+
+def test_title_filter_covers_pages_not_loaded_yet(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            ids = await _seed_conversations(7)
+            async with database.write_db() as db:
+                await db.execute("UPDATE conversations SET title = 'Kubernetes_100%' WHERE id = ?", (ids[0],))
+                await db.execute("UPDATE conversations SET title = 'kubernetes deep dive' WHERE id = ?", (ids[6],))
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                # The oldest match is beyond the first page of the unfiltered list
+                page = (await client.get("/api/conversations", params={"limit": 1, "q": "KUBERNETES"})).json()
+                assert [item["id"] for item in page["items"]] == [ids[6]]
+                params = {"limit": 1, "q": "kubernetes", "cursor": page["next_cursor"]}
+                page = (await client.get("/api/conversations", params=params)).json()
+                assert [item["id"] for item in page["items"]] == [ids[0]] and page["next_cursor"] is None
+                # LIKE wildcards in the query are literal
+                page = (await client.get("/api/conversations", params={"q": "_100%"})).json()
+                assert [item["id"] for item in page["items"]] == [ids[0]]
+                assert (await client.get("/api/conversations", params={"q": "c_"})).json()["items"] == []
+
+    _run_coro_in_thread(_run())
+
+
+def test_message_pages_and_first_page_rendered_server_side(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.config import settings
+            from app.main import app
+
+            monkeypatch.setattr(settings, "pagination_messages_page_size", 4)
+            (conversation_id,) = await _seed_conversations(1)
+            async with database.write_db() as db:
+                await db.executemany(
+                    "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
+                    [(conversation_id, "user" if i % 2 == 0 else "assistant", f"m{i}") for i in range(10)],
+                )
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                html = (await client.get(f"/chat/{conversation_id}")).text
+                assert ">m9<" in html and ">m6<" in html and ">m5<" not in html
+
+                url = f"/api/conversations/{conversation_id}/messages"
+                page = (await client.get(url)).json()
+                assert f'data-next-cursor="{page["next_cursor"]}"' in html
+                contents = [m["content"] for m in page["items"]]
+                while page["next_cursor"] is not None:
+                    page = (await client.get(url, params={"before": page["next_cursor"]})).json()
+                    contents = [m["content"] for m in page["items"]] + contents
+                assert contents == [f"m{i}" for i in range(10)]
+
+                assert (await client.get("/api/conversations/999999/messages")).status_code == 404
+
+    _run_coro_in_thread(_run())
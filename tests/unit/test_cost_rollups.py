@@ -0,0 +1,135 @@
+"""Tests for the incrementally maintained daily/monthly cost rollups."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from conftest import UnitTestEnv, _run_coro_in_thread
+
+PRICED = "openai/gpt-4o-mini"
+UNPRICED = "acme/unlisted-model"
+
+
+async def _rollup_rows(table: str) -> list[dict]:
+    async with database.read_db() as db:
+        rows = await db.execute_fetchall(f"SELECT * FROM {table} ORDER BY 1, 2")
+    return [{**dict(r), "cost_usd": round(r["cost_usd"], 12)} for r in rows]
+
+
+def test_log_request_updates_rollups_read_by_cost_endpoints(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.services.cost_tracker import log_request
+
+            await log_request(None, PRICED, 1000, 200)
+            await log_request(None, PRICED, 3000, 400)
+            usage = await log_request(None, UNPRICED, 500, 50)
+            assert usage["daily_input_tokens"] == 4500
+            assert usage["daily_output_tokens"] == 650
+            await database.flush_writes()
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                daily = (await client.get("/api/costs/daily")).json()
+                monthly = (await client.get("/api/costs/monthly")).json()
+                today = (await client.get("/api/costs/today")).json()
+
+            # Unpriced calls stay out of the cost charts until they can be priced
+            assert [(row["model"], row["calls"], row["input_tokens"]) for row in daily] == [(PRICED, 2, 4000)]
+            assert [(row["model"], row["calls"]) for row in monthly] == [(PRICED, 2)]
+            assert daily[0]["total"] > 0
+            assert today["daily_input_tokens"] == 4500
+            assert today["total_cost_usd"] == pytest.approx(daily[0]["total"])
+
+            # The endpoints read only the rollups, not the request log
+            async with database.write_db() as db:
+                await db.execute("DELETE FROM llm_requests")
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                assert (await client.get("/api/costs/daily")).json() == daily
+
+    _run_coro_in_thread(_run())
+
+
+def test_reconcile_and_rebuild_keep_rollups_consistent(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.services import pricing
+            from app.services.cost_tracker import (
+                get_daily_costs,
+                get_reconciler_stats,
+                log_request,
+                rebuild_cost_rollups,
+                reconcile_missing_costs,
+            )
+
+            await log_request(None, PRICED, 1000, 200)
+            await log_request(None, UNPRICED, 500, 50)
+            await database.flush_writes()
+            before = await _rollup_rows("cost_daily")
+            assert [(r["model_id"], r["calls"], r["unpriced_calls"]) for r in before] == [
+                (UNPRICED, 0, 1),
+                (PRICED, 1, 0),
+            ]
+
+            # Reading costs no longer prices anything on the request path
+            assert {row["model"] for row in await get_daily_costs()} == {PRICED}
+            assert await reconcile_missing_costs() == 0
+            assert get_reconciler_stats()["backlog"] == 1
+
+            monkeypatch.setitem(pricing._pricing, UNPRICED, {"input": 1e-06, "output": 2e-06})
+            assert await reconcile_missing_costs() == 1
+            assert get_reconciler_stats()["backlog"] == 0
+            daily = await get_daily_costs()
+            assert {row["model"]: row["calls"] for row in daily} == {PRICED: 1, UNPRICED: 1}
+            incremental = await _rollup_rows("cost_daily"), await _rollup_rows("cost_monthly")
+            unpriced = next(r for r in incremental[0] if r["model_id"] == UNPRICED)
+            assert (unpriced["unpriced_calls"], unpriced["unpriced_input_tokens"]) == (0, 0)
+            assert unpriced["cost_usd"] == pytest.approx(500 * 1e-06 + 50 * 2e-06)
+
+            assert await rebuild_cost_rollups() == 2
+            assert (await _rollup_rows("cost_daily"), await _rollup_rows("cost_monthly")) == incremental
+
+    _run_coro_in_thread(_run())
+
+
+def test_reconciler_batches_skip_models_without_pricing(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.config import settings
+            from app.services import pricing
+            from app.services.budget import get_budget_ledger
+            from app.services.cost_tracker import get_reconciler_stats, log_request, reconcile_missing_costs
+
+            monkeypatch.setattr(settings, "cost_reconciler_batch_size", 2)
+            for _ in range(3):
+                await log_request(None, UNPRICED, 100, 10)
+            for _ in range(3):
+                await log_request(None, "acme/later-model", 100, 10)
+            await database.flush_writes()
+            spent = get_budget_ledger().spent_usd
+
+            # Older rows of a still-unknown model must not block the ones that can be priced
+            monkeypatch.setitem(pricing._pricing, "acme/later-model", {"input": 1e-06, "output": 1e-06})
+            assert await reconcile_missing_costs() == 2
+            assert get_reconciler_stats()["backlog"] == 4
+            assert await reconcile_missing_costs() == 1
+            assert await reconcile_missing_costs() == 0
+            assert get_reconciler_stats()["backlog"] == 3
+            assert get_budget_ledger().spent_usd == pytest.approx(spent + 3 * 110 * 1e-06)
+
+    _run_coro_in_thread(_run())
+
+
+def test_rebuild_command(tmp_path: Path, monkeypatch, capsys):
+    from app.cli import main as cli_main
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "cli.db"))
+    cli_main(["rebuild-cost-rollups"])
+    assert "Rebuilt cost rollups: 0 daily rows" in capsys.readouterr().out
@@ -0,0 +1,82 @@
+"""Tests for the SQLite performance profile and background maintenance."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.config import settings
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def test_profile_applies_to_every_connection_and_is_reported(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    monkeypatch.setattr(settings, "database_synchronous", "FULL")
+    monkeypatch.setattr(settings, "database_cache_size_kib", 4096)
+    monkeypatch.setattr(settings, "database_busy_timeout_ms", 1234)
+
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            async with database.write_db() as db:
+                assert (await db.execute_fetchall("PRAGMA synchronous"))[0][0] == 2
+                assert (await db.execute_fetchall("PRAGMA busy_timeout"))[0][0] == 1234
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                report = (await client.get("/api/diagnostics/database/settings")).json()
+            pragmas = report["pragmas"]
+            assert pragmas["journal_mode"] == "wal"
+            assert pragmas["synchronous"] == "FULL"
+            assert pragmas["cache_size"] == -4096
+            assert pragmas["temp_store"] == "MEMORY"
+            assert pragmas["busy_timeout"] == 1234
+            assert pragmas["auto_vacuum"] == "INCREMENTAL"
+            assert report["wal_size_bytes"] > 0
+
+    _run_coro_in_thread(_run())
+
+
+def test_maintenance_reclaims_free_pages_and_checkpoints(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            async with database.write_db() as db:
+                cursor = await db.execute(
+                    "INSERT INTO conversations (candidate_id, title) VALUES (?, 'bulky')", (TEST_CANDIDATE_ID,)
+                )
+                await db.executemany(
+                    "INSERT INTO messages (conversation_id, role, content) VALUES (?, 'user', ?)",
+                    [(cursor.lastrowid, "x" * 4000) for _ in range(200)],
+                )
+            async with database.write_db() as db:
+                await db.execute("DELETE FROM messages")
+
+            runs_before = (await database.get_db_settings())["maintenance"]["runs"]
+            stats = await database.run_maintenance()
+            assert stats["runs"] == runs_before + 1
+            assert stats["last_vacuumed_pages"] > 0
+            assert not stats["last_checkpoint"]["busy"]
+            assert stats["last_checkpoint"]["checkpointed_frames"] == stats["last_checkpoint"]["wal_frames"]
+            report = await database.get_db_settings()
+            assert report["pragmas"]["freelist_count"] == 0
+            assert report["maintenance"]["last_run_at"] == stats["last_run_at"]
+
+    _run_coro_in_thread(_run())
+
+
+def test_unknown_synchronous_mode_is_rejected(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "bad.db"))
+    monkeypatch.setattr(settings, "database_synchronous", "SOMETIMES")
+
+    async def _run():
+        try:
+            with pytest.raises(ValueError, match="database.synchronous"):
+                await database.init_db()
+        finally:
+            await database.close_db()
+
+    _run_coro_in_thread(_run())
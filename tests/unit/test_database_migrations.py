@@ -0,0 +1,58 @@
+"""Tests for the PRAGMA user_version migration runner."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.config import settings
+from conftest import UnitTestEnv, _run_coro_in_thread
+
+
+def test_fresh_database_is_fully_migrated(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.services.cost_tracker import TODAY_TOTALS
+
+            async with database.read_db() as db:
+                version = await db.execute_fetchall("PRAGMA user_version")
+                assert version[0][0] == len(database.MIGRATIONS)
+                # Today's spend is a primary key lookup in the daily rollup
+                plan = await db.execute_fetchall(f"EXPLAIN QUERY PLAN {TODAY_TOTALS}")
+                assert "cost_daily USING PRIMARY KEY (day=?)" in plan[0]["detail"]
+                plan = await db.execute_fetchall(
+                    "EXPLAIN QUERY PLAN SELECT id FROM messages WHERE conversation_id = 1 ORDER BY id"
+                )
+                assert "idx_messages_conversation" in plan[0]["detail"]
+
+    _run_coro_in_thread(_run())
+
+
+def test_legacy_database_is_upgraded_once(tmp_path: Path, monkeypatch):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE candidates (id TEXT PRIMARY KEY, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(settings, "db_path", str(db_path))
+
+    async def _run():
+        await database.init_db()
+        await database.close_db()
+        # A second start finds nothing left to apply
+        await database.init_db()
+        await database.close_db()
+
+    _run_coro_in_thread(_run())
+
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(candidates)")}
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(database.MIGRATIONS)
+    # Created without auto_vacuum, so the upgrade rebuilt it for incremental vacuum
+    assert database.AUTO_VACUUM_MODES[conn.execute("PRAGMA auto_vacuum").fetchone()[0]] == "INCREMENTAL"
+    conn.close()
+    assert {"first_name", "last_name", "middle_name", "work_experience"} <= columns
+    assert {"idx_messages_conversation", "idx_conversations_updated", "idx_llm_requests_created"} <= indexes
@@ -0,0 +1,136 @@
+"""Tests for the read-only connection pool and the queued single writer."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def test_reads_do_not_wait_behind_an_open_write(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import asyncio
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            release = asyncio.Event()
+            holding = asyncio.Event()
+
+            async def _slow_writer():
+                async with database.write_db() as db:
+                    await db.execute(
+                        "INSERT INTO conversations (candidate_id, title) VALUES (?, 'pending')", (TEST_CANDIDATE_ID,)
+                    )
+                    holding.set()
+                    await release.wait()
+
+            writer = asyncio.create_task(_slow_writer())
+            await holding.wait()
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                resp = await asyncio.wait_for(client.get("/api/conversations"), timeout=5)
+                assert resp.status_code == 200
+                # The uncommitted conversation is not visible to readers yet
+                assert resp.json()["items"] == []
+                assert not writer.done()
+
+                release.set()
+                await writer
+                resp = await client.get("/api/conversations")
+                assert [c["title"] for c in resp.json()["items"]] == ["pending"]
+
+    _run_coro_in_thread(_run())
+
+
+def test_writers_queue_in_order_and_roll_back_on_error(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import asyncio
+            import sqlite3
+
+            order = []
+
+            async def _write(title: str):
+                async with database.write_db() as db:
+                    await db.execute(
+                        "INSERT INTO conversations (candidate_id, title) VALUES (?, ?)", (TEST_CANDIDATE_ID, title)
+                    )
+                    await asyncio.sleep(0.01)
+                    order.append(title)
+
+            await asyncio.gather(*(_write(f"c{i}") for i in range(5)))
+            assert order == [f"c{i}" for i in range(5)]
+            stats = database.get_db_stats()
+            assert stats["max_write_queue_depth"] >= 4
+            assert stats["write_queue_depth"] == 0
+            assert stats["write_wait"]["samples"] >= 5
+
+            try:
+                async with database.write_db() as db:
+                    await db.execute(
+                        "INSERT INTO conversations (candidate_id, title) VALUES (?, 'rolled back')", (TEST_CANDIDATE_ID,)
+                    )
+                    raise RuntimeError("boom")
+            except RuntimeError:
+                pass
+
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall("SELECT title FROM conversations ORDER BY id")
+                assert [r["title"] for r in rows] == [f"c{i}" for i in range(5)]
+                try:
+                    await db.execute("DELETE FROM conversations")
+                    raise AssertionError("reader connections must be read-only")
+                except sqlite3.OperationalError:
+                    pass
+
+    _run_coro_in_thread(_run())
+
+
+def test_queued_writes_share_group_commits_and_fail_alone(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import asyncio
+            from app.config import settings
+
+            monkeypatch.setattr(settings, "database_write_batch_window_ms", 50)
+
+            async def _insert(db, title: str) -> int:
+                cursor = await db.execute(
+                    "INSERT INTO conversations (candidate_id, title) VALUES (?, ?)", (TEST_CANDIDATE_ID, title)
+                )
+                return cursor.lastrowid
+
+            async def _fail(db) -> None:
+                await db.execute(
+                    "INSERT INTO conversations (candidate_id, title) VALUES (?, 'lost')", (TEST_CANDIDATE_ID,)
+                )
+                raise RuntimeError("boom")
+
+            commits_before = database.get_db_stats()["write_behind"]["group_commits"]
+            fire_and_forget = database.queue_write(_insert, "queued")
+            failing = database.queue_write(_fail)
+            ids = await asyncio.gather(*(database.commit_write(_insert, f"c{i}") for i in range(5)))
+            assert fire_and_forget.done() and isinstance(failing.exception(), RuntimeError)
+
+            stats = database.get_db_stats()["write_behind"]
+            assert stats["group_commits"] - commits_before == 1
+            assert stats["max_group_size"] == 7
+            assert stats["failed"] == 1 and stats["pending"] == 0
+
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall("SELECT id, title FROM conversations ORDER BY id")
+            assert [r["title"] for r in rows] == ["queued"] + [f"c{i}" for i in range(5)]
+            assert ids == [r["id"] for r in rows[1:]]
+
+            # Shutdown commits whatever is still queued
+            database.queue_write(_insert, "at shutdown")
+            await database.close_db()
+            await database.init_db()
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall("SELECT title FROM conversations WHERE title = 'at shutdown'")
+            assert len(rows) == 1
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,54 @@
+"""Tests for the shared, pooled OpenRouter HTTP client."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from conftest import UnitTestEnv, _run_coro_in_thread
+
+
+def test_shared_client_is_reused_and_counts_requests(monkeypatch):
+    async def _run():
+        import httpx
+        from app.services import http_client, llm
+
+        await http_client.close_http_client()
+        client = await http_client.init_http_client()
+        assert http_client.get_http_client() is client
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                json={"data": [{"id": "openai/gpt-4o-mini", "pricing": {"prompt": "0.1", "completion": "0.2"}}]},
+            )
+
+        monkeypatch.setattr(client, "_transport", httpx.MockTransport(_handler))
+        before = http_client.get_http_stats()["requests"]
+        await llm.fetch_models()
+        catalog = await llm.fetch_models()
+        assert http_client.get_http_client() is client
+        assert http_client.get_http_stats()["requests"] == before + 2
+        assert catalog[0]["id"] == "openai/gpt-4o-mini"
+
+        await http_client.close_http_client()
+        assert http_client._client is None
+
+    _run_coro_in_thread(_run())
+
+
+def test_http_diagnostics_endpoint(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                resp = await client.get("/api/diagnostics/http")
+                assert resp.status_code == 200
+                body = resp.json()
+                assert {"requests", "connections_opened", "connections_reused", "reuse_ratio"} <= body["pool"].keys()
+                assert "p95_seconds" in body["time_to_first_token"]
+
+    _run_coro_in_thread(_run())
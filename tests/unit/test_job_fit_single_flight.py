@@ -0,0 +1,134 @@
+"""Tests for coalescing identical in-flight job-fit runs."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+MODEL = "openai/gpt-4o-mini"
+
+
+def test_late_joiner_receives_prefix_then_shares_upstream():
+    async def _run():
+        from app.services.stream_fanout import in_flight_count, join_stream
+
+        release = asyncio.Event()
+        starts = {"count": 0}
+
+        async def _source(stream):
+            starts["count"] += 1
+            yield {"n": 1}
+            await release.wait()
+            yield {"n": 2, "subscribers": stream.subscribers}
+
+        first = join_stream("k", _source)
+        assert await first.__anext__() == {"n": 1}
+
+        second = join_stream("k", _source)
+        assert await second.__anext__() == {"n": 1}
+        release.set()
+        rest_first = [event async for event in first]
+        rest_second = [event async for event in second]
+
+        assert starts["count"] == 1
+        assert rest_first == rest_second == [{"n": 2, "subscribers": 2}]
+        assert in_flight_count() == 0
+
+    _run_coro_in_thread(_run())
+
+
+def test_concurrent_identical_job_fit_requests_log_one_request(
+    tmp_path: Path, test_candidate_source_data, monkeypatch
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.routers import job_fit
+            from app.services import pricing
+
+            calls = {"count": 0}
+
+            async def _fake_stream_chat(messages, model):
+                calls["count"] += 1
+                yield {"type": "token", "content": "## Overall Assessment\n"}
+                await asyncio.sleep(0.05)
+                yield {"type": "token", "content": "Good Fit"}
+                yield {"type": "usage", "input_tokens": 500, "output_tokens": 20}
+
+            monkeypatch.setattr(job_fit, "stream_chat", _fake_stream_chat)
+            monkeypatch.setitem(pricing._pricing, MODEL, {"input": 1e-6, "output": 2e-6})
+
+            payload = {"candidate_id": TEST_CANDIDATE_ID, "job_description": "Senior Python engineer", "model": MODEL}
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                responses = await asyncio.gather(
+                    client.post("/api/job-fit", json=payload),
+                    client.post("/api/job-fit", json={**payload, "job_description": "Senior  Python engineer"}),
+                )
+
+            assert calls["count"] == 1
+            for resp in responses:
+                events = [
+                    json.loads(line[6:])
+                    for line in resp.text.splitlines()
+                    if line.startswith("data: ") and line[6:] != "[DONE]"
+                ]
+                assert "".join(e["content"] for e in events if e["type"] == "token") == "## Overall Assessment\nGood Fit"
+                assert [e for e in events if e["type"] == "usage"][0]["subscribers"] == 2
+
+            await database.flush_writes()
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall("SELECT COUNT(*) AS n FROM llm_requests")
+            assert rows[0]["n"] == 1
+
+    _run_coro_in_thread(_run())
+
+
+def test_usage_counts_subscribers_who_join_after_upstream_reported_it(
+    tmp_path: Path, test_candidate_source_data, monkeypatch
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.routers import job_fit
+            from app.services import pricing, stream_fanout
+
+            usage_sent, release = asyncio.Event(), asyncio.Event()
+
+            async def _fake_stream_chat(messages, model):
+                yield {"type": "token", "content": "Good Fit"}
+                yield {"type": "usage", "input_tokens": 500, "output_tokens": 20}
+                # The provider keeps the connection open a little after reporting usage
+                usage_sent.set()
+                await release.wait()
+
+            monkeypatch.setattr(job_fit, "stream_chat", _fake_stream_chat)
+            monkeypatch.setitem(pricing._pricing, MODEL, {"input": 1e-6, "output": 2e-6})
+
+            payload = {"candidate_id": TEST_CANDIDATE_ID, "job_description": "Senior Python engineer", "model": MODEL}
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                first = asyncio.create_task(client.post("/api/job-fit", json=payload))
+                await usage_sent.wait()
+                second = asyncio.create_task(client.post("/api/job-fit", json=payload))
+                while next(iter(stream_fanout._in_flight.values())).subscribers < 2:
+                    await asyncio.sleep(0.01)
+                release.set()
+                responses = await asyncio.gather(first, second)
+
+            for resp in responses:
+                events = [
+                    json.loads(line[6:])
+                    for line in resp.text.splitlines()
+                    if line.startswith("data: ") and line[6:] != "[DONE]"
+                ]
+                assert events[-1]["type"] == "usage" and events[-1]["subscribers"] == 2
+
+    _run_coro_in_thread(_run())
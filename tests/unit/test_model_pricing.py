@@ -0,0 +1,83 @@
+"""Tests for the persisted model-pricing table and its background refresh."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from conftest import UnitTestEnv, _run_coro_in_thread
+
+
+def test_load_pricing_seeds_from_snapshot_and_refresh_keeps_tracked_models(
+    tmp_path: Path, test_candidate_source_data, monkeypatch
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.services import pricing
+
+            monkeypatch.setattr(pricing, "_pricing", {})
+            await pricing.load_pricing()
+            assert pricing.get_model_pricing("openai/gpt-4o-mini") == {"input": 1.5e-07, "output": 6e-07}
+
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT source FROM model_pricing WHERE model_id = 'openai/gpt-4o-mini'"
+                )
+            assert rows[0]["source"] == "snapshot"
+
+            async def _fake_fetch_models():
+                return [
+                    {"id": "openai/gpt-4o-mini", "pricing": {"prompt": "0.000001", "completion": "0.000002"}},
+                    {"id": "some/untracked-model", "pricing": {"prompt": "1", "completion": "1"}},
+                ]
+
+            monkeypatch.setattr(pricing, "fetch_models", _fake_fetch_models)
+            assert await pricing.refresh_pricing() == 1
+            assert pricing.get_model_pricing("openai/gpt-4o-mini") == {"input": 1e-06, "output": 2e-06}
+            assert pricing.get_model_pricing("some/untracked-model") is None
+
+            monkeypatch.setattr(pricing, "_pricing", {})
+            await pricing.load_pricing()
+            assert pricing.get_model_pricing("openai/gpt-4o-mini") == {"input": 1e-06, "output": 2e-06}
+
+    _run_coro_in_thread(_run())
+
+
+def test_log_request_never_downloads_catalog(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.services import cost_tracker, pricing
+
+            async def _fail_fetch_models():
+                raise AssertionError("catalog fetched on request path")
+
+            monkeypatch.setattr(pricing, "fetch_models", _fail_fetch_models)
+            info = await cost_tracker.log_request(None, "unknown/model", 10, 10)
+            assert info["request_cost_usd"] == 0.0
+            await cost_tracker.get_daily_costs()
+
+    _run_coro_in_thread(_run())
+
+
+def test_refresher_keeps_running_after_unexpected_errors(monkeypatch):
+    async def _run():
+        import asyncio
+
+        from app.services import pricing
+
+        calls = []
+
+        async def _failing_refresh():
+            calls.append(1)
+            raise KeyError("pricing")
+
+        monkeypatch.setattr(pricing, "refresh_pricing", _failing_refresh)
+        monkeypatch.setattr(pricing.settings, "pricing_refresh_interval_seconds", 0)
+        task = asyncio.create_task(pricing.run_pricing_refresher())
+        while len(calls) < 3 and not task.done():
+            await asyncio.sleep(0)
+        assert not task.done()
+        task.cancel()
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,74 @@
+"""Tests for the compact prompt rendering of Candidate profiles."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.models import Candidate
+from app.services.candidate_loader import get_profile_text, save_profile
+from app.services.profile_renderer import render_candidate
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def test_render_drops_empty_fields_and_collapses_dates():
+    candidate = Candidate.model_validate(
+        {
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "work_experience": {
+                "work": [
+                    {
+                        "start": {"year": 2020, "month": 3},
+                        "end": {"present": True},
+                        "employer": {"name": "Analytical Engines"},
+                        "roles": [
+                            {
+                                "start": {"year": 2020, "month": 3},
+                                "end": {"year": 2021, "month": 1},
+                                "title": "Engineer",
+                                "items": [{"title": "Notes", "description": "Wrote the first program"}],
+                            }
+                        ],
+                    }
+                ],
+            },
+        }
+    )
+    text = render_candidate(candidate)
+
+    assert text.startswith("# Ada Lovelace")
+    assert "### Analytical Engines | 2020-03–present" in text
+    assert "#### Engineer | 2020-03–2021-01" in text
+    assert "- Notes: Wrote the first program" in text
+    for noise in ("null", '""', "Summary", "Contribution", "{"):
+        assert noise not in text
+
+
+def test_rendering_keeps_profile_content(test_candidate_source_data):
+    candidate = Candidate.model_validate(test_candidate_source_data)
+    text = render_candidate(candidate)
+    profile = candidate.work_experience
+
+    assert len(text) < len(candidate.model_dump_json())
+    for entry in profile.work:
+        for role in entry.roles:
+            for item in role.items:
+                assert item.title in text
+                assert item.contribution[:60] in text
+    for publication in profile.publications:
+        assert publication.title in text
+
+
+def test_rendered_text_is_cached_and_refreshed_on_save(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.routers.chat import _build_system_prompt
+
+            assert get_profile_text(TEST_CANDIDATE_ID) in _build_system_prompt(TEST_CANDIDATE_ID, "Philip")
+
+            profile = Candidate.model_validate(test_candidate_source_data).work_experience
+            await save_profile(TEST_CANDIDATE_ID, profile.model_copy(update={"summary": "Rendered after save"}))
+            assert "## Summary\nRendered after save" in get_profile_text(TEST_CANDIDATE_ID)
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,90 @@
+"""Tests for section-level retrieval over candidate profiles."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.models import Candidate
+from app.services.profile_retrieval import build_index, chunk_candidate
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def test_chunks_cover_every_profile_section(test_candidate_source_data):
+    candidate = Candidate.model_validate(test_candidate_source_data)
+    profile = candidate.work_experience
+    chunks = chunk_candidate(candidate)
+    kinds = [c.kind for c in chunks]
+
+    n_items = sum(len(role.items) for entry in profile.work for role in entry.roles)
+    assert kinds.count("work_item") == n_items
+    assert kinds.count("education") == len(profile.education)
+    assert kinds.count("publication") == len(profile.publications)
+    assert {"summary", "skills"} <= set(kinds)
+
+
+def test_query_ranks_matching_section_first(test_candidate_source_data):
+    candidate = Candidate.model_validate(test_candidate_source_data)
+    index = build_index(candidate)
+    dissertation = candidate.work_experience.education[0].dissertation.title
+
+    top = index.top_chunks("Fedosov deformation quantization", k=1)
+    assert top[0].kind == "education"
+    assert dissertation in top[0].text
+    assert candidate.work_experience.publications[0].title in index.outline
+
+
+def test_retrieval_mode_shrinks_system_prompt(tmp_path: Path, test_candidate_source_data, monkeypatch):
+    async def _run():
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "profile_prompt_mode", "retrieval")
+        monkeypatch.setattr(settings, "profile_retrieval_top_k", 3)
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            from app.routers.chat import _build_system_prompt
+            from app.routers.job_fit import _build_job_fit_prompt
+
+            full = _build_system_prompt(TEST_CANDIDATE_ID, "Philip Tillman")
+            retrieved = _build_system_prompt(TEST_CANDIDATE_ID, "Philip Tillman", "Did you use Kubernetes?")
+            assert "=== RELEVANT SECTIONS ===" in retrieved
+            assert len(retrieved) < len(full) / 2
+
+            job_fit_system = _build_job_fit_prompt(TEST_CANDIDATE_ID, "Philip Tillman", "Kubernetes engineer")[0]
+            assert "=== PROFILE OUTLINE ===" in job_fit_system["content"]
+
+    _run_coro_in_thread(_run())
+
+
+def test_prompt_context_is_built_off_the_loop_and_prewarmed_on_save(
+    tmp_path: Path, test_candidate_source_data, monkeypatch
+):
+    async def _run():
+        import asyncio
+        import threading
+
+        from app.config import settings
+        from app.services import candidate_loader
+
+        monkeypatch.setattr(settings, "profile_prompt_mode", "retrieval")
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            threads = []
+
+            def _tracking(candidate):
+                threads.append(threading.current_thread())
+                return build_index(candidate)
+
+            monkeypatch.setattr(candidate_loader, "build_index", _tracking)
+            assert await candidate_loader.ensure_prompt_context(TEST_CANDIDATE_ID)
+            assert candidate_loader.get_profile_prompt_context(TEST_CANDIDATE_ID, "Kubernetes")
+            assert len(threads) == 1 and threads[0] is not threading.current_thread()
+
+            profile = candidate_loader.get_profile(TEST_CANDIDATE_ID)
+            await candidate_loader.save_profile(
+                TEST_CANDIDATE_ID, profile.model_copy(update={"summary": "Prewarmed after save"})
+            )
+            await asyncio.gather(*candidate_loader._prewarm_tasks)
+            entry = candidate_loader._candidates.peek(TEST_CANDIDATE_ID)
+            assert entry.index is not None and "Prewarmed after save" in entry.text
+            assert len(threads) == 2 and threads[1] is not threading.current_thread()
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,85 @@
+"""Tests for the exact-match LLM response cache and SSE replay."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.services.candidate_loader import get_candidate, save_candidate
+from app.services.response_cache import make_cache_key
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+MODEL = "openai/gpt-4o-mini"
+
+
+def _sse_events(text: str) -> list[dict]:
+    events = []
+    for line in text.splitlines():
+        if line.startswith("data: ") and line[6:] != "[DONE]":
+            events.append(json.loads(line[6:]))
+    return events
+
+
+def test_cache_key_normalizes_history_whitespace_and_case():
+    base = [{"role": "system", "content": "profile v1"}, {"role": "user", "content": "What is  your\nexperience?"}]
+    same = [{"role": "system", "content": "profile v1"}, {"role": "user", "content": "what is your experience?"}]
+    other_profile = [{"role": "system", "content": "profile v2"}, {"role": "user", "content": "what is your experience?"}]
+    assert make_cache_key(MODEL, base) == make_cache_key(MODEL, same)
+    assert make_cache_key(MODEL, base) != make_cache_key(MODEL, other_profile)
+    assert make_cache_key(MODEL, base) != make_cache_key("openai/gpt-4o", base)
+
+
+def test_repeated_question_is_replayed_from_cache(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.routers import chat
+            from app.services import pricing, response_cache
+
+            calls = {"count": 0}
+
+            async def _fake_stream_chat(messages, model):
+                calls["count"] += 1
+                yield {"type": "token", "content": "Ten years "}
+                yield {"type": "token", "content": "of Python."}
+                yield {"type": "usage", "input_tokens": 1000, "output_tokens": 5}
+
+            monkeypatch.setattr(chat, "stream_chat", _fake_stream_chat)
+            monkeypatch.setitem(pricing._pricing, MODEL, {"input": 1e-6, "output": 2e-6})
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                answers = []
+                for _ in range(2):
+                    conv = (await client.post("/api/conversations", json={"candidate_id": TEST_CANDIDATE_ID})).json()
+                    resp = await client.post(
+                        f"/api/chat/{conv['id']}", json={"message": "How much Python?", "model": MODEL}
+                    )
+                    assert resp.status_code == 200
+                    answers.append(_sse_events(resp.text))
+
+            assert calls["count"] == 1
+            first_usage = [e for e in answers[0] if e["type"] == "usage"][0]
+            cached_usage = [e for e in answers[1] if e["type"] == "usage"][0]
+            assert first_usage["request_cost_usd"] > 0
+            assert cached_usage["cached"] is True
+            assert cached_usage["request_cost_usd"] == 0.0
+            # Totals come from the ledger either way, so the replay repeats the live answer's
+            for key in ("daily_total_usd", "daily_input_tokens", "daily_output_tokens", "daily_limit_usd"):
+                assert cached_usage[key] == first_usage[key]
+            cached_text = "".join(e["content"] for e in answers[1] if e["type"] == "token")
+            assert cached_text == "Ten years of Python."
+
+            stats = await response_cache.get_cache_stats()
+            assert stats["entries"] == 1
+            assert stats["hits"] >= 1
+
+            candidate = get_candidate(TEST_CANDIDATE_ID)
+            await save_candidate(TEST_CANDIDATE_ID, candidate)
+            assert (await response_cache.get_cache_stats())["entries"] == 0
+
+    _run_coro_in_thread(_run())
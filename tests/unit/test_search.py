@@ -0,0 +1,111 @@
+"""Tests for full-text search over conversations and messages."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app import database
+from app.config import settings
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+async def _conversation(title: str, *contents: str) -> int:
+    async with database.write_db() as db:
+        cursor = await db.execute(
+            "INSERT INTO conversations (candidate_id, title) VALUES (?, ?)", (TEST_CANDIDATE_ID, title)
+        )
+        await db.executemany(
+            "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
+            [(cursor.lastrowid, "user" if i % 2 == 0 else "assistant", c) for i, c in enumerate(contents)],
+        )
+    return cursor.lastrowid
+
+
+def test_search_is_ranked_filtered_paginated_and_tracks_edits(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            infra = await _conversation(
+                "Infrastructure",
+                "Which conversations discussed Kubernetes?",
+                "He ran <b>Kubernetes</b> clusters and migrated workloads to Kubernetes operators.",
+            )
+            follow_up = await _conversation("Kubernetes follow-up", "Nothing relevant here.")
+            other = await _conversation("Python", "Ten years of Python.")
+
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                results = (await client.get("/api/search", params={"q": "kubernetes?"})).json()
+                kinds = {(item["kind"], item["conversation_id"]) for item in results["items"]}
+                assert ("title", follow_up) in kinds and ("message", infra) in kinds
+                hit = next(item for item in results["items"] if item["role"] == "assistant")
+                # Stored text is escaped; only the highlight markup is HTML
+                assert "&lt;b&gt;<mark>Kubernetes</mark>&lt;/b&gt;" in hit["snippet"]
+
+                page = (await client.get("/api/search", params={"q": "kubernetes", "limit": 2})).json()
+                assert len(page["items"]) == 2 and page["next_offset"] == 2
+                rest = (await client.get("/api/search", params={"q": "kubernetes", "offset": 2})).json()
+                assert rest["next_offset"] is None
+                assert len(page["items"]) + len(rest["items"]) == len(results["items"])
+
+                # Prefix match on the last word; filter by candidate
+                assert (await client.get("/api/search", params={"q": "pyth"})).json()["items"]
+                filtered = (await client.get("/api/search", params={"q": "python", "candidate_id": "nobody"})).json()
+                assert filtered["items"] == []
+
+                async with database.write_db() as db:
+                    await db.execute("UPDATE messages SET content = 'Golang now' WHERE conversation_id = ?", (other,))
+                    await db.execute("UPDATE conversations SET title = 'Go' WHERE id = ?", (other,))
+                assert (await client.get("/api/search", params={"q": "python"})).json()["items"] == []
+                await client.delete(f"/api/conversations/{other}")
+                assert (await client.get("/api/search", params={"q": "golang"})).json()["items"] == []
+
+    _run_coro_in_thread(_run())
+
+
+def test_existing_rows_are_indexed_incrementally(tmp_path: Path, monkeypatch):
+    db_path = tmp_path / "existing.db"
+    monkeypatch.setattr(settings, "db_path", str(db_path))
+    monkeypatch.setattr(settings, "search_backfill_batch_size", 3)
+    monkeypatch.setattr(settings, "search_backfill_pause_seconds", 0)
+
+    async def _run():
+        from app.services import search
+
+        # A database from before the search index existed
+        await database.init_db()
+        async with database.write_db() as db:
+            await db.execute(
+                "INSERT INTO candidates (id, first_name, last_name, work_experience) VALUES ('c', 'A', 'B', '{}')"
+            )
+            cursor = await db.execute("INSERT INTO conversations (candidate_id, title) VALUES ('c', 'Old')")
+            await db.executemany(
+                "INSERT INTO messages (conversation_id, role, content) VALUES (?, 'user', ?)",
+                [(cursor.lastrowid, f"legacy message {i}") for i in range(7)],
+            )
+        await database.close_db()
+        conn = sqlite3.connect(db_path)
+        for table in ("messages_fts", "conversations_fts", "search_backfill"):
+            conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"PRAGMA user_version = {database.MIGRATIONS.index(database._add_search_index)}")
+        conn.commit()
+        conn.close()
+
+        await database.init_db()
+        try:
+            assert (await search.search("legacy"))["items"] == []
+            assert not (await search.get_search_stats())["backfill_complete"]
+            # Migration only records the high-water marks; rows are indexed one batch at a time
+            assert await search.backfill_search_index() == 3 + 1
+            assert len((await search.search("legacy"))["items"]) == 3
+            await search.run_search_backfill()
+            assert len((await search.search("legacy"))["items"]) == 7
+            assert (await search.get_search_stats())["backfill_complete"]
+        finally:
+            await database.close_db()
+
+    _run_coro_in_thread(_run())
@@ -0,0 +1,109 @@
+"""Tests for memoized, per-section profile token counting."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+
+def test_token_count_endpoint_returns_section_breakdown(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.services import token_counter
+
+            token_counter.clear()
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                resp = await client.get(f"/api/candidates/{TEST_CANDIDATE_ID}/work-experience/token-count")
+                assert resp.status_code == 200
+                body = resp.json()
+                assert set(body["sections"]) == {"summary", "skills", "work", "education", "publications"}
+                assert body["sections"]["work"] > 0
+                assert body["nr_tokens"] >= sum(body["sections"].values())
+
+                missing = await client.get("/api/candidates/nobody/work-experience/token-count")
+                assert missing.status_code == 404
+
+    _run_coro_in_thread(_run())
+
+
+def test_counts_are_memoized_by_content_and_rewarmed_on_save(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import asyncio
+            from app.models import Candidate
+            from app.services import token_counter
+            from app.services.candidate_loader import get_profile_hash, get_profile_token_breakdown, save_profile
+
+            token_counter.clear()
+            calls = []
+            compute = token_counter._compute_breakdown
+
+            def _counting(candidate, encoding_name):
+                calls.append(encoding_name)
+                return compute(candidate, encoding_name)
+
+            monkeypatch.setattr(token_counter, "_compute_breakdown", _counting)
+
+            first, second = await asyncio.gather(
+                get_profile_token_breakdown(TEST_CANDIDATE_ID),
+                get_profile_token_breakdown(TEST_CANDIDATE_ID),
+            )
+            assert first == second
+            assert len(calls) == 1
+            await get_profile_token_breakdown(TEST_CANDIDATE_ID)
+            assert len(calls) == 1
+
+            old_hash = get_profile_hash(TEST_CANDIDATE_ID)
+            profile = Candidate.model_validate(test_candidate_source_data).work_experience
+            await save_profile(TEST_CANDIDATE_ID, profile.model_copy(update={"summary": "A much longer summary " * 200}))
+            assert get_profile_hash(TEST_CANDIDATE_ID) != old_hash
+            assert not any(key.endswith(old_hash) for key in token_counter._counts)
+
+            await asyncio.gather(*token_counter._prewarm_tasks)
+            assert len(calls) == 2
+            updated = await get_profile_token_breakdown(TEST_CANDIDATE_ID)
+            assert len(calls) == 2
+            assert updated["summary"] > first["summary"]
+
+    _run_coro_in_thread(_run())
+
+
+def test_endpoint_validates_the_profile_only_on_a_miss_and_off_the_loop(
+    tmp_path: Path, test_candidate_source_data, monkeypatch, offline_encoding
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import threading
+
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+            from app.services import token_counter
+            from app.services.candidate_cache import CachedCandidate
+
+            token_counter.clear()
+            threads = []
+            model = CachedCandidate.model
+
+            def _tracking(entry):
+                threads.append(threading.current_thread())
+                return model(entry)
+
+            monkeypatch.setattr(CachedCandidate, "model", _tracking)
+            url = f"/api/candidates/{TEST_CANDIDATE_ID}/work-experience/token-count"
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                assert (await client.get(url)).status_code == 200
+                assert (await client.get(url)).status_code == 200
+            assert len(threads) == 1
+            assert threads[0] is not threading.current_thread()
+
+    _run_coro_in_thread(_run())
@@ -152,11 +152,11 @@ def test_upload_work_experience_json_overwrites_db(
             assert get_candidate(TEST_CANDIDATE_ID).first_name == "Phil"
             assert get_profile(TEST_CANDIDATE_ID).summary == "Uploaded summary overwrite"
 
-            db = await database.get_db()
-            rows = await db.execute_fetchall(
-                "SELECT work_experience FROM candidates WHERE id = ?",
-                (TEST_CANDIDATE_ID,),
-            )
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT work_experience FROM candidates WHERE id = ?",
+                    (TEST_CANDIDATE_ID,),
+                )
             db_data = json.loads(rows[0]["work_experience"])
             assert db_data["work_experience"]["summary"] == "Uploaded summary overwrite"
             assert db_data["first_name"] == "Phil"
@@ -223,11 +223,11 @@ def test_put_saves_and_persists_edits(tmp_path: Path, test_candidate_source_data
             assert updated.skills == "Edited skills"
 
             # DB persisted
-            db = await database.get_db()
-            rows = await db.execute_fetchall(
-                "SELECT work_experience FROM candidates WHERE id = ?",
-                (TEST_CANDIDATE_ID,),
-            )
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT work_experience FROM candidates WHERE id = ?",
+                    (TEST_CANDIDATE_ID,),
+                )
             db_data = json.loads(rows[0]["work_experience"])
             assert db_data["work_experience"]["summary"] == "Edited summary"
 
@@ -308,11 +308,11 @@ def test_save_profile_updates_db_and_cache(
                 TEST_CANDIDATE_ID
             )
 
-            db = await database.get_db()
-            rows = await db.execute_fetchall(
-                "SELECT work_experience FROM candidates WHERE id = ?",
-                (TEST_CANDIDATE_ID,),
-            )
+            async with database.read_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT work_experience FROM candidates WHERE id = ?",
+                    (TEST_CANDIDATE_ID,),
+                )
             assert "new summary via save_profile" in rows[0]["work_experience"]
 
     _run_coro_in_thread(_run())
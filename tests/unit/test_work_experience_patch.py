@@ -0,0 +1,160 @@
+"""Tests for JSON Patch edits of a candidate's work experience."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import pytest
+
+from app import database
+from app.models import PatchOperation
+from app.services import candidate_loader
+from app.services.profile_patch import PatchError, PatchTestFailed, apply_patch, patch_expression
+from conftest import TEST_CANDIDATE_ID, UnitTestEnv, _run_coro_in_thread
+
+URL = f"/api/candidates/{TEST_CANDIDATE_ID}/work-experience"
+PATCH_HEADERS = {"Content-Type": "application/json-patch+json"}
+
+
+def _ops(*operations: dict) -> list[PatchOperation]:
+    return [PatchOperation.model_validate(operation) for operation in operations]
+
+
+async def _stored() -> tuple[int, dict]:
+    async with database.read_db() as db:
+        rows = await db.execute_fetchall(
+            "SELECT version, work_experience FROM candidates WHERE id = ?", (TEST_CANDIDATE_ID,)
+        )
+    return rows[0]["version"], json.loads(rows[0]["work_experience"])["work_experience"]
+
+
+def test_operations_validate_only_what_they_write(test_candidate_source_data):
+    document = json.loads(json.dumps(test_candidate_source_data["work_experience"]))
+    edits = apply_patch(
+        document,
+        _ops(
+            {"op": "replace", "path": "/work/0/roles/0/items/2/description", "value": "Rewritten"},
+            {"op": "add", "path": "/work/0/roles/0/items/-", "value": {"title": "New item"}},
+            {"op": "remove", "path": "/work/0/roles/0/items/0"},
+            {"op": "remove", "path": "/work/0/employer/sector"},
+            {"op": "add", "path": "/work/0/employer/not_a_field", "value": 1},
+        ),
+    )
+    items = document["work"][0]["roles"][0]["items"]
+    assert items[1]["description"] == "Rewritten"
+    assert items[-1] == {"title": "New item", "description": "", "contribution": ""}
+    assert document["work"][0]["employer"]["sector"] == ""
+    assert "not_a_field" not in document["work"][0]["employer"]
+    assert [(edit.kind, edit.path) for edit in edits] == [
+        ("set", "$.work_experience.work[0].roles[0].items[2].description"),
+        ("set", "$.work_experience.work[0].roles[0].items[#]"),
+        ("remove", "$.work_experience.work[0].roles[0].items[0]"),
+        ("set", "$.work_experience.work[0].employer.sector"),
+    ]
+    expression, params = patch_expression("work_experience", edits)
+    assert expression.count("json_set") == 2 and expression.count("json_remove") == 1
+    assert len(params) == 7
+
+    with pytest.raises(PatchError, match="year"):
+        apply_patch(document, _ops({"op": "replace", "path": "/work/0/start/year", "value": "soon"}))
+    with pytest.raises(PatchError, match="required"):
+        apply_patch(document, _ops({"op": "remove", "path": "/work/0/employer/name"}))
+    with pytest.raises(PatchError, match="out of range"):
+        apply_patch(document, _ops({"op": "replace", "path": "/work/99/employer/name", "value": "x"}))
+    with pytest.raises(PatchTestFailed):
+        apply_patch(document, _ops({"op": "test", "path": "/work/0/start/month", "value": True}))
+    # Key order and 1 vs 1.0 do not matter to a test
+    start = document["work"][0]["start"]
+    reordered = {"month": float(start["month"]), "year": start["year"]}
+    assert apply_patch(document, _ops({"op": "test", "path": "/work/0/start", "value": reordered})) == []
+
+
+def test_patch_rewrites_touched_paths_and_checks_the_version(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            version, before = await _stored()
+            patch = [
+                {"op": "test", "path": "/work/0/start/year", "value": before["work"][0]["start"]["year"]},
+                {"op": "replace", "path": "/work/0/roles/0/items/2/description", "value": "Patched"},
+                {"op": "move", "from": "/work/0/roles/0/items/0", "path": "/work/0/roles/0/items/3"},
+            ]
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                resp = await client.patch(URL, json=patch, headers=PATCH_HEADERS)
+                assert resp.status_code == 428
+                headers = {**PATCH_HEADERS, "X-Profile-Version": str(version)}
+                resp = await client.patch(URL, json=patch, headers=headers)
+                assert resp.status_code == 200
+                assert int(resp.headers["X-Profile-Version"]) == version + 1
+
+                # The same patch against the old version is refused
+                resp = await client.patch(URL, json=patch, headers=headers)
+                assert resp.status_code == 412
+                assert int(resp.headers["X-Profile-Version"]) == version + 1
+
+                headers["X-Profile-Version"] = str(version + 1)
+                bad = [{"op": "replace", "path": "/work/0/roles/0/items/0", "value": {"description": "no title"}}]
+                assert (await client.patch(URL, json=bad, headers=headers)).status_code == 422
+                failed_test = [{"op": "test", "path": "/summary", "value": "something else"}]
+                assert (await client.patch(URL, json=failed_test, headers=headers)).status_code == 409
+                resp = await client.patch(
+                    "/api/candidates/nobody/work-experience", json=patch[1:2], headers=headers
+                )
+                assert resp.status_code == 404
+
+            stored_version, after = await _stored()
+            assert stored_version == version + 1
+            items, old_items = after["work"][0]["roles"][0]["items"], before["work"][0]["roles"][0]["items"]
+            assert items[1]["description"] == "Patched"
+            assert items[3] == old_items[0]
+            assert after["work"][1] == before["work"][1] and after["summary"] == before["summary"]
+            # The cache holds exactly what was stored
+            candidate = await candidate_loader.load_candidate(TEST_CANDIDATE_ID)
+            assert candidate.work_experience.work[0].roles[0].items[1].description == "Patched"
+            entry = candidate_loader._candidates.peek(TEST_CANDIDATE_ID)
+            assert entry.stored_hash == entry.profile_hash
+
+    _run_coro_in_thread(_run())
+
+
+def test_full_saves_bump_the_version(tmp_path: Path, test_candidate_source_data):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            import httpx
+            from httpx import ASGITransport
+            from app.main import app
+
+            version, before = await _stored()
+            async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                resp = await client.put(URL, json={**before, "summary": "Saved in full"})
+                assert resp.status_code == 200
+                assert int(resp.headers["X-Profile-Version"]) == version + 1
+                page = await client.get(f"/work-experience?candidate_id={TEST_CANDIDATE_ID}")
+                assert f"window.__profileVersion = {version + 1};" in page.text
+                # A patch made against the version before the full save is stale
+                headers = {**PATCH_HEADERS, "X-Profile-Version": str(version)}
+                patch = [{"op": "replace", "path": "/skills", "value": "Patched skills"}]
+                assert (await client.patch(URL, json=patch, headers=headers)).status_code == 412
+
+    _run_coro_in_thread(_run())
+
+
+def test_patch_of_a_candidate_deleted_behind_the_cache_reports_it_unknown(
+    tmp_path: Path, test_candidate_source_data
+):
+    async def _run():
+        async with UnitTestEnv(tmp_path, test_candidate_source_data):
+            version, _ = await _stored()
+            assert await candidate_loader.load_candidate(TEST_CANDIDATE_ID) is not None
+            async with database.write_db() as db:
+                await db.execute("DELETE FROM candidates WHERE id = ?", (TEST_CANDIDATE_ID,))
+            operations = _ops({"op": "replace", "path": "/skills", "value": "Gone"})
+            assert await candidate_loader.patch_profile(TEST_CANDIDATE_ID, version, operations) is None
+            assert candidate_loader._candidates.peek(TEST_CANDIDATE_ID) is None
+
+    _run_coro_in_thread(_run())